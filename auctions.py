@@ -0,0 +1,192 @@
+"""
+Chore auctions for FamilySphere.
+Members bid the number of points they would accept for doing an unassigned
+task, and the lowest bid when the auction closes wins the task at that
+price. The best bid lives on the task's task_auctions row and is only ever
+replaced by a conditional update, so simultaneous bids are settled by the
+database row lock instead of an application-level lock.
+"""
+
+import uuid
+from datetime import datetime, time, timedelta, timezone
+
+from database import db
+from recurrence import parse_date
+
+# How long an auction runs after its first bid
+AUCTION_DURATION = timedelta(hours=24)
+
+# Auctions for tasks due soon still stay open at least this long
+AUCTION_MIN_DURATION = timedelta(hours=1)
+
+# Outcomes of place_bid
+BID_ACCEPTED = 'accepted'
+BID_OUTBID = 'outbid'
+BID_CLOSED = 'closed'
+
+# Auctions closed per query by close_due_auctions
+CLOSE_BATCH_SIZE = 200
+
+
+def utc_now():
+    """Current time as an aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+def parse_timestamp(value):
+    """Convert a timestamp string from the database into an aware datetime."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+
+def auction_close_time(task, now):
+    """When a task's auction closes: AUCTION_DURATION from now, or earlier if the task is due sooner."""
+    closes_at = now + AUCTION_DURATION
+    due_date = parse_date(task.get('due_date'))
+    if due_date:
+        due_start = datetime.combine(due_date, time(0), timezone.utc)
+        closes_at = min(closes_at, max(due_start, now + AUCTION_MIN_DURATION))
+    return closes_at
+
+
+def get_auction(task_id):
+    """Get a task's auction row, or None."""
+    auction_response = db.table('task_auctions').select('*').eq('task_id', task_id).execute()
+    return auction_response.data[0] if auction_response.data else None
+
+
+def get_auctions(task_ids):
+    """Map task IDs to their auction rows."""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return {}
+    auctions_response = db.table('task_auctions').select('*').in_('task_id', task_ids).execute()
+    return {auction['task_id']: auction for auction in auctions_response.data}
+
+
+def open_auction(task, now=None):
+    """Get a task's auction, opening it if this is the first bid.
+
+    Concurrent first bids race on the insert; the primary key keeps the
+    first one and the rest are ignored, so every bidder sees the same row.
+    """
+    now = now or utc_now()
+    db.table('task_auctions').upsert({
+        'task_id': task['id'],
+        'family_id': task['family_id'],
+        'status': 'open',
+        'closes_at': auction_close_time(task, now).isoformat()
+    }, on_conflict='task_id', ignore_duplicates=True).execute()
+    return get_auction(task['id'])
+
+
+def place_bid(task, user_id, points, now=None):
+    """Bid on a task's auction.
+
+    Every bid is recorded in task_bids. It then becomes the best bid only if
+    a compare-and-set update finds the auction still open and its current
+    best bid missing or higher; ties keep the earlier bid. Returns
+    (outcome, auction) where outcome is BID_ACCEPTED, BID_OUTBID or
+    BID_CLOSED and auction is the auction row as last seen.
+    """
+    now = now or utc_now()
+    auction = open_auction(task, now)
+    if auction['status'] != 'open' or parse_timestamp(auction['closes_at']) <= now:
+        return BID_CLOSED, auction
+
+    bid_id = str(uuid.uuid4())
+    db.table('task_bids').insert({
+        'id': bid_id,
+        'task_id': task['id'],
+        'family_id': task['family_id'],
+        'user_id': user_id,
+        'points': points
+    }).execute()
+
+    accepted = db.table('task_auctions').update({
+        'best_bid': points,
+        'best_bidder': user_id,
+        'best_bid_id': bid_id,
+        'updated_at': now.isoformat()
+    }).eq('task_id', task['id']) \
+        .eq('status', 'open') \
+        .gt('closes_at', now.isoformat()) \
+        .or_(f'best_bid.is.null,best_bid.gt.{points}') \
+        .execute().data
+    if accepted:
+        return BID_ACCEPTED, accepted[0]
+
+    auction = get_auction(task['id'])
+    if auction['status'] != 'open' or parse_timestamp(auction['closes_at']) <= now:
+        return BID_CLOSED, auction
+    return BID_OUTBID, auction
+
+
+def close_auction(auction):
+    """Close an auction and give the task to the best bidder at their bid.
+
+    Only the caller whose update moves the auction from open to closed
+    assigns the task and records the win in the points ledger, so a second
+    worker closing the same auction does nothing. The win moves no points
+    itself; the bid is what the task pays when it is completed. Returns the
+    closed auction row, or None if it was already closed.
+    """
+    closed = db.table('task_auctions').update({'status': 'closed'}) \
+        .eq('task_id', auction['task_id']) \
+        .eq('status', 'open') \
+        .execute().data
+    if not closed:
+        return None
+
+    auction = closed[0]
+    if auction.get('best_bidder'):
+        assigned = db.table('tasks').update({
+            'assigned_to': auction['best_bidder'],
+            'points': auction['best_bid']
+        }).eq('id', auction['task_id']) \
+            .eq('status', 'Pending') \
+            .is_('assigned_to', 'null') \
+            .execute().data
+        if assigned:
+            db.table('points_ledger').insert({
+                'family_id': auction['family_id'],
+                'user_id': auction['best_bidder'],
+                'task_id': auction['task_id'],
+                'points': 0,
+                'bid_points': auction['best_bid'],
+                'reason': 'auction_won'
+            }).execute()
+    return auction
+
+
+def close_due_auctions(now=None):
+    """Close every open auction whose close time has passed and notify the families.
+
+    Returns the number of auctions closed.
+    """
+    now = now or utc_now()
+    closed = []
+    while True:
+        due = db.table('task_auctions').select('*') \
+            .eq('status', 'open') \
+            .lte('closes_at', now.isoformat()) \
+            .order('closes_at') \
+            .limit(CLOSE_BATCH_SIZE) \
+            .execute().data
+        closed.extend(auction for auction in map(close_auction, due) if auction)
+        if len(due) < CLOSE_BATCH_SIZE:
+            break
+
+    won = [auction for auction in closed if auction.get('best_bidder')]
+    if won:
+        tasks_response = db.table('tasks').select('id, title').in_('id', [auction['task_id'] for auction in won]).execute()
+        titles = {task['id']: task['title'] for task in tasks_response.data}
+        db.table('notifications').insert([{
+            'id': str(uuid.uuid4()),
+            'family_id': auction['family_id'],
+            'type': 'task_auction',
+            'title': f"{titles.get(auction['task_id'], 'A task')} was won for {auction['best_bid']} points"
+        } for auction in won]).execute()
+
+    return len(closed)
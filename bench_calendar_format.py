@@ -0,0 +1,130 @@
+import random
+import time
+from datetime import datetime, date, timedelta
+
+from calendar_format import format_events
+
+# Micro-benchmark comparing the batch calendar formatter with the old per-event formatter
+CATEGORIES = ['Family', 'Work', 'School', 'Sports', 'Health', 'Social', 'Other', 'Custom']
+EVENT_COUNTS = [10000, 50000, 100000]
+REPEATS = 5
+
+
+def legacy_format_event(event, is_family_event=True):
+    """The previous per-event formatter, kept here for comparison."""
+    formatted_event = {
+        'id': event['id'],
+        'title': event['title'],
+        'start': event['date']
+    }
+
+    if event.get('time'):
+        try:
+            event_time = datetime.strptime(event['time'], '%H:%M:%S').time()
+        except ValueError:
+            event_time = datetime.strptime(event['time'], '%H:%M').time()
+        formatted_event['start'] += 'T' + event_time.strftime('%H:%M:%S')
+
+    if event.get('end_time'):
+        try:
+            end_time = datetime.strptime(event['end_time'], '%H:%M:%S').time()
+        except ValueError:
+            end_time = datetime.strptime(event['end_time'], '%H:%M').time()
+        formatted_event['end'] = event['date'] + 'T' + end_time.strftime('%H:%M:%S')
+    else:
+        formatted_event['end'] = event['date'] + 'T23:59:59'
+
+    if event.get('all_day'):
+        formatted_event['allDay'] = True
+
+    category_colors = {
+        'Family': '#4285F4',
+        'Work': '#EA4335',
+        'School': '#FBBC05',
+        'Sports': '#34A853',
+        'Health': '#8E24AA',
+        'Social': '#FB8C00',
+        'Other': '#9E9E9E'
+    }
+
+    if event.get('category') and event['category'] in category_colors:
+        formatted_event['backgroundColor'] = category_colors[event['category']]
+    else:
+        formatted_event['backgroundColor'] = '#4285F4'
+
+    if not is_family_event:
+        formatted_event['borderColor'] = '#FF5722'
+        formatted_event['textColor'] = '#FFFFFF'
+
+    formatted_event['extendedProps'] = {
+        'description': event.get('description', ''),
+        'location': event.get('location', ''),
+        'category': event.get('category', ''),
+        'created_by': event.get('created_by', ''),
+        'family_id': event.get('family_id', ''),
+        'shared_with': event.get('shared_with', ''),
+        'is_recurring': event.get('is_recurring', False),
+        'recurrence_pattern': event.get('recurrence_pattern', '')
+    }
+
+    return formatted_event
+
+
+def make_events(count, seed=42):
+    """Generate event rows shaped like the events table, with a mix of time formats."""
+    rng = random.Random(seed)
+    start = date.today()
+    events = []
+    for i in range(count):
+        hour = rng.randrange(6, 22)
+        minute = rng.choice([0, 15, 30, 45])
+        # Times come back as HH:MM:SS from the database but HH:MM from forms
+        time_format = '{:02d}:{:02d}:00' if rng.random() < 0.7 else '{:02d}:{:02d}'
+        has_time = rng.random() < 0.85
+        events.append({
+            'id': f'event-{i}',
+            'title': f'Event {i}',
+            'date': (start + timedelta(days=rng.randrange(365))).isoformat(),
+            'time': time_format.format(hour, minute) if has_time else None,
+            'end_time': time_format.format(min(hour + 1, 23), minute) if has_time and rng.random() < 0.6 else None,
+            'all_day': not has_time,
+            'category': rng.choice(CATEGORIES),
+            'description': '',
+            'location': '',
+            'family_id': 'family-1',
+            'created_by': 'user-1'
+        })
+    return events
+
+
+def best_time(function):
+    """Best wall-clock time over several runs, in seconds."""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run_benchmark():
+    print("Benchmarking calendar event formatting...")
+    print(f"{'events':>8}  {'legacy':>10}  {'batch':>10}  {'batch events/s':>15}  {'speedup':>8}")
+
+    for count in EVENT_COUNTS:
+        events = make_events(count)
+
+        # Both formatters must agree before their timings mean anything
+        if format_events(events) != [legacy_format_event(event) for event in events]:
+            print(f"Formatters disagree for {count} events")
+            return
+
+        legacy = best_time(lambda: [legacy_format_event(event) for event in events])
+        batch = best_time(lambda: format_events(events))
+
+        print(f"{count:>8}  {legacy * 1000:>8.1f}ms  {batch * 1000:>8.1f}ms  "
+              f"{count / batch:>15,.0f}  {legacy / batch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
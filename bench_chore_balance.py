@@ -0,0 +1,46 @@
+import random
+import time
+
+from chore_balance import ROLE_SHARES, balance_chores, task_load
+
+# Benchmark of chore balancing for large families and task backlogs
+SIZES = [(100, 10), (300, 20), (500, 40), (1000, 50)]
+ROLES = ['Admin', 'Member', 'Member', 'Kid']
+
+
+def make_family(task_count, member_count, seed=42):
+    """Generate unassigned tasks, members with mixed roles and their existing loads."""
+    rng = random.Random(seed)
+    members = [{'id': f'member-{i}', 'role': rng.choice(ROLES)} for i in range(member_count)]
+    tasks = [{
+        'id': f'task-{i}',
+        'points': rng.choice([0, 5, 10, 10, 15, 20, 50]),
+        'due_date': f'2026-11-{rng.randrange(1, 29):02d}'
+    } for i in range(task_count)]
+    loads = {member['id']: rng.randrange(0, 60) for member in members}
+    return tasks, members, loads
+
+
+def run_benchmark():
+    print("Benchmarking chore balancing...")
+    print(f"{'tasks':>6}  {'members':>7}  {'time':>10}  {'load spread':>12}")
+
+    for task_count, member_count in SIZES:
+        tasks, members, loads = make_family(task_count, member_count)
+
+        started = time.perf_counter()
+        assignments = balance_chores(tasks, members, loads)
+        elapsed = time.perf_counter() - started
+
+        # Spread of load per unit of share, after assignment
+        totals = dict(loads)
+        for task in tasks:
+            totals[assignments[task['id']]] += task_load(task)
+        normalized = [totals[member['id']] / ROLE_SHARES[member['role']] for member in members]
+
+        print(f"{task_count:>6}  {member_count:>7}  {elapsed * 1000:>8.1f}ms  "
+              f"{min(normalized):>5.0f}-{max(normalized):<6.0f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,62 @@
+import io
+import random
+import time
+from datetime import date, timedelta
+
+from statement_import import iter_statement_expenses
+
+# Benchmark of bank statement parsing, mapping and hashing, without the database
+LINE_COUNTS = [1000, 10000, 50000]
+PAYEES = ['GROCERY MART', 'COFFEE HOUSE', 'CITY WATER', 'PETROL STATION', 'ONLINE STORE', 'PHARMACY']
+
+
+def make_csv(count, seed=42):
+    """Generate a CSV statement with signed amounts, mostly payments and some deposits."""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=count // 20)
+    lines = ['Date,Description,Amount,Balance\n']
+    for i in range(count):
+        amount = -rng.randrange(100, 20000) / 100 if rng.random() < 0.9 else rng.randrange(10000, 300000) / 100
+        lines.append(f'{(start + timedelta(days=i // 20)).isoformat()},"{rng.choice(PAYEES)} #{rng.randrange(100)}",'
+                     f'{amount:.2f},0.00\n')
+    return ''.join(lines).encode('utf-8')
+
+
+def make_ofx(count, seed=42):
+    """Generate an SGML OFX statement with one tag per line."""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=count // 20)
+    lines = ['OFXHEADER:100\n', 'DATA:OFXSGML\n', '<OFX>\n', '<BANKTRANLIST>\n']
+    for i in range(count):
+        lines.extend([
+            '<STMTTRN>\n',
+            '<TRNTYPE>DEBIT\n',
+            f'<DTPOSTED>{(start + timedelta(days=i // 20)).strftime("%Y%m%d")}120000\n',
+            f'<TRNAMT>-{rng.randrange(100, 20000) / 100:.2f}\n',
+            f'<FITID>{i}\n',
+            f'<NAME>{rng.choice(PAYEES)}\n',
+            '</STMTTRN>\n'
+        ])
+    lines.extend(['</BANKTRANLIST>\n', '</OFX>\n'])
+    return ''.join(lines).encode('utf-8')
+
+
+def run_benchmark():
+    print("Benchmarking statement import parsing...")
+    print(f"{'lines':>8}  {'csv':>10}  {'ofx':>10}  {'expenses':>9}")
+
+    for count in LINE_COUNTS:
+        timings = {}
+        for name, content, filename in (('csv', make_csv(count), 'statement.csv'),
+                                        ('ofx', make_ofx(count), 'statement.ofx')):
+            started = time.perf_counter()
+            expenses = sum(1 for expense in iter_statement_expenses(io.BytesIO(content), filename) if expense)
+            timings[name] = time.perf_counter() - started
+            if name == 'csv':
+                csv_expenses = expenses
+
+        print(f"{count:>8}  {timings['csv'] * 1000:>8.1f}ms  {timings['ofx'] * 1000:>8.1f}ms  {csv_expenses:>9}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,64 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from freebusy import BusyIndex, find_free_slots
+
+# Micro-benchmark of free slot queries against a precomputed busy index
+MEMBER_COUNT = 6
+EVENT_COUNTS = [1000, 10000, 50000]
+QUERIES = 200
+
+
+def make_events(count, members, seed=42):
+    """Generate timed events spread over a year, created by family members or shared in."""
+    rng = random.Random(seed)
+    start = date.today()
+    events = []
+    for i in range(count):
+        hour = rng.randrange(7, 21)
+        minute = rng.choice([0, 15, 30, 45])
+        length = rng.choice([30, 45, 60, 90, 120])
+        end_minutes = min(hour * 60 + minute + length, 23 * 60 + 59)
+        events.append({
+            'id': f'event-{i}',
+            'title': f'Event {i}',
+            'date': (start + timedelta(days=rng.randrange(365))).isoformat(),
+            'time': f'{hour:02d}:{minute:02d}:00',
+            'end_time': f'{end_minutes // 60:02d}:{end_minutes % 60:02d}:00',
+            # A few events come from other families and block everyone
+            'created_by': rng.choice(members) if rng.random() < 0.95 else 'shared'
+        })
+    return events
+
+
+def run_benchmark():
+    print("Benchmarking free slot search...")
+    print(f"{'events':>8}  {'build':>10}  {'query (all)':>12}  {'query (2)':>10}")
+
+    members = [f'member-{i}' for i in range(MEMBER_COUNT)]
+    rng = random.Random(7)
+
+    for count in EVENT_COUNTS:
+        events = make_events(count, members)
+
+        started = time.perf_counter()
+        busy_index = BusyIndex(events, members)
+        build = time.perf_counter() - started
+
+        timings = {'all': [], 'pair': []}
+        for _ in range(QUERIES):
+            window_start = datetime.combine(date.today() + timedelta(days=rng.randrange(300)), datetime.min.time())
+            window_end = window_start + timedelta(days=30)
+            for name, member_ids in (('all', None), ('pair', rng.sample(members, 2))):
+                started = time.perf_counter()
+                busy = busy_index.busy(member_ids, window_start, window_end)
+                find_free_slots(busy, window_start, window_end, timedelta(minutes=90), 10)
+                timings[name].append(time.perf_counter() - started)
+
+        print(f"{count:>8}  {build * 1000:>8.1f}ms  {max(timings['all']) * 1000:>10.2f}ms  "
+              f"{max(timings['pair']) * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
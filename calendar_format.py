@@ -0,0 +1,81 @@
+"""
+FullCalendar formatting for FamilySphere events.
+This module turns event rows into the dictionaries FullCalendar expects. Time
+strings are normalized once per distinct value and colors come from fixed
+lookup tables, so formatting a long list of events is a single cheap pass.
+"""
+
+from datetime import time
+from functools import lru_cache
+
+# Background color per event category
+CATEGORY_COLORS = {
+    'Family': '#4285F4',  # Blue
+    'Work': '#EA4335',    # Red
+    'School': '#FBBC05',  # Yellow
+    'Sports': '#34A853',  # Green
+    'Health': '#8E24AA',  # Purple
+    'Social': '#FB8C00',  # Orange
+    'Other': '#9E9E9E'    # Gray
+}
+
+DEFAULT_COLOR = '#4285F4'
+
+# Events shared by another family get a distinct border
+SHARED_EVENT_COLORS = {
+    'borderColor': '#FF5722',  # Deep Orange
+    'textColor': '#FFFFFF'
+}
+
+# End used for events without an end time
+END_OF_DAY = 'T23:59:59'
+
+
+@lru_cache(maxsize=4096)
+def normalize_time(value):
+    """Convert an 'HH:MM' or 'HH:MM:SS' string into a 'THH:MM:SS' suffix.
+
+    Results are cached per distinct string; a calendar only has a handful of
+    distinct start and end times, so nearly every lookup is a cache hit.
+    """
+    return 'T' + time.fromisoformat(value).strftime('%H:%M:%S')
+
+
+def format_event(event, is_family_event=True):
+    """Format an event for FullCalendar."""
+    get = event.get
+    event_date = event['date']
+    start_time = get('time')
+    end_time = get('end_time')
+    category = get('category')
+
+    formatted_event = {
+        'id': event['id'],
+        'title': event['title'],
+        'start': event_date + normalize_time(start_time) if start_time else event_date,
+        'end': event_date + (normalize_time(end_time) if end_time else END_OF_DAY),
+        'backgroundColor': CATEGORY_COLORS.get(category, DEFAULT_COLOR),
+        'extendedProps': {
+            'description': get('description', ''),
+            'location': get('location', ''),
+            'category': get('category', ''),
+            'created_by': get('created_by', ''),
+            'family_id': get('family_id', ''),
+            'shared_with': get('shared_with', ''),
+            'is_recurring': get('is_recurring', False),
+            'recurrence_pattern': get('recurrence_pattern', '')
+        }
+    }
+
+    if get('all_day'):
+        formatted_event['allDay'] = True
+
+    if not is_family_event:
+        formatted_event.update(SHARED_EVENT_COLORS)
+
+    return formatted_event
+
+
+def format_events(events, is_family_event=True):
+    """Format a list of events for FullCalendar in one pass."""
+    return [format_event(event, is_family_event) for event in events]
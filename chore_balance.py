@@ -0,0 +1,118 @@
+"""
+Chore balancing for FamilySphere.
+This module spreads unassigned tasks across family members so that each
+member's pending load, in points, ends up proportional to the share of the
+work their role carries. Tasks are handed out in rounds, each solved exactly
+as an assignment problem with the Hungarian method.
+"""
+
+# Share of the work each role carries; roles not listed are not given chores
+ROLE_SHARES = {
+    'Admin': 1.0,
+    'Member': 1.0,
+    'Kid': 0.5
+}
+
+# Tasks worth no points still count as this much load
+MIN_TASK_LOAD = 1
+
+INFINITY = float('inf')
+
+
+def hungarian(cost):
+    """Solve a rectangular assignment problem with at most as many rows as columns.
+
+    cost is a list of rows of equal length. Returns, for each row, the index
+    of the column it is assigned to, minimising the total cost. Runs the
+    shortest augmenting path form of the Hungarian method in O(rows² * columns).
+    """
+    rows = len(cost)
+    if not rows:
+        return []
+    columns = len(cost[0])
+
+    # Potentials and the row matched to each column, 1-based with 0 as the virtual start
+    row_potential = [0.0] * (rows + 1)
+    column_potential = [0.0] * (columns + 1)
+    column_row = [0] * (columns + 1)
+    way = [0] * (columns + 1)
+
+    for row in range(1, rows + 1):
+        column_row[0] = row
+        current = 0
+        slack = [INFINITY] * (columns + 1)
+        used = [False] * (columns + 1)
+        while True:
+            used[current] = True
+            matched_row = column_row[current]
+            row_costs = cost[matched_row - 1]
+            offset = row_potential[matched_row]
+            delta = INFINITY
+            next_column = 0
+            for column in range(1, columns + 1):
+                if not used[column]:
+                    reduced = row_costs[column - 1] - offset - column_potential[column]
+                    if reduced < slack[column]:
+                        slack[column] = reduced
+                        way[column] = current
+                    if slack[column] < delta:
+                        delta = slack[column]
+                        next_column = column
+            for column in range(columns + 1):
+                if used[column]:
+                    row_potential[column_row[column]] += delta
+                    column_potential[column] -= delta
+                else:
+                    slack[column] -= delta
+            current = next_column
+            if column_row[current] == 0:
+                break
+        # Flip the augmenting path back to the start
+        while current:
+            previous = way[current]
+            column_row[current] = column_row[previous]
+            current = previous
+
+    assignment = [0] * rows
+    for column in range(1, columns + 1):
+        if column_row[column]:
+            assignment[column_row[column] - 1] = column - 1
+    return assignment
+
+
+def task_load(task):
+    """Load a task adds to whoever does it."""
+    return max(task.get('points') or 0, MIN_TASK_LOAD)
+
+
+def balance_chores(tasks, members, loads=None):
+    """Assign tasks to members, keeping loads proportional to role shares.
+
+    members are user rows with id and role; loads maps member IDs to the
+    points they already have pending. The objective is the sum over members
+    of load² / share, so each task costs a member
+    load(task) * (2 * load + load(task)) / share. Tasks go out largest first,
+    in rounds where each member takes at most one task; a round holds half
+    as many tasks as there are members, so the most loaded members can sit
+    it out. Returns a dict of task ID to member ID.
+    """
+    eligible = [member for member in members if ROLE_SHARES.get(member.get('role')) is not None]
+    if not eligible:
+        return {}
+
+    member_ids = [member['id'] for member in eligible]
+    shares = [ROLE_SHARES[member['role']] for member in eligible]
+    current = [(loads or {}).get(member_id, 0) for member_id in member_ids]
+
+    pending = sorted(tasks, key=lambda task: (-task_load(task), str(task.get('due_date') or ''), task['id']))
+    round_size = max(len(eligible) // 2, 1)
+
+    assignments = {}
+    for start in range(0, len(pending), round_size):
+        batch = pending[start:start + round_size]
+        cost = [[task_load(task) * (2 * load + task_load(task)) / share for load, share in zip(current, shares)]
+                for task in batch]
+        for task, column in zip(batch, hungarian(cost)):
+            assignments[task['id']] = member_ids[column]
+            current[column] += task_load(task)
+    return assignments
@@ -0,0 +1,117 @@
+"""
+Event conflict detection for FamilySphere.
+This module indexes timed events in an interval tree so the calendar can ask
+which events overlap a time slot without scanning every event.
+"""
+
+from datetime import datetime, timedelta
+
+from ical_export import parse_time
+from recurrence import parse_date
+
+# Timed events without an end time are treated as lasting this long
+DEFAULT_EVENT_DURATION = timedelta(hours=1)
+
+
+def event_interval(event):
+    """Return the (start, end) datetimes of a timed event, or None for all-day events."""
+    if event.get('all_day'):
+        return None
+
+    start_time = parse_time(event.get('time'))
+    if start_time is None:
+        return None
+
+    event_date = parse_date(event['date'])
+    start = datetime.combine(event_date, start_time)
+
+    end_time = parse_time(event.get('end_time'))
+    end_date = parse_date(event.get('end_date')) or event_date
+    if end_time is not None:
+        end = datetime.combine(end_date, end_time)
+    elif end_date > event_date:
+        end = datetime.combine(end_date, start_time)
+    else:
+        end = start + DEFAULT_EVENT_DURATION
+
+    # Guard against end times before the start (e.g. bad data or overnight events without end_date)
+    if end <= start:
+        end = start + DEFAULT_EVENT_DURATION
+
+    return start, end
+
+
+class IntervalTree:
+    """Static interval tree for overlap queries.
+
+    Intervals are sorted by start and stored as an implicit balanced binary
+    tree over that order: the node for positions [lo, hi) is the middle
+    position, and each node records the latest end in its subtree. Subtrees
+    that finish before the query or start after it are skipped, so a query
+    only visits the O(log n) search path plus the paths to the k matches.
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [interval[0] for interval in intervals]
+        self._ends = [interval[1] for interval in intervals]
+        self._items = [interval[2] for interval in intervals]
+        self._max_end = list(self._ends)
+        self._build(0, len(intervals))
+
+    def __len__(self):
+        return len(self._items)
+
+    def _build(self, lo, hi):
+        """Fill in the subtree maximum end for positions [lo, hi); returns it."""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        max_end = self._ends[mid]
+        for child_max in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child_max is not None and child_max > max_end:
+                max_end = child_max
+        self._max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start, end):
+        """Return the items whose [start, end) interval overlaps [start, end), ordered by start."""
+        found = []
+        stack = [(0, len(self._items))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+
+            # Nothing in this subtree ends after the query starts
+            if self._max_end[mid] <= start:
+                continue
+
+            # Later positions start even later, so only the left side can still overlap
+            if self._starts[mid] >= end:
+                stack.append((lo, mid))
+                continue
+
+            stack.append((mid + 1, hi))
+            if self._ends[mid] > start:
+                found.append((self._starts[mid], mid))
+            stack.append((lo, mid))
+
+        found.sort()
+        return [self._items[position] for _, position in found]
+
+
+def build_conflict_tree(events):
+    """Build an interval tree over the timed events in a list."""
+    intervals = []
+    for event in events:
+        interval = event_interval(event)
+        if interval is not None:
+            intervals.append((interval[0], interval[1], event))
+    return IntervalTree(intervals)
+
+
+def find_conflicts(tree, start, end, exclude_ids=()):
+    """Return the events in a tree that overlap [start, end), skipping any excluded IDs."""
+    return [event for event in tree.overlapping(start, end) if event['id'] not in exclude_ids]
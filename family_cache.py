@@ -0,0 +1,60 @@
+"""
+In-process caching for FamilySphere.
+This module provides a small per-family cache used to keep computed calendar
+data between requests.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class FamilyCache:
+    """Thread-safe cache of computed values grouped by family.
+
+    Entries are invalidated for a whole family at once when that family's data
+    changes. Each gunicorn worker keeps its own copy, so entries also expire
+    after ``ttl`` seconds to bound staleness from writes handled by another
+    worker.
+    """
+
+    def __init__(self, ttl=300, max_entries_per_family=32):
+        self.ttl = ttl
+        self.max_entries_per_family = max_entries_per_family
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, family_id, key):
+        """Return the cached value for (family_id, key), or None if missing or expired."""
+        with self._lock:
+            family_entries = self._entries.get(family_id)
+            if not family_entries or key not in family_entries:
+                return None
+
+            stored_at, value = family_entries[key]
+            if time.monotonic() - stored_at > self.ttl:
+                del family_entries[key]
+                return None
+
+            family_entries.move_to_end(key)
+            return value
+
+    def set(self, family_id, key, value):
+        """Store a value for (family_id, key), evicting the least recently used entry if full."""
+        with self._lock:
+            family_entries = self._entries.setdefault(family_id, OrderedDict())
+            family_entries[key] = (time.monotonic(), value)
+            family_entries.move_to_end(key)
+
+            while len(family_entries) > self.max_entries_per_family:
+                family_entries.popitem(last=False)
+
+    def invalidate(self, family_id):
+        """Drop every cached entry for a family."""
+        with self._lock:
+            self._entries.pop(family_id, None)
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,166 @@
+"""
+Finance rollups for FamilySphere.
+This module totals a family's finance rows into per-category, per-month
+spending against budgets, plus savings goal progress. Rows are first split
+into columns (category index, month index, amount) and then summed into one
+flat category x month grid in a single pass, bincount style, rather than
+filtering the rows once per category and month.
+"""
+
+from datetime import date
+
+# Months of spending history in a rollup, ending with the requested month
+ROLLUP_MONTHS = 12
+
+# Category of expenses and budgets saved without one
+DEFAULT_CATEGORY = 'General'
+
+
+def month_key(value):
+    """Get the 'YYYY-MM' month of a date, datetime or ISO date string, or None."""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value.strftime('%Y-%m')
+    value = str(value)
+    return value[:7] if len(value) >= 7 and value[4] == '-' else None
+
+
+def month_range(last_month, count=ROLLUP_MONTHS):
+    """List the `count` months ending with last_month, oldest first, as 'YYYY-MM' keys."""
+    year, month = (int(part) for part in last_month.split('-'))
+    index = year * 12 + month - 1 - (count - 1)
+    return [f'{(index + i) // 12:04d}-{(index + i) % 12 + 1:02d}' for i in range(count)]
+
+
+def to_amount(value):
+    """Convert a stored amount to a float, treating missing or bad values as 0."""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def expense_columns(expenses, month_index):
+    """Split expense rows into parallel category, month index and amount columns.
+
+    Expenses outside the months in month_index are dropped. Returns
+    (categories, category_ids, month_ids, amounts) where categories lists
+    the distinct categories in first-seen order.
+    """
+    category_index = {}
+    category_ids = []
+    month_ids = []
+    amounts = []
+    for expense in expenses:
+        month = month_index.get(month_key(expense.get('date') or expense.get('created_at')))
+        if month is None:
+            continue
+        category = expense.get('category') or DEFAULT_CATEGORY
+        category_ids.append(category_index.setdefault(category, len(category_index)))
+        month_ids.append(month)
+        amounts.append(to_amount(expense.get('amount')))
+    return list(category_index), category_ids, month_ids, amounts
+
+
+def bincount(bins, weights, length):
+    """Sum weights into `length` bins, like numpy.bincount."""
+    totals = [0.0] * length
+    for position, weight in zip(bins, weights):
+        totals[position] += weight
+    return totals
+
+
+def monthly_budgets(budgets, months):
+    """Map each category to its budget in each month.
+
+    Recurring budgets apply to every month from the one they were created
+    in; one-off budgets only to that month. Budgets for the same category
+    add up.
+    """
+    by_category = {}
+    for budget in budgets:
+        category = budget.get('category') or DEFAULT_CATEGORY
+        amount = to_amount(budget.get('amount'))
+        start = month_key(budget.get('created_at')) or months[0]
+        row = by_category.setdefault(category, [0.0] * len(months))
+        for i, month in enumerate(months):
+            if month == start or (budget.get('recurring') and month > start):
+                row[i] += amount
+    return by_category
+
+
+def goal_progress(goal):
+    """Summarise a savings goal's progress towards its target."""
+    target = to_amount(goal.get('target_amount') or goal.get('amount'))
+    saved = to_amount(goal.get('current_amount'))
+    return {
+        'id': goal.get('id'),
+        'title': goal.get('title'),
+        'target_amount': round(target, 2),
+        'current_amount': round(saved, 2),
+        'remaining': round(max(target - saved, 0.0), 2),
+        'progress': round(min(saved / target, 1.0), 4) if target > 0 else 0.0,
+        'target_date': goal.get('target_date')
+    }
+
+
+def rollup_finances(rows, month, months=ROLLUP_MONTHS):
+    """Roll a family's finance rows up into budgets vs. actuals for a month.
+
+    Returns a dict with, for the requested 'YYYY-MM' month, the budget,
+    spend and what is left of each category with either; the spend of
+    each category over the `months` months ending with it; overall totals;
+    and savings goal progress.
+    """
+    month_keys = month_range(month, months)
+    month_index = {key: i for i, key in enumerate(month_keys)}
+
+    expenses = [row for row in rows if row.get('type') == 'Expense']
+    budgets = monthly_budgets([row for row in rows if row.get('type') == 'Budget'], month_keys)
+    goals = [goal_progress(row) for row in rows if row.get('type') == 'Goal']
+
+    categories, category_ids, month_ids, amounts = expense_columns(expenses, month_index)
+    for category in budgets:
+        if category not in categories:
+            categories.append(category)
+
+    # One flat category x month grid, filled in a single pass over the columns
+    width = len(month_keys)
+    grid = bincount([category * width + month_id for category, month_id in zip(category_ids, month_ids)],
+                    amounts, len(categories) * width)
+
+    current = width - 1
+    summary = []
+    history = {}
+    for i, category in enumerate(categories):
+        spend = [round(total, 2) for total in grid[i * width:(i + 1) * width]]
+        budget = budgets.get(category, [0.0] * width)[current]
+        spent = spend[current]
+        history[category] = spend
+        if not budget and not spent:
+            continue
+        summary.append({
+            'category': category,
+            'budget': round(budget, 2),
+            'spent': spent,
+            'remaining': round(budget - spent, 2),
+            'percent_used': round(spent / budget * 100, 1) if budget > 0 else None,
+            'over_budget': budget > 0 and spent > budget
+        })
+    summary.sort(key=lambda row: (-row['spent'], row['category']))
+
+    total_budget = round(sum(row['budget'] for row in summary), 2)
+    total_spent = round(sum(row['spent'] for row in summary), 2)
+    return {
+        'month': month,
+        'months': month_keys,
+        'categories': summary,
+        'history': history,
+        'totals': {
+            'budget': total_budget,
+            'spent': total_spent,
+            'remaining': round(total_budget - total_spent, 2)
+        },
+        'goals': goals
+    }
@@ -0,0 +1,153 @@
+"""
+Free/busy computation for FamilySphere.
+This module turns the timed events family members see into merged busy
+intervals per member, so finding a time when everyone is free is a walk over
+a few sorted lists instead of a scan of every event.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+
+from conflicts import event_interval
+
+# Slots are only suggested inside these hours
+DEFAULT_DAY_START = time(8, 0)
+DEFAULT_DAY_END = time(21, 0)
+
+# Suggested slots start on multiples of this many minutes
+SLOT_ALIGNMENT_MINUTES = 15
+
+# Key of the busy list covering every member
+EVERYONE = None
+
+
+def merge_intervals(intervals):
+    """Merge sorted (start, end) intervals that overlap or touch into a sorted, disjoint list."""
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def clip_intervals(intervals, start, end):
+    """Get the intervals of a sorted, disjoint list that overlap [start, end)."""
+    first = bisect_right(intervals, (start, start))
+    if first > 0 and intervals[first - 1][1] > start:
+        first -= 1
+    last = bisect_left(intervals, (end, end), first)
+    return intervals[first:last]
+
+
+class BusyIndex:
+    """Merged busy intervals of each family member.
+
+    Events are attributed to the member who created them; events created by
+    anyone else (such as events shared by another family) make every member
+    busy. Each member's list, and the list for everyone together, is sorted
+    and disjoint.
+    """
+
+    def __init__(self, events, member_ids):
+        member_ids = set(member_ids)
+        member_intervals = {member_id: [] for member_id in member_ids}
+        everyone_intervals = []
+
+        for event in events:
+            interval = event_interval(event)
+            if interval is None:
+                continue
+            owner = event.get('created_by')
+            if owner in member_ids:
+                member_intervals[owner].append(interval)
+            else:
+                everyone_intervals.append(interval)
+
+        everyone_intervals.sort()
+        self._busy = {}
+        for member_id, intervals in member_intervals.items():
+            intervals.sort()
+            self._busy[member_id] = merge_intervals(heapq.merge(intervals, everyone_intervals))
+        self._busy[EVERYONE] = merge_intervals(heapq.merge(everyone_intervals,
+                                                           *(self._busy[member_id] for member_id in member_ids)))
+
+    def busy(self, member_ids=EVERYONE, start=None, end=None):
+        """Get the merged busy intervals of a group of members, or of everyone.
+
+        With start and end, only intervals overlapping [start, end) are
+        returned, found by bisection rather than a scan.
+        """
+        if member_ids is EVERYONE:
+            lists = [self._busy[EVERYONE]]
+        else:
+            lists = [self._busy[member_id] for member_id in member_ids if member_id in self._busy]
+
+        if start is not None and end is not None:
+            lists = [clip_intervals(intervals, start, end) for intervals in lists]
+
+        if len(lists) == 1:
+            return lists[0]
+        return merge_intervals(heapq.merge(*lists))
+
+    def members(self):
+        """IDs of the members this index covers."""
+        return [member_id for member_id in self._busy if member_id is not EVERYONE]
+
+
+def align_up(moment, minutes=SLOT_ALIGNMENT_MINUTES):
+    """Round a datetime up to the next multiple of a number of minutes."""
+    floor = moment.replace(second=0, microsecond=0) - timedelta(minutes=(moment.hour * 60 + moment.minute) % minutes)
+    return floor if floor == moment else floor + timedelta(minutes=minutes)
+
+
+def iter_free_gaps(busy, window_start, window_end, day_start=DEFAULT_DAY_START, day_end=DEFAULT_DAY_END):
+    """Yield the (start, end) gaps between busy intervals in [window_start, window_end), clipped to daily hours."""
+    # Skip straight to the first busy interval that can end after the window starts
+    position = bisect_right(busy, (window_start, window_start))
+    if position > 0 and busy[position - 1][1] > window_start:
+        position -= 1
+
+    day = window_start.date()
+    while day <= window_end.date():
+        open_at = max(datetime.combine(day, day_start), window_start)
+        close_at = min(datetime.combine(day, day_end), window_end)
+        cursor = open_at
+
+        while cursor < close_at:
+            while position < len(busy) and busy[position][1] <= cursor:
+                position += 1
+            if position < len(busy) and busy[position][0] < close_at:
+                busy_start, busy_end = busy[position]
+                if busy_start > cursor:
+                    yield cursor, busy_start
+                cursor = max(cursor, busy_end)
+            else:
+                yield cursor, close_at
+                break
+
+        day += timedelta(days=1)
+
+
+def find_free_slots(busy, window_start, window_end, duration, count, day_start=DEFAULT_DAY_START,
+                    day_end=DEFAULT_DAY_END, alignment=SLOT_ALIGNMENT_MINUTES):
+    """Find the first `count` free slots of a given length in [window_start, window_end).
+
+    Slots start on alignment boundaries inside daily hours and never overlap a
+    busy interval; a long gap yields several back-to-back slots.
+    """
+    slots = []
+    if count <= 0 or duration <= timedelta(0):
+        return slots
+
+    for gap_start, gap_end in iter_free_gaps(busy, window_start, window_end, day_start, day_end):
+        slot_start = align_up(gap_start, alignment)
+        while slot_start + duration <= gap_end:
+            slots.append((slot_start, slot_start + duration))
+            if len(slots) >= count:
+                return slots
+            slot_start = align_up(slot_start + duration, alignment)
+    return slots
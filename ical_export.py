@@ -0,0 +1,201 @@
+"""
+iCalendar export for FamilySphere.
+This module turns event rows into iCalendar (.ics) text one VEVENT at a time,
+so exports can be streamed without building the whole calendar in memory.
+"""
+
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+import pytz
+from icalendar import Calendar, Event as ICalEvent, vText
+
+from recurrence import parse_date
+
+# Event times are stored without a timezone; exports assume Eastern Time
+DEFAULT_TIMEZONE = 'America/New_York'
+
+# Recurrence patterns mapped to RRULE values
+RRULES = {
+    'daily': {'FREQ': 'DAILY'},
+    'weekly': {'FREQ': 'WEEKLY'},
+    'biweekly': {'FREQ': 'WEEKLY', 'INTERVAL': 2},
+    'monthly': {'FREQ': 'MONTHLY'},
+    'yearly': {'FREQ': 'YEARLY'}
+}
+
+CALENDAR_FOOTER = b'END:VCALENDAR\r\n'
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name):
+    """Get a pytz timezone, cached so it is only looked up once per name."""
+    return pytz.timezone(name)
+
+
+def parse_time(value):
+    """Convert an 'HH:MM' or 'HH:MM:SS' string into a time, or None."""
+    if not value:
+        return None
+    if isinstance(value, time):
+        return value
+    return time.fromisoformat(str(value))
+
+
+def calendar_header(calendar_name):
+    """Build the VCALENDAR header lines that precede the events."""
+    cal = Calendar()
+    cal.add('prodid', '-//FamilySphere//familysphere.app//')
+    cal.add('version', '2.0')
+    cal.add('calscale', 'GREGORIAN')
+    cal.add('method', 'PUBLISH')
+    cal.add('x-wr-calname', calendar_name)
+
+    # to_ical() closes the calendar; the footer is written after the events
+    return cal.to_ical()[:-len(CALENDAR_FOOTER)]
+
+
+def parse_timestamp(value):
+    """Convert a stored timestamp into an aware UTC datetime, or None."""
+    if not value:
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = pytz.utc.localize(value)
+    return value.astimezone(pytz.utc)
+
+
+def row_dtstamp(row):
+    """When an event or exception row last changed, so unchanged events export identically.
+
+    A trigger keeps events.updated_at current; exception rows only have created_at.
+    """
+    return parse_timestamp(row.get('updated_at')) or parse_timestamp(row.get('created_at'))
+
+
+def build_vevent(event, organizer_email=None, tz=None, dtstamp=None, exceptions=None):
+    """Build a VEVENT component for an event row.
+
+    ``exceptions`` maps original dates of a series to event_exceptions rows;
+    cancelled occurrences are written as EXDATE values. DTSTAMP and
+    LAST-MODIFIED default to the row's updated_at or created_at, and
+    SEQUENCE counts its edits.
+    """
+    tz = tz or get_timezone(DEFAULT_TIMEZONE)
+    dtstamp = dtstamp or row_dtstamp(event) or datetime.now(pytz.utc)
+
+    vevent = ICalEvent()
+
+    # Required fields
+    vevent.add('summary', event['title'])
+    vevent.add('uid', f"{event['id']}@familysphere.app")
+    vevent.add('dtstamp', dtstamp)
+    vevent.add('last-modified', dtstamp)
+    vevent.add('sequence', event.get('ical_sequence') or 0)
+
+    event_date = parse_date(event['date'])
+    event_time = None if event.get('all_day') else parse_time(event.get('time'))
+
+    if event_time is None:
+        # All-day events use DATE values and end on the following day (per iCalendar spec)
+        vevent.add('dtstart', event_date, parameters={'VALUE': 'DATE'})
+        vevent.add('dtend', event_date + timedelta(days=1), parameters={'VALUE': 'DATE'})
+    else:
+        event_start = tz.localize(datetime.combine(event_date, event_time))
+        vevent.add('dtstart', event_start)
+
+        # Add end time if available, otherwise default to 1 hour
+        end_time = parse_time(event.get('end_time'))
+        if end_time is not None:
+            vevent.add('dtend', tz.localize(datetime.combine(event_date, end_time)))
+        else:
+            vevent.add('dtend', event_start + timedelta(hours=1))
+
+    # Optional fields
+    if event.get('description'):
+        vevent.add('description', event['description'])
+
+    if event.get('location'):
+        vevent.add('location', vText(event['location']))
+
+    if event.get('category'):
+        vevent.add('categories', event['category'])
+
+    # Handle recurring events
+    rrule = RRULES.get(event.get('recurrence_pattern'))
+    if rrule and (event.get('is_recurring') or event.get('recurrence_pattern')):
+        rrule = dict(rrule)
+        if event.get('recurrence_end_date'):
+            rrule['UNTIL'] = parse_date(event['recurrence_end_date'])
+        vevent.add('rrule', rrule)
+
+        # Cancelled occurrences; moved ones are written as overrides instead
+        for original_date, exception in sorted((exceptions or {}).items()):
+            if not exception.get('new_date'):
+                vevent.add('exdate', _occurrence_start(original_date, event_time, tz))
+
+    if organizer_email:
+        vevent.add('organizer', f"mailto:{organizer_email}")
+
+    return vevent
+
+
+def _occurrence_start(occurrence_date, event_time, tz):
+    """Start of one occurrence, as a DATE for all-day events or a localized datetime."""
+    if event_time is None:
+        return occurrence_date
+    return tz.localize(datetime.combine(occurrence_date, event_time))
+
+
+def build_override_vevents(event, exceptions, organizer_email=None, tz=None, dtstamp=None):
+    """Build RECURRENCE-ID overrides for occurrences of a series that were moved."""
+    tz = tz or get_timezone(DEFAULT_TIMEZONE)
+    event_time = None if event.get('all_day') else parse_time(event.get('time'))
+
+    for original_date, exception in sorted(exceptions.items()):
+        if not exception.get('new_date'):
+            continue
+
+        moved_event = dict(event, date=exception['new_date'], is_recurring=False, recurrence_pattern=None)
+        vevent = build_vevent(moved_event, organizer_email, tz,
+                              dtstamp or max(filter(None, (row_dtstamp(event), row_dtstamp(exception))), default=None))
+        vevent.add('recurrence-id', _occurrence_start(original_date, event_time, tz))
+        yield vevent
+
+
+def iter_ics(events, organizer_emails, calendar_name, exceptions_by_event=None, timezone_name=DEFAULT_TIMEZONE,
+             chunk_size=100):
+    """Yield an iCalendar document as byte chunks.
+
+    ``events`` may be any iterable (e.g. a paged database reader); only
+    ``chunk_size`` serialized events are held at a time. ``organizer_emails``
+    maps user IDs to email addresses and ``exceptions_by_event`` groups
+    event_exceptions rows by series; both must be resolved up front.
+    """
+    tz = get_timezone(timezone_name)
+    exceptions_by_event = exceptions_by_event or {}
+
+    yield calendar_header(calendar_name)
+
+    chunk = []
+    for event in events:
+        organizer_email = organizer_emails.get(event.get('created_by'))
+        exceptions = exceptions_by_event.get(event['id'])
+        chunk.append(build_vevent(event, organizer_email, tz, exceptions=exceptions).to_ical())
+
+        if exceptions:
+            for override in build_override_vevents(event, exceptions, organizer_email, tz):
+                chunk.append(override.to_ical())
+
+        if len(chunk) >= chunk_size:
+            yield b''.join(chunk)
+            chunk = []
+
+    if chunk:
+        yield b''.join(chunk)
+
+    yield CALENDAR_FOOTER
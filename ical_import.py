@@ -0,0 +1,204 @@
+"""
+iCalendar import for FamilySphere.
+This module reads uploaded .ics files one VEVENT at a time and maps each one
+to an event row, so large calendars can be imported without loading the whole
+file into memory.
+"""
+
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+from icalendar import Event as ICalEvent
+
+from ical_export import DEFAULT_TIMEZONE, RRULES, get_timezone
+from recurrence import iter_occurrence_dates
+
+# (FREQ, INTERVAL) pairs mapped back to recurrence patterns
+RECURRENCE_PATTERNS_BY_RRULE = {
+    (rule['FREQ'], rule.get('INTERVAL', 1)): pattern for pattern, rule in RRULES.items()
+}
+
+# RRULE BYDAY codes by date.weekday()
+WEEKDAY_CODES = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+# Fields that make up an imported event; a change to any of them is re-imported
+IMPORTED_FIELDS = ('title', 'date', 'time', 'end_date', 'end_time', 'all_day', 'description', 'location',
+                   'is_recurring', 'recurrence_pattern', 'recurrence_end_date')
+
+
+def iter_vevent_blocks(lines):
+    """Yield the raw text of each top-level VEVENT in an iterable of .ics lines.
+
+    Lines may be bytes or str. Only the current VEVENT is held in memory; other
+    components (VTIMEZONE, VTODO, ...) are skipped.
+    """
+    block = None
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        stripped = line.rstrip('\r\n')
+
+        if block is None:
+            if stripped.upper() == 'BEGIN:VEVENT':
+                block = [stripped]
+            continue
+
+        block.append(stripped)
+        # Nested components (VALARM) end with their own END line
+        if stripped.upper() == 'END:VEVENT':
+            yield '\r\n'.join(block) + '\r\n'
+            block = None
+
+
+def _to_local(value, tz):
+    """Convert an aware datetime to naive local time; naive values are assumed local already."""
+    if value.tzinfo is not None:
+        value = value.astimezone(tz)
+    return value.replace(tzinfo=None)
+
+
+def _redundant_by_rules(rrule, start_date):
+    """Get the BY* parts of an RRULE that only restate DTSTART.
+
+    Calendar apps write FREQ=WEEKLY;BYDAY=TU for a weekly event starting on
+    a Tuesday, FREQ=MONTHLY;BYMONTHDAY=15 for one on the 15th, and BYMONTH
+    for the start month of yearly events. Such parts add nothing to the
+    pattern; anything else (several days, "first Monday", ...) does.
+    """
+    redundant = set()
+    by_day = [str(day).upper() for day in rrule.get('BYDAY', [])]
+    if rrule.get('FREQ', [None])[0] == 'WEEKLY' and by_day == [WEEKDAY_CODES[start_date.weekday()]]:
+        redundant.add('BYDAY')
+    if [int(day) for day in rrule.get('BYMONTHDAY', [])] == [start_date.day]:
+        redundant.add('BYMONTHDAY')
+    if rrule.get('FREQ', [None])[0] == 'YEARLY' and [int(month) for month in rrule.get('BYMONTH', [])] == [start_date.month]:
+        redundant.add('BYMONTH')
+    return redundant
+
+
+def _recurrence_fields(rrule, start_date, tz):
+    """Map an RRULE to (pattern, end date), or (None, None) if FamilySphere can't represent it."""
+    freq = rrule.get('FREQ', [None])[0]
+    interval = int(rrule.get('INTERVAL', [1])[0])
+    pattern = RECURRENCE_PATTERNS_BY_RRULE.get((freq, interval))
+
+    unsupported = set(rrule) - {'FREQ', 'INTERVAL', 'UNTIL', 'COUNT', 'WKST'} - _redundant_by_rules(rrule, start_date)
+    if pattern is None or unsupported:
+        return None, None
+
+    until = None
+    if rrule.get('UNTIL'):
+        until = rrule['UNTIL'][0]
+        if isinstance(until, datetime):
+            until = _to_local(until, tz).date()
+    elif rrule.get('COUNT'):
+        count = int(rrule['COUNT'][0])
+        occurrences = list(islice(iter_occurrence_dates(start_date, pattern, start_date, date.max), count))
+        until = occurrences[-1] if occurrences else start_date
+
+    return pattern, until
+
+
+def _warn(warnings, vevent, message):
+    """Record something about a VEVENT that could not be imported as written."""
+    if warnings is not None:
+        warnings.append({
+            'uid': str(vevent.get('uid') or ''),
+            'title': str(vevent.get('summary') or 'Untitled event'),
+            'message': message
+        })
+
+
+def vevent_to_event(vevent, timezone_name=DEFAULT_TIMEZONE, warnings=None):
+    """Map a parsed VEVENT to event row fields, or None if it can't be imported.
+
+    The row has the fields in IMPORTED_FIELDS plus external_uid and
+    import_hash. Cancelled events and RECURRENCE-ID overrides are skipped.
+    Parts of the event that are dropped or simplified (overrides, excluded
+    dates, recurrence rules with no FamilySphere pattern) are appended to
+    warnings when a list is given.
+    """
+    uid = str(vevent.get('uid') or '').strip()
+    dtstart = vevent.get('dtstart')
+    if vevent.get('recurrence-id') is not None:
+        _warn(warnings, vevent, 'A change to a single occurrence was not imported')
+        return None
+    if not uid or dtstart is None:
+        return None
+    if str(vevent.get('status', '')).upper() == 'CANCELLED':
+        return None
+
+    tz = get_timezone(timezone_name)
+    start = dtstart.dt
+    dtend = vevent.get('dtend')
+    end = dtend.dt if dtend is not None else None
+
+    row = {
+        'title': str(vevent.get('summary') or 'Untitled event'),
+        'description': str(vevent['description']) if vevent.get('description') else None,
+        'location': str(vevent['location']) if vevent.get('location') else None,
+        'time': None,
+        'end_date': None,
+        'end_time': None
+    }
+
+    if isinstance(start, datetime):
+        start = _to_local(start, tz)
+        row['date'] = start.date().isoformat()
+        row['time'] = start.strftime('%H:%M:%S')
+        row['all_day'] = False
+        if isinstance(end, datetime):
+            end = _to_local(end, tz)
+            row['end_time'] = end.strftime('%H:%M:%S')
+            if end.date() > start.date():
+                row['end_date'] = end.date().isoformat()
+        start_date = start.date()
+    else:
+        row['date'] = start.isoformat()
+        row['all_day'] = True
+        # DTEND is exclusive for all-day events
+        if isinstance(end, date) and end - timedelta(days=1) > start:
+            row['end_date'] = (end - timedelta(days=1)).isoformat()
+        start_date = start
+
+    pattern, until = (None, None)
+    if vevent.get('rrule'):
+        pattern, until = _recurrence_fields(vevent['rrule'], start_date, tz)
+        if pattern is None:
+            _warn(warnings, vevent, f"Repeat rule {vevent['rrule'].to_ical().decode()} is not supported; "
+                                    f"imported as a single event")
+        elif vevent.get('exdate') is not None:
+            _warn(warnings, vevent, 'Skipped occurrences (EXDATE) were not imported')
+    row['is_recurring'] = pattern is not None
+    row['recurrence_pattern'] = pattern
+    row['recurrence_end_date'] = until.isoformat() if until else None
+
+    row['external_uid'] = uid
+    row['import_hash'] = content_hash(row)
+    return row
+
+
+def content_hash(row):
+    """Hash the imported fields of an event row, used to skip unchanged events on re-import."""
+    content = json.dumps([row.get(field) for field in IMPORTED_FIELDS], default=str)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def iter_import_rows(lines, timezone_name=DEFAULT_TIMEZONE, warnings=None):
+    """Yield event rows for each importable VEVENT in an iterable of .ics lines.
+
+    Events that are skipped or simplified are reported in warnings, if given.
+    """
+    for block in iter_vevent_blocks(lines):
+        try:
+            vevent = ICalEvent.from_ical(block)
+        except ValueError:
+            if warnings is not None:
+                warnings.append({'uid': '', 'title': '', 'message': 'An event could not be read and was skipped'})
+            continue
+
+        row = vevent_to_event(vevent, timezone_name, warnings)
+        if row is not None:
+            yield row
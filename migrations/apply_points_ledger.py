@@ -0,0 +1,60 @@
+"""
+Apply the points ledger migration to Supabase database.
+This script reads the SQL migration file and executes it using the Supabase client.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from supabase_config import supabase
+
+def split_statements(sql):
+    """Split SQL on semicolons, keeping $$-quoted function bodies intact."""
+    statements = ['']
+    for i, part in enumerate(sql.split('$$')):
+        if i % 2:
+            # Inside a function body
+            statements[-1] += '$$' + part + '$$'
+        else:
+            pieces = part.split(';')
+            statements[-1] += pieces[0]
+            statements.extend(pieces[1:])
+    return [s.strip() for s in statements if s.strip()]
+
+def apply_migration():
+    """Apply the points ledger migration."""
+    try:
+        # Read the migration SQL
+        migration_path = Path(__file__).parent / 'points_ledger.sql'
+        with open(migration_path, 'r') as f:
+            migration_sql = f.read()
+
+        # Split the migration into individual statements
+        statements = split_statements(migration_sql)
+
+        # Execute each statement
+        for statement in statements:
+            try:
+                # Use the rpc function to execute raw SQL
+                supabase.rpc('exec_sql', {'sql': statement}).execute()
+                print(f"Successfully executed statement")
+            except Exception as e:
+                print(f"Error executing statement: {e}")
+                print("Statement:", statement)
+                raise
+
+        print("Points ledger migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"Error applying migration: {e}")
+        return False
+
+if __name__ == '__main__':
+    success = apply_migration()
+    sys.exit(0 if success else 1)
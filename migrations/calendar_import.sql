@@ -0,0 +1,10 @@
+-- Calendar Import Migration
+-- Tracks which external calendar event each imported row came from, so
+-- re-imports only rewrite events that changed.
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS external_uid TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS import_hash TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS import_source TEXT;
+
+-- One event per external UID in a family
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_family_external_uid ON events(family_id, external_uid) WHERE external_uid IS NOT NULL;
@@ -0,0 +1,79 @@
+-- Calendar Subscriptions Migration
+-- Token-authenticated iCal feeds and the cached snapshots they serve.
+
+CREATE TABLE IF NOT EXISTS calendar_subscriptions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    token TEXT UNIQUE NOT NULL,
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    created_by UUID REFERENCES users(id) ON DELETE SET NULL,
+    category TEXT, -- NULL for all categories
+    member_id UUID REFERENCES users(id) ON DELETE CASCADE, -- NULL for all members
+    include_shared BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_calendar_subscriptions_family ON calendar_subscriptions(family_id);
+
+-- One generated iCal document per family and filter combination.
+-- Rows are deleted whenever the family's events, shares or exceptions change.
+CREATE TABLE IF NOT EXISTS calendar_snapshots (
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    filter_key TEXT NOT NULL,
+    ical TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    generated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (family_id, filter_key)
+);
+
+-- When each event last changed, for DTSTAMP and LAST-MODIFIED in feeds, and
+-- how many times, for SEQUENCE. Existing events start from their creation.
+ALTER TABLE events ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS ical_sequence INTEGER NOT NULL DEFAULT 0;
+
+UPDATE events SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
+
+ALTER TABLE events ALTER COLUMN updated_at SET DEFAULT NOW();
+
+-- Bump both whenever a field that appears in the feed changes. Writes that
+-- only touch bookkeeping columns, like next_reminder_at, leave them alone.
+CREATE OR REPLACE FUNCTION touch_event_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF (NEW.title, NEW.description, NEW.date, NEW.time, NEW.end_date, NEW.end_time, NEW.all_day,
+      NEW.location, NEW.category, NEW.is_recurring, NEW.recurrence_pattern, NEW.recurrence_end_date)
+     IS DISTINCT FROM
+     (OLD.title, OLD.description, OLD.date, OLD.time, OLD.end_date, OLD.end_time, OLD.all_day,
+      OLD.location, OLD.category, OLD.is_recurring, OLD.recurrence_pattern, OLD.recurrence_end_date) THEN
+    NEW.updated_at := NOW();
+    NEW.ical_sequence := OLD.ical_sequence + 1;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS events_touch_updated_at ON events;
+
+CREATE TRIGGER events_touch_updated_at
+BEFORE UPDATE ON events
+FOR EACH ROW EXECUTE FUNCTION touch_event_updated_at();
+
+-- Moving or cancelling an occurrence changes the series as exported
+CREATE OR REPLACE FUNCTION touch_event_for_exception()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE events
+  SET updated_at = NOW(), ical_sequence = ical_sequence + 1
+  WHERE id = COALESCE(NEW.event_id, OLD.event_id);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS event_exceptions_touch_event ON event_exceptions;
+
+CREATE TRIGGER event_exceptions_touch_event
+AFTER INSERT OR UPDATE OR DELETE ON event_exceptions
+FOR EACH ROW EXECUTE FUNCTION touch_event_for_exception();
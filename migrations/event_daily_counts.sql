@@ -0,0 +1,55 @@
+-- Event Daily Counts Migration
+-- Per-family count of single events on each day, kept up to date by a
+-- trigger on events so long-range views never read raw event rows. Recurring
+-- series are not counted here, as their occurrences are expanded when read.
+
+CREATE TABLE IF NOT EXISTS event_daily_counts (
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (family_id, day)
+);
+
+CREATE OR REPLACE FUNCTION update_event_daily_counts()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE')
+     AND OLD.family_id IS NOT NULL
+     AND NOT (COALESCE(OLD.is_recurring, false)
+              AND COALESCE(OLD.recurrence_pattern, '') IN ('daily', 'weekly', 'biweekly', 'monthly', 'yearly')) THEN
+    UPDATE event_daily_counts SET event_count = event_count - 1
+    WHERE family_id = OLD.family_id AND day = OLD.date;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE')
+     AND NEW.family_id IS NOT NULL
+     AND NOT (COALESCE(NEW.is_recurring, false)
+              AND COALESCE(NEW.recurrence_pattern, '') IN ('daily', 'weekly', 'biweekly', 'monthly', 'yearly')) THEN
+    INSERT INTO event_daily_counts (family_id, day, event_count)
+    VALUES (NEW.family_id, NEW.date, 1)
+    ON CONFLICT (family_id, day) DO UPDATE SET
+      event_count = event_daily_counts.event_count + 1;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS event_daily_counts_trigger ON events;
+
+CREATE TRIGGER event_daily_counts_trigger
+AFTER INSERT OR UPDATE OF date, family_id, is_recurring, recurrence_pattern OR DELETE ON events
+FOR EACH ROW EXECUTE FUNCTION update_event_daily_counts();
+
+-- Backfill counts from existing events
+INSERT INTO event_daily_counts (family_id, day, event_count)
+SELECT family_id, date, COUNT(*)
+FROM events
+WHERE family_id IS NOT NULL
+  AND NOT (COALESCE(is_recurring, false)
+           AND COALESCE(recurrence_pattern, '') IN ('daily', 'weekly', 'biweekly', 'monthly', 'yearly'))
+GROUP BY family_id, date
+ON CONFLICT (family_id, day) DO UPDATE SET
+  event_count = EXCLUDED.event_count;
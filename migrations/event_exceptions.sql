@@ -0,0 +1,17 @@
+-- Event Exceptions Migration
+-- Per-instance moves of recurring events, applied by the recurrence engine.
+
+CREATE TABLE IF NOT EXISTS event_exceptions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    original_date DATE NOT NULL,
+    new_date DATE, -- NULL cancels the occurrence
+    end_date DATE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- One move per occurrence, looked up by series when expanding
+CREATE UNIQUE INDEX IF NOT EXISTS idx_event_exceptions_event_original ON event_exceptions(event_id, original_date);
+
+-- Recurring series are loaded per family and bounded by start date
+CREATE INDEX IF NOT EXISTS idx_events_family_recurring ON events(family_id, date) WHERE is_recurring;
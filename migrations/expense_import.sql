@@ -0,0 +1,8 @@
+-- Expense Import Migration
+-- Hash of each imported expense's (date, amount, description), so
+-- re-importing a bank statement skips the expenses it already added.
+
+ALTER TABLE finances ADD COLUMN IF NOT EXISTS import_hash TEXT;
+
+-- One expense per hash in a family. Rows entered by hand have no hash
+CREATE UNIQUE INDEX IF NOT EXISTS idx_finances_family_import_hash ON finances(family_id, import_hash);
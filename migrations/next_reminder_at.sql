@@ -0,0 +1,13 @@
+-- Next Reminder Migration
+-- Stores when each event's next reminder fires (the next occurrence for a
+-- recurring series). The web app sets it when events or reminder preferences
+-- change, and the reminder worker fills it in for existing events and advances it
+-- for series after each reminder is sent.
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS next_reminder_at TIMESTAMP;
+
+-- Reminders page: a family's upcoming reminders in fire-time order
+CREATE INDEX IF NOT EXISTS idx_events_family_next_reminder ON events(family_id, next_reminder_at) WHERE reminder_enabled;
+
+-- Reminder worker: every reminder firing in the next few minutes
+CREATE INDEX IF NOT EXISTS idx_events_next_reminder ON events(next_reminder_at) WHERE reminder_enabled;
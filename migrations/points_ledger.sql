@@ -0,0 +1,125 @@
+-- Points Ledger Migration
+-- Append-only record of every points change, plus per-member running totals
+-- and weekly/monthly buckets kept up to date by a trigger on the ledger, so
+-- leaderboards read one row per member instead of every task.
+
+CREATE TABLE IF NOT EXISTS points_ledger (
+    id BIGSERIAL PRIMARY KEY,
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    task_id UUID, -- no foreign key: entries outlive deleted tasks
+    points INTEGER NOT NULL, -- negative for reversals
+    reason TEXT NOT NULL, -- task_completed, task_reopened, auction_won
+    bid_points INTEGER, -- winning bid of an auction_won entry, which moves no points itself
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_points_ledger_family ON points_ledger(family_id, id);
+CREATE INDEX IF NOT EXISTS idx_points_ledger_task ON points_ledger(task_id, reason);
+
+CREATE TABLE IF NOT EXISTS member_points (
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    total_points INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (family_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS member_points_buckets (
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    period TEXT NOT NULL, -- week (starting Monday) or month
+    period_start DATE NOT NULL,
+    points INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (family_id, period, period_start, user_id)
+);
+
+-- Ledger rows are never changed, and corrections are new rows. Deletes are only
+-- allowed when cascading from a removed family or user.
+CREATE OR REPLACE FUNCTION reject_points_ledger_changes()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'DELETE' AND pg_trigger_depth() > 1 THEN
+    RETURN OLD;
+  END IF;
+  RAISE EXCEPTION 'points_ledger is append-only';
+END;
+$$;
+
+DROP TRIGGER IF EXISTS points_ledger_append_only ON points_ledger;
+
+CREATE TRIGGER points_ledger_append_only
+BEFORE UPDATE OR DELETE ON points_ledger
+FOR EACH ROW EXECUTE FUNCTION reject_points_ledger_changes();
+
+CREATE OR REPLACE FUNCTION apply_points_ledger_entry()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  -- Entries that move no points, like auction wins, leave the totals alone
+  IF NEW.points = 0 THEN
+    RETURN NULL;
+  END IF;
+
+  INSERT INTO member_points (family_id, user_id, total_points)
+  VALUES (NEW.family_id, NEW.user_id, NEW.points)
+  ON CONFLICT (family_id, user_id) DO UPDATE SET
+    total_points = member_points.total_points + EXCLUDED.total_points;
+
+  INSERT INTO member_points_buckets (family_id, user_id, period, period_start, points)
+  VALUES (NEW.family_id, NEW.user_id, 'week', date_trunc('week', NEW.created_at AT TIME ZONE 'UTC')::date, NEW.points),
+         (NEW.family_id, NEW.user_id, 'month', date_trunc('month', NEW.created_at AT TIME ZONE 'UTC')::date, NEW.points)
+  ON CONFLICT (family_id, period, period_start, user_id) DO UPDATE SET
+    points = member_points_buckets.points + EXCLUDED.points;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS points_ledger_aggregates ON points_ledger;
+
+CREATE TRIGGER points_ledger_aggregates
+AFTER INSERT ON points_ledger
+FOR EACH ROW EXECUTE FUNCTION apply_points_ledger_entry();
+
+-- Rebuild a family's totals and buckets from its ledger in one pass, for audits.
+-- Returns the members whose stored total disagreed with the ledger.
+CREATE OR REPLACE FUNCTION recompute_member_points(p_family_id UUID)
+RETURNS TABLE (member_id UUID, stored_points INTEGER, ledger_points INTEGER)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  -- Keep ledger inserts from interleaving with the rebuild
+  LOCK TABLE points_ledger IN SHARE ROW EXCLUSIVE MODE;
+
+  RETURN QUERY
+  SELECT COALESCE(stored.user_id, ledger.user_id),
+         COALESCE(stored.total_points, 0),
+         COALESCE(ledger.total_points, 0)::INTEGER
+  FROM (SELECT mp.user_id, mp.total_points FROM member_points mp WHERE mp.family_id = p_family_id) stored
+  FULL JOIN (SELECT pl.user_id, SUM(pl.points) AS total_points
+             FROM points_ledger pl WHERE pl.family_id = p_family_id GROUP BY pl.user_id) ledger
+    ON stored.user_id = ledger.user_id
+  WHERE COALESCE(stored.total_points, 0) <> COALESCE(ledger.total_points, 0);
+
+  DELETE FROM member_points mp WHERE mp.family_id = p_family_id;
+  DELETE FROM member_points_buckets mb WHERE mb.family_id = p_family_id;
+
+  INSERT INTO member_points (family_id, user_id, total_points)
+  SELECT pl.family_id, pl.user_id, SUM(pl.points)
+  FROM points_ledger pl WHERE pl.family_id = p_family_id AND pl.points <> 0
+  GROUP BY pl.family_id, pl.user_id;
+
+  INSERT INTO member_points_buckets (family_id, user_id, period, period_start, points)
+  SELECT pl.family_id, pl.user_id, buckets.period, buckets.period_start, SUM(pl.points)
+  FROM points_ledger pl
+  CROSS JOIN LATERAL (VALUES
+    ('week', date_trunc('week', pl.created_at AT TIME ZONE 'UTC')::date),
+    ('month', date_trunc('month', pl.created_at AT TIME ZONE 'UTC')::date)
+  ) AS buckets(period, period_start)
+  WHERE pl.family_id = p_family_id AND pl.points <> 0
+  GROUP BY pl.family_id, pl.user_id, buckets.period, buckets.period_start;
+END;
+$$;
@@ -0,0 +1,12 @@
+-- Print Snapshots Migration
+-- Rendered print_calendar bodies per family and filter combination.
+-- Rows are deleted whenever the family's events, shares or exceptions change.
+
+CREATE TABLE IF NOT EXISTS print_snapshots (
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    filter_key TEXT NOT NULL, -- start|end|category|member|view|shared
+    title TEXT NOT NULL,
+    html TEXT NOT NULL,
+    generated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (family_id, filter_key)
+);
@@ -0,0 +1,27 @@
+-- Recurring Tasks Migration
+-- Task series (repeating chores) whose occurrences the worker creates as
+-- ordinary tasks a rolling horizon ahead.
+
+CREATE TABLE IF NOT EXISTS task_series (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT,
+    points INTEGER DEFAULT 0,
+    assigned_to UUID REFERENCES users(id) ON DELETE SET NULL,
+    recurrence_pattern TEXT NOT NULL, -- daily, weekly, biweekly, monthly or yearly
+    start_date DATE NOT NULL,
+    end_date DATE,
+    next_due_date DATE, -- first occurrence that has no task yet, NULL once the series has ended
+    active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_by UUID REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- The generator only reads series with an occurrence inside its horizon
+CREATE INDEX IF NOT EXISTS idx_task_series_next_due ON task_series(next_due_date) WHERE active;
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS series_id UUID REFERENCES task_series(id) ON DELETE SET NULL;
+
+-- One task per series occurrence, so repeated or concurrent generator runs never duplicate one
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_series_due ON tasks(series_id, due_date);
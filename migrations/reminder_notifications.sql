@@ -0,0 +1,27 @@
+-- Reminder Notifications Migration
+-- Push channel for server-side event reminders. The reminder worker inserts
+-- into notifications, and calendar pages receive the rows through Supabase realtime.
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    event_id TEXT, -- occurrence IDs of recurring events are not UUIDs
+    event_date TEXT,
+    notification_method TEXT DEFAULT 'app',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_notifications_family_created ON notifications(family_id, created_at);
+
+-- One row per reminder sent, so the primary key makes delivery exactly-once
+CREATE TABLE IF NOT EXISTS reminder_deliveries (
+    event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    occurrence_date DATE NOT NULL,
+    delivered_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (event_id, occurrence_date)
+);
+
+-- Broadcast new notifications to subscribed clients
+ALTER PUBLICATION supabase_realtime ADD TABLE notifications;
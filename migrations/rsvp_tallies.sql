@@ -0,0 +1,62 @@
+-- RSVP Tallies Migration
+-- Per-event response counts, kept up to date by a trigger on event_rsvps so
+-- counts never require reading every RSVP row.
+
+CREATE TABLE IF NOT EXISTS event_rsvp_tallies (
+    event_id TEXT PRIMARY KEY, -- series occurrences are tallied under their instance ID
+    yes_count INTEGER NOT NULL DEFAULT 0,
+    maybe_count INTEGER NOT NULL DEFAULT 0,
+    no_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- RSVPs are read per event
+CREATE INDEX IF NOT EXISTS idx_event_rsvps_event ON event_rsvps(event_id);
+
+CREATE OR REPLACE FUNCTION update_event_rsvp_tallies()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    UPDATE event_rsvp_tallies SET
+      yes_count = yes_count - (OLD.response = 'yes')::int,
+      maybe_count = maybe_count - (OLD.response = 'maybe')::int,
+      no_count = no_count - (OLD.response = 'no')::int,
+      updated_at = NOW()
+    WHERE event_id = OLD.event_id::text;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO event_rsvp_tallies (event_id, yes_count, maybe_count, no_count)
+    VALUES (NEW.event_id::text, (NEW.response = 'yes')::int, (NEW.response = 'maybe')::int, (NEW.response = 'no')::int)
+    ON CONFLICT (event_id) DO UPDATE SET
+      yes_count = event_rsvp_tallies.yes_count + EXCLUDED.yes_count,
+      maybe_count = event_rsvp_tallies.maybe_count + EXCLUDED.maybe_count,
+      no_count = event_rsvp_tallies.no_count + EXCLUDED.no_count,
+      updated_at = NOW();
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS event_rsvp_tallies_trigger ON event_rsvps;
+
+CREATE TRIGGER event_rsvp_tallies_trigger
+AFTER INSERT OR UPDATE OF response OR DELETE ON event_rsvps
+FOR EACH ROW EXECUTE FUNCTION update_event_rsvp_tallies();
+
+-- Backfill tallies from existing RSVPs
+INSERT INTO event_rsvp_tallies (event_id, yes_count, maybe_count, no_count)
+SELECT event_id::text,
+       COUNT(*) FILTER (WHERE response = 'yes'),
+       COUNT(*) FILTER (WHERE response = 'maybe'),
+       COUNT(*) FILTER (WHERE response = 'no')
+FROM event_rsvps
+GROUP BY event_id
+ON CONFLICT (event_id) DO UPDATE SET
+  yes_count = EXCLUDED.yes_count,
+  maybe_count = EXCLUDED.maybe_count,
+  no_count = EXCLUDED.no_count,
+  updated_at = NOW();
@@ -0,0 +1,21 @@
+-- Shared Events Index Migration
+-- Normalizes events.shared_with into shared_events so that events shared with a
+-- family can be read with one indexed lookup keyed by the recipient family.
+
+-- Composite index covering the recipient lookup and the join back to events
+CREATE INDEX IF NOT EXISTS idx_shared_events_family_event ON shared_events(shared_with_family_id, event_id);
+
+-- Index used when filtering family events by date
+CREATE INDEX IF NOT EXISTS idx_events_family_date ON events(family_id, date);
+
+-- Backfill the index from shared_with. The column is UUID[] where
+-- family_connections.sql created it and comma-separated text on older schemas.
+-- Both read the same as text once the array braces and quotes are stripped.
+INSERT INTO shared_events (event_id, shared_with_family_id, shared_by_user_id)
+SELECT e.id, TRIM(BOTH ' "' FROM f.family_id)::uuid, e.created_by
+FROM events e
+CROSS JOIN LATERAL unnest(string_to_array(TRIM(BOTH '{}' FROM e.shared_with::text), ',')) AS f(family_id)
+WHERE e.shared_with IS NOT NULL
+  AND e.created_by IS NOT NULL
+  AND TRIM(BOTH ' "' FROM f.family_id) <> ''
+ON CONFLICT (event_id, shared_with_family_id) DO NOTHING;
@@ -0,0 +1,38 @@
+-- Task Alerts Migration
+-- Alerts already sent for overdue and due-soon tasks, and per-family counts
+-- of such tasks for the dashboard badge, both written by the worker.
+
+CREATE TABLE IF NOT EXISTS task_alerts (
+    task_id UUID NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL, -- overdue or due_soon
+    due_date DATE NOT NULL, -- a new due date gets new alerts
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (task_id, kind, due_date)
+);
+
+CREATE TABLE IF NOT EXISTS family_task_counts (
+    family_id UUID PRIMARY KEY REFERENCES families(id) ON DELETE CASCADE,
+    overdue_count INTEGER NOT NULL DEFAULT 0,
+    due_soon_count INTEGER NOT NULL DEFAULT 0,
+    scanned_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- The scanner's per-family range queries on pending tasks use
+-- idx_tasks_family_status_due from the task listing migration
+CREATE INDEX IF NOT EXISTS idx_tasks_family_status_due ON tasks(family_id, status, due_date);
+
+-- Overdue and due-soon counts of a batch of families in one grouped query
+CREATE OR REPLACE FUNCTION count_family_task_alerts(p_family_ids UUID[], p_today DATE, p_soon_end DATE)
+RETURNS TABLE (family_id UUID, overdue_count INTEGER, due_soon_count INTEGER)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT t.family_id,
+           COUNT(*) FILTER (WHERE t.due_date < p_today)::INTEGER,
+           COUNT(*) FILTER (WHERE t.due_date >= p_today)::INTEGER
+    FROM tasks t
+    WHERE t.family_id = ANY(p_family_ids)
+      AND t.status = 'Pending'
+      AND t.due_date <= p_soon_end
+    GROUP BY t.family_id;
+$$;
@@ -0,0 +1,29 @@
+-- Task Auctions Migration
+-- Chore auctions: every bid is recorded, and each auction row holds the
+-- current best (lowest) bid, which is replaced only by a conditional update.
+
+CREATE TABLE IF NOT EXISTS task_auctions (
+    task_id UUID PRIMARY KEY REFERENCES tasks(id) ON DELETE CASCADE,
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'open', -- open or closed
+    closes_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    best_bid INTEGER,
+    best_bidder UUID REFERENCES users(id) ON DELETE SET NULL,
+    best_bid_id UUID,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- The worker looks up open auctions that are due to close
+CREATE INDEX IF NOT EXISTS idx_task_auctions_open_closes ON task_auctions(closes_at) WHERE status = 'open';
+
+CREATE TABLE IF NOT EXISTS task_bids (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    task_id UUID NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    family_id UUID NOT NULL REFERENCES families(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    points INTEGER NOT NULL CHECK (points > 0),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_bids_task ON task_bids(task_id, points);
@@ -0,0 +1,16 @@
+-- Task Listing Migration
+-- Completion times for keyset pagination of completed tasks, and indexes
+-- that serve the pending and completed lists without scanning a family's
+-- whole task history.
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP WITH TIME ZONE;
+
+-- Tasks completed before this column existed sort by when they were created
+UPDATE tasks SET completed_at = created_at WHERE status = 'Completed' AND completed_at IS NULL;
+
+-- Pending tasks by due date
+CREATE INDEX IF NOT EXISTS idx_tasks_family_status_due ON tasks(family_id, status, due_date);
+
+-- Completed tasks, newest first, matching the (completed_at, id) page cursor
+CREATE INDEX IF NOT EXISTS idx_tasks_family_completed ON tasks(family_id, completed_at DESC, id DESC)
+    WHERE status = 'Completed';
@@ -0,0 +1,202 @@
+"""
+Recurrence expansion for FamilySphere calendar events.
+This module expands recurring events into concrete occurrences over a bounded
+date window and applies per-instance moves stored in event_exceptions.
+"""
+
+from datetime import date, datetime, timedelta
+
+# Fixed-length patterns, in days between occurrences
+DAY_STEPS = {
+    'daily': 1,
+    'weekly': 7,
+    'biweekly': 14
+}
+
+RECURRENCE_PATTERNS = ('daily', 'weekly', 'biweekly', 'monthly', 'yearly')
+
+
+def parse_date(value):
+    """Convert a date, datetime or ISO date string into a date."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def is_recurring_event(event):
+    """Check whether an event row describes a recurring series."""
+    return bool(event.get('is_recurring')) and event.get('recurrence_pattern') in RECURRENCE_PATTERNS
+
+
+def event_span(event):
+    """Days a (possibly multi-day) event runs past its start date: 0 for single-day events."""
+    end_date = parse_date(event.get('end_date'))
+    if end_date is None:
+        return 0
+    return max((end_date - parse_date(event['date'])).days, 0)
+
+
+def overlaps_window(event, window_start, window_end):
+    """Check whether an event or occurrence runs on any day of [window_start, window_end)."""
+    start = parse_date(event['date'])
+    end = parse_date(event.get('end_date')) or start
+    return start < window_end and max(start, end) >= window_start
+
+
+def occurrence_id(event_id, original_date):
+    """Build the synthetic ID used for a single occurrence of a series."""
+    return f"{event_id}_{original_date.isoformat()}"
+
+
+def _month_occurrence(start, months):
+    """Return start shifted by a number of months, or None if that day doesn't exist."""
+    month_index = start.month - 1 + months
+    year = start.year + month_index // 12
+    month = month_index % 12 + 1
+    try:
+        return date(year, month, start.day)
+    except ValueError:
+        return None
+
+
+def iter_occurrence_dates(start, pattern, window_start, window_end, until=None):
+    """Lazily yield the dates of a series that fall in [window_start, window_end).
+
+    Occurrences before the window are skipped arithmetically rather than
+    generated. Monthly and yearly series skip months where the start day does
+    not exist (e.g. the 31st), matching RRULE semantics used by the iCal export.
+    """
+    if until is not None and until < window_end:
+        window_end = until + timedelta(days=1)
+
+    if window_start < start:
+        window_start = start
+
+    if window_start >= window_end:
+        return
+
+    if pattern in DAY_STEPS:
+        step = DAY_STEPS[pattern]
+        skipped = -(-(window_start - start).days // step)
+        current = start + timedelta(days=skipped * step)
+        while current < window_end:
+            yield current
+            current += timedelta(days=step)
+
+    elif pattern in ('monthly', 'yearly'):
+        months_per_step = 1 if pattern == 'monthly' else 12
+        elapsed = (window_start.year - start.year) * 12 + window_start.month - start.month
+        n = max(elapsed // months_per_step, 0)
+        while True:
+            months = n * months_per_step
+            month_index = start.month - 1 + months
+            if date(start.year + month_index // 12, month_index % 12 + 1, 1) >= window_end:
+                break
+            current = _month_occurrence(start, months)
+            if current is not None and window_start <= current < window_end:
+                yield current
+            n += 1
+
+
+def is_occurrence_date(start, pattern, candidate, until=None):
+    """Check whether a date is one of a series' occurrence dates."""
+    return next(iter_occurrence_dates(start, pattern, candidate, candidate + timedelta(days=1), until), None) is not None
+
+
+def expand_event(event, window_start, window_end, exceptions=None):
+    """Yield the occurrences of an event that overlap [window_start, window_end).
+
+    Non-recurring events are yielded unchanged when they run on a day of the
+    window; multi-day events that started before it are included. For a
+    recurring series each occurrence is a copy of the base event with a
+    synthetic ``<base>_<original date>`` ID. ``exceptions`` maps an original
+    date to its event_exceptions row; an occurrence is moved to the row's
+    new_date, or dropped when new_date is empty.
+    """
+    window_start = parse_date(window_start)
+    window_end = parse_date(window_end)
+    event_date = parse_date(event['date'])
+
+    if not is_recurring_event(event):
+        if overlaps_window(event, window_start, window_end):
+            yield event
+        return
+
+    exceptions = exceptions or {}
+    pattern = event['recurrence_pattern']
+    until = parse_date(event.get('recurrence_end_date'))
+
+    # Occurrences starting up to a series' length before the window still run into it
+    expand_start = window_start - timedelta(days=event_span(event))
+
+    for original_date in iter_occurrence_dates(event_date, pattern, expand_start, window_end, until):
+        exception = exceptions.get(original_date)
+        if exception is None:
+            yield _make_occurrence(event, original_date, original_date)
+            continue
+
+        new_date = parse_date(exception.get('new_date'))
+        if new_date is not None:
+            occurrence = _make_occurrence(event, original_date, new_date, exception)
+            if overlaps_window(occurrence, window_start, window_end):
+                yield occurrence
+
+    # Occurrences moved into the window from outside it
+    for original_date, exception in exceptions.items():
+        if expand_start <= original_date < window_end:
+            continue
+
+        new_date = parse_date(exception.get('new_date'))
+        if new_date is None or not is_occurrence_date(event_date, pattern, original_date, until):
+            continue
+
+        occurrence = _make_occurrence(event, original_date, new_date, exception)
+        if overlaps_window(occurrence, window_start, window_end):
+            yield occurrence
+
+
+def _make_occurrence(event, original_date, occurrence_date, exception=None):
+    """Copy a base event into a single occurrence.
+
+    A multi-day series keeps its length: the occurrence's end_date is the
+    base event's shifted to the occurrence date, unless an exception sets it.
+    """
+    occurrence = dict(event)
+    occurrence['id'] = occurrence_id(event['id'], original_date)
+    occurrence['date'] = occurrence_date.isoformat()
+    occurrence['base_event_id'] = event['id']
+    occurrence['original_date'] = original_date.isoformat()
+    occurrence['is_instance'] = True
+
+    base_end_date = parse_date(event.get('end_date'))
+    if exception is not None and exception.get('end_date'):
+        occurrence['end_date'] = exception['end_date']
+    elif base_end_date is not None:
+        occurrence['end_date'] = (base_end_date + (occurrence_date - parse_date(event['date']))).isoformat()
+
+    return occurrence
+
+
+def group_exceptions(exception_rows):
+    """Group event_exceptions rows into {event_id: {original_date: row}}."""
+    grouped = {}
+    for row in exception_rows:
+        original_date = parse_date(row.get('original_date'))
+        if original_date is None:
+            continue
+        grouped.setdefault(row['event_id'], {})[original_date] = row
+    return grouped
+
+
+def expand_events(events, window_start, window_end, exceptions_by_event=None):
+    """Expand a list of events into the occurrences overlapping [window_start, window_end), sorted by date."""
+    exceptions_by_event = exceptions_by_event or {}
+    occurrences = []
+    for event in events:
+        occurrences.extend(expand_event(event, window_start, window_end, exceptions_by_event.get(event['id'])))
+    occurrences.sort(key=lambda occurrence: (occurrence['date'], occurrence.get('time') or ''))
+    return occurrences
@@ -0,0 +1,126 @@
+"""
+Event reminder scheduling for FamilySphere.
+This module works out when event reminders fire and keeps upcoming ones in a
+priority queue, so a single background worker can deliver each reminder on
+time instead of every open calendar polling for them.
+"""
+
+import heapq
+from datetime import datetime, time, timedelta
+
+from ical_export import DEFAULT_TIMEZONE, get_timezone, parse_time
+from recurrence import expand_event, is_recurring_event, parse_date
+
+# Used when an event has reminders enabled but no lead time
+DEFAULT_REMINDER_MINUTES = 60
+
+# Windows searched, in days, for the next occurrence of a series; the last covers yearly series
+NEXT_OCCURRENCE_SEARCH_DAYS = (62, 370, 1500)
+
+
+def local_now(timezone_name=DEFAULT_TIMEZONE):
+    """Current time as a naive datetime in the timezone event times are stored in."""
+    return datetime.now(get_timezone(timezone_name)).replace(tzinfo=None)
+
+
+def event_start(event):
+    """Start of an event as a naive datetime; all-day events start at midnight."""
+    return datetime.combine(parse_date(event['date']), parse_time(event.get('time')) or time(0))
+
+
+def reminder_minutes(event):
+    """Minutes before the event that its reminder fires."""
+    try:
+        return int(event.get('reminder_time') or DEFAULT_REMINDER_MINUTES)
+    except (TypeError, ValueError):
+        return DEFAULT_REMINDER_MINUTES
+
+
+def reminder_fire_time(event):
+    """When an event's reminder should fire."""
+    return event_start(event) - timedelta(minutes=reminder_minutes(event))
+
+
+def next_reminder(event, after, exceptions=None):
+    """Find the next reminder of an event that fires at or after a time.
+
+    Returns (fire_at, event) where event is the event itself or the
+    occurrence of a recurring series the reminder is for, or None when
+    reminders are off or the series has ended. A one-off event always returns
+    its own reminder, even when that has already fired.
+    """
+    if not event.get('reminder_enabled'):
+        return None
+
+    if not is_recurring_event(event):
+        return reminder_fire_time(event), event
+
+    # Occurrences starting before this date fired their reminders before `after`
+    search_start = (after + timedelta(minutes=reminder_minutes(event))).date()
+    for days in NEXT_OCCURRENCE_SEARCH_DAYS:
+        upcoming = [(reminder_fire_time(occurrence), occurrence)
+                    for occurrence in expand_event(event, search_start, search_start + timedelta(days=days), exceptions)]
+        upcoming = [entry for entry in upcoming if entry[0] >= after]
+        if upcoming:
+            return min(upcoming, key=lambda entry: entry[0])
+    return None
+
+
+def next_reminder_at(event, after, exceptions=None):
+    """Value for events.next_reminder_at: an ISO timestamp of the next reminder, or None."""
+    reminder = next_reminder(event, after, exceptions)
+    return reminder[0].isoformat() if reminder else None
+
+
+def reminder_key(event):
+    """Identify one reminder as (event ID, occurrence date).
+
+    Occurrences of a recurring series use the series ID and their original
+    date, so a moved occurrence still has a single reminder.
+    """
+    return (event.get('base_event_id') or event['id'], event.get('original_date') or str(event['date'])[:10])
+
+
+class ReminderQueue:
+    """Min-heap of upcoming reminders ordered by fire time.
+
+    Each entry is (fire_at, key, event); a key is only queued once.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._keys = set()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, fire_at, key, event):
+        """Queue a reminder; returns False if one with the same key is already queued."""
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        heapq.heappush(self._heap, (fire_at, key, event))
+        return True
+
+    def replace(self, entries):
+        """Replace the queue contents with (fire_at, key, event) entries."""
+        self._heap = []
+        self._keys = set()
+        for fire_at, key, event in entries:
+            if key not in self._keys:
+                self._keys.add(key)
+                self._heap.append((fire_at, key, event))
+        heapq.heapify(self._heap)
+
+    def next_fire_time(self):
+        """Fire time of the earliest queued reminder, or None if the queue is empty."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Remove and return every entry whose fire time is at or before now, earliest first."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            self._keys.discard(entry[1])
+            due.append(entry)
+        return due
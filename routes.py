@@ -5,6 +5,8 @@ import random
 import string
 import json
 import traceback
+import itertools
+import threading
 import requests
 from datetime import date, datetime, timedelta
 from database import db
@@ -17,6 +19,19 @@ import uuid
 import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from recurrence import (RECURRENCE_PATTERNS, event_span, expand_events, group_exceptions, is_occurrence_date,
+                        is_recurring_event, iter_occurrence_dates, parse_date)
+from family_cache import FamilyCache
+from ical_export import iter_ics, parse_time
+from ical_import import iter_import_rows
+from calendar_format import format_events
+from conflicts import build_conflict_tree, event_interval, find_conflicts
+from freebusy import DEFAULT_DAY_END, DEFAULT_DAY_START, BusyIndex, find_free_slots
+from reminders import local_now, next_reminder_at, reminder_minutes
+from auctions import BID_ACCEPTED, BID_OUTBID, get_auctions, place_bid
+from task_alerts import save_task_counts
+from finance_rollup import month_key, month_range, rollup_finances
+from statement_import import expense_hash, iter_statement_expenses, normalize_description
 
 # Load environment variables
 load_dotenv()
@@ -68,7 +83,7 @@ def get_spherebot_suggestion(context):
             
             if context == "calendar":
                 # Get upcoming events
-                upcoming_events = db.table('events').select('*').eq('family_id', user.family_id).gte('date', date.today().isoformat()).order('date').limit(5).execute().data
+                upcoming_events = get_upcoming_events(user.family_id, 5)
                 events_str = "Upcoming events:\n" + "\n".join([f"- {event['title']} on {event['date']}" for event in upcoming_events]) if upcoming_events else "No upcoming events."
                 messages.append({
                     "role": "user",
@@ -134,13 +149,319 @@ def get_default_suggestion(context):
     
     return suggestions.get(context, suggestions["general"])
 
+# RSVP responses an event can receive
+RSVP_RESPONSES = ('yes', 'maybe', 'no')
+
 # Helper function to get RSVP count for an event
 def get_rsvp_count(event_id):
     """Get the count of 'yes' RSVPs for an event."""
+    return get_rsvp_tallies(event_id)['yes']
+
+def get_rsvp_tallies(event_id):
+    """Get an event's RSVP counts by response, read from the trigger-maintained tallies."""
+    return get_rsvp_tallies_for_events([event_id])[event_id]
+
+def get_rsvp_tallies_for_events(event_ids):
+    """Get RSVP counts for several events in one query, as {event_id: {response: count}}."""
     from database import db
     
-    rsvp_response = db.table('event_rsvps').select('*').eq('event_id', event_id).eq('response', 'yes').execute()
-    return len(rsvp_response.data)
+    tallies = {event_id: {response: 0 for response in RSVP_RESPONSES} for event_id in event_ids}
+    if not tallies:
+        return tallies
+    
+    tally_response = db.table('event_rsvp_tallies').select('event_id, yes_count, maybe_count, no_count') \
+        .in_('event_id', list(tallies)).execute()
+    for tally in tally_response.data:
+        tallies[tally['event_id']] = {response: tally[f'{response}_count'] for response in RSVP_RESPONSES}
+    return tallies
+
+def get_rsvp_responses(event_id):
+    """Get an event's RSVPs with usernames, resolving every user in one batched lookup."""
+    from database import db
+    
+    rsvps = db.table('event_rsvps').select('user_id, response').eq('event_id', event_id).execute().data
+    if not rsvps:
+        return []
+    
+    user_ids = sorted({rsvp['user_id'] for rsvp in rsvps})
+    users_response = db.table('users').select('id, username').in_('id', user_ids).execute()
+    usernames = {user['id']: user['username'] for user in users_response.data}
+    
+    return [{
+        'user_id': rsvp['user_id'],
+        'username': usernames.get(rsvp['user_id'], 'Unknown'),
+        'response': rsvp['response']
+    } for rsvp in rsvps]
+
+# Helper functions for the event share index
+def parse_shared_with(shared_with):
+    """Normalize a shared_with value into a list of family IDs.
+
+    The column is a UUID[] list; older rows may hold a comma-separated string.
+    """
+    if not shared_with:
+        return []
+    if isinstance(shared_with, str):
+        shared_with = shared_with.split(',')
+    return [str(family_id).strip() for family_id in shared_with if str(family_id).strip()]
+
+def sync_event_shares(event_id, family_ids, shared_by_user_id):
+    """Rewrite the shared_events rows for an event to match the given family IDs."""
+    from database import db
+
+    family_ids = parse_shared_with(family_ids)
+
+    previous_response = db.table('shared_events').select('shared_with_family_id').eq('event_id', event_id).execute()
+    previous_family_ids = {share['shared_with_family_id'] for share in previous_response.data}
+
+    db.table('shared_events').delete().eq('event_id', event_id).execute()
+
+    rows = [{
+        'event_id': event_id,
+        'shared_with_family_id': family_id,
+        'shared_by_user_id': shared_by_user_id
+    } for family_id in dict.fromkeys(family_ids)]
+
+    if rows:
+        db.table('shared_events').insert(rows).execute()
+
+    # Families gaining or losing the event see a different calendar
+    for family_id in previous_family_ids.symmetric_difference(row['shared_with_family_id'] for row in rows):
+        invalidate_family_calendar(family_id)
+
+def get_events_shared_with_family(family_id, start_date=None, end_date=None, category=None, recurring=None, columns='*',
+                                  ends_from=None):
+    """Get events other families have shared with this family.
+
+    Reads from the shared_events index (keyed by recipient family) joined to
+    events, so only the shared rows are transferred instead of every other
+    family's events. Pass recurring=True/False to fetch only series or only
+    single events, and ends_from to fetch only multi-day events still running
+    on or after that date.
+    """
+    from database import db
+
+    query = db.table('shared_events').select(f'events!inner({columns})') \
+        .eq('shared_with_family_id', family_id) \
+        .neq('events.family_id', family_id)
+
+    # Apply date filters if provided
+    if start_date:
+        query = query.gte('events.date', start_date)
+    if end_date:
+        query = query.lte('events.date', end_date)
+    if ends_from:
+        query = query.gte('events.end_date', ends_from)
+
+    # Apply category filter if provided
+    if category and category != 'all':
+        query = query.eq('events.category', category)
+
+    if recurring is True:
+        query = query.is_('events.is_recurring', 'true')
+    elif recurring is False:
+        query = query.not_.is_('events.is_recurring', 'true')
+
+    shared_response = query.execute()
+    return [row['events'] for row in shared_response.data if row.get('events')]
+
+# Expanded occurrences of recurring events, cached per family and date window
+recurrence_cache = FamilyCache()
+
+def invalidate_family_calendar(family_id):
+    """Drop cached calendar data for a family after its events, shares or exceptions change."""
+    from database import db
+
+    recurrence_cache.invalidate(family_id)
+
+    # Subscription snapshots are rebuilt on the next poll
+    db.table('calendar_snapshots').delete().eq('family_id', family_id).execute()
+
+    # Print views are rebuilt on the next print, and this month's and next month's once edits settle
+    with print_prerender_lock:
+        print_generations[family_id] = print_generations.get(family_id, 0) + 1
+    db.table('print_snapshots').delete().eq('family_id', family_id).execute()
+    schedule_print_prerender(family_id)
+
+def invalidate_event_audience(event_id, family_id):
+    """Invalidate cached calendars of an event's family and every family it is shared with."""
+    invalidate_events_audience([event_id], family_id)
+
+def invalidate_events_audience(event_ids, family_id):
+    """Invalidate cached calendars of a family and every family any of its given events is shared with."""
+    from database import db
+
+    shares_response = db.table('shared_events').select('shared_with_family_id').in_('event_id', list(event_ids)).execute()
+    for audience_family_id in {family_id, *(share['shared_with_family_id'] for share in shares_response.data)}:
+        invalidate_family_calendar(audience_family_id)
+
+def compute_next_reminder_at(event):
+    """Get the value for an event's next_reminder_at column, applying any series exceptions."""
+    exceptions = None
+    if event.get('reminder_enabled') and is_recurring_event(event):
+        exceptions = fetch_event_exceptions([event['id']]).get(event['id'])
+    return next_reminder_at(event, local_now(), exceptions)
+
+def default_calendar_window(today=None):
+    """Get the [start, end) window expanded when a view has no explicit range.
+
+    Covers the previous month through twelve months ahead.
+    """
+    today = today or date.today()
+    window_start = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    month_index = window_start.month - 1 + 14
+    window_end = date(window_start.year + month_index // 12, month_index % 12 + 1, 1)
+    return window_start, window_end
+
+def fetch_event_exceptions(event_ids):
+    """Get event_exceptions rows for a set of series, grouped by event and original date."""
+    from database import db
+
+    if not event_ids:
+        return {}
+
+    exceptions_response = db.table('event_exceptions').select('*').in_('event_id', list(event_ids)).execute()
+    return group_exceptions(exceptions_response.data)
+
+def fetch_family_exceptions(family_id):
+    """Get event_exceptions rows for every series a family owns, in one query."""
+    from database import db
+
+    exceptions_response = db.table('event_exceptions').select('*, events!inner(family_id)') \
+        .eq('events.family_id', family_id) \
+        .execute()
+    return group_exceptions(exceptions_response.data)
+
+def filter_overlapping(query, window_start, window_end):
+    """Limit an events query to rows that run on a day of [window_start, window_end).
+
+    A row overlaps when it starts before the window ends and
+    coalesce(end_date, date) is on or after the window start; end_date is
+    never before date, so the latter is date >= start OR end_date >= start.
+    """
+    return query.lt('date', window_end.isoformat()) \
+        .or_(f'date.gte.{window_start.isoformat()},end_date.gte.{window_start.isoformat()}')
+
+def expand_event_occurrences(events, window_start, window_end):
+    """Expand events into the occurrences that overlap [window_start, window_end)."""
+    recurring_ids = [event['id'] for event in events if is_recurring_event(event)]
+    return expand_events(events, window_start, window_end, fetch_event_exceptions(recurring_ids))
+
+def get_shared_occurrences(family_id, window_start, window_end, category=None, columns='*'):
+    """Get occurrences of events shared with a family that overlap [window_start, window_end).
+
+    Single events are filtered to the window in the query, plus multi-day ones
+    that started earlier and run into it; series are fetched if they start
+    before the window ends and are expanded locally.
+    """
+    last_day = (window_end - timedelta(days=1)).isoformat()
+    shared_events = get_events_shared_with_family(family_id, window_start.isoformat(), last_day, category,
+                                                  recurring=False, columns=columns)
+    shared_events.extend(get_events_shared_with_family(family_id, None, (window_start - timedelta(days=1)).isoformat(),
+                                                       category, recurring=False, columns=columns,
+                                                       ends_from=window_start.isoformat()))
+    shared_events.extend(get_events_shared_with_family(family_id, None, last_day, category,
+                                                       recurring=True, columns=columns))
+    return expand_event_occurrences(shared_events, window_start, window_end)
+
+def get_family_occurrences(family_id, window_start, window_end):
+    """Get occurrences of a family's recurring events that overlap [window_start, window_end).
+
+    Expansions are cached per family and window, and dropped by
+    invalidate_family_calendar() when a series or its exceptions change.
+    """
+    from database import db
+
+    cache_key = ('occurrences', window_start.isoformat(), window_end.isoformat())
+    occurrences = recurrence_cache.get(family_id, cache_key)
+    if occurrences is not None:
+        return occurrences
+
+    # Only series that start before the window ends can have occurrences in it
+    series_response = db.table('events').select('*') \
+        .eq('family_id', family_id) \
+        .eq('is_recurring', True) \
+        .lt('date', window_end.isoformat()) \
+        .execute()
+
+    # A series' last occurrence can still run into the window after the series ends
+    series = [event for event in series_response.data
+              if is_recurring_event(event)
+              and not (event.get('recurrence_end_date')
+                       and parse_date(event['recurrence_end_date']) + timedelta(days=event_span(event)) < window_start)]
+
+    occurrences = expand_event_occurrences(series, window_start, window_end)
+    recurrence_cache.set(family_id, cache_key, occurrences)
+    return occurrences
+
+def get_timed_events(family_id, window_start, window_end):
+    """Get the timed events a family sees that overlap [window_start, window_end).
+
+    Covers the family's own events, expanded recurrences and events shared
+    with the family. Lists are cached alongside the recurrence expansions and
+    dropped by invalidate_family_calendar().
+    """
+    from database import db
+
+    cache_key = ('timed_events', window_start.isoformat(), window_end.isoformat())
+    events = recurrence_cache.get(family_id, cache_key)
+    if events is not None:
+        return events
+
+    query = db.table('events').select(CALENDAR_FEED_COLUMNS) \
+        .eq('family_id', family_id) \
+        .not_.is_('time', 'null')
+    events_response = filter_overlapping(query, window_start, window_end).execute()
+    events = [event for event in events_response.data if not is_recurring_event(event)]
+    events.extend(get_family_occurrences(family_id, window_start, window_end))
+    events.extend(get_shared_occurrences(family_id, window_start, window_end, columns=CALENDAR_FEED_COLUMNS))
+
+    recurrence_cache.set(family_id, cache_key, events)
+    return events
+
+def get_conflict_tree(family_id, window_start, window_end):
+    """Get an interval tree of the timed events a family sees in [window_start, window_end), cached like the events."""
+    cache_key = ('conflicts', window_start.isoformat(), window_end.isoformat())
+    tree = recurrence_cache.get(family_id, cache_key)
+    if tree is None:
+        tree = build_conflict_tree(get_timed_events(family_id, window_start, window_end))
+        recurrence_cache.set(family_id, cache_key, tree)
+    return tree
+
+def get_busy_index(family_id, window_start, window_end):
+    """Get the merged busy intervals of each family member in [window_start, window_end), cached like the events."""
+    from database import db
+
+    cache_key = ('busy', window_start.isoformat(), window_end.isoformat())
+    busy_index = recurrence_cache.get(family_id, cache_key)
+    if busy_index is None:
+        members_response = db.table('users').select('id').eq('family_id', family_id).execute()
+        busy_index = BusyIndex(get_timed_events(family_id, window_start, window_end),
+                               [member['id'] for member in members_response.data])
+        recurrence_cache.set(family_id, cache_key, busy_index)
+    return busy_index
+
+def calendar_window_covering(start_date, end_date):
+    """Get the cached default window if it covers [start_date, end_date], else a window of just those dates."""
+    window_start, window_end = default_calendar_window()
+    if window_start <= start_date and end_date < window_end:
+        return window_start, window_end
+    return start_date, end_date + timedelta(days=1)
+
+def find_event_conflicts(family_id, event, exclude_ids=()):
+    """Get the events that overlap a proposed event's time slot.
+
+    ``event`` needs date and time, and may have end_time and end_date. All-day
+    events never conflict. Slots inside the default calendar window share one
+    cached tree; other slots build a tree for just their dates.
+    """
+    interval = event_interval(event)
+    if interval is None:
+        return []
+    start, end = interval
+
+    window_start, window_end = calendar_window_covering(start.date(), end.date())
+    return find_conflicts(get_conflict_tree(family_id, window_start, window_end), start, end, exclude_ids)
 
 # Routes for authentication
 @app.route('/login', methods=['GET', 'POST'])
@@ -332,13 +653,16 @@ def dashboard():
     family = family_response.data[0] if family_response.data else None
     
     # Get upcoming events
-    events_response = db.table('events').select('*').eq('family_id', current_user.family_id).gte('date', date.today().isoformat()).order('date').limit(5).execute()
-    events = events_response.data
+    events = get_upcoming_events(current_user.family_id, 5)
     
     # Get pending tasks
     tasks_response = db.table('tasks').select('*').eq('family_id', current_user.family_id).eq('status', 'Pending').order('due_date').limit(5).execute()
     tasks = tasks_response.data
     
+    # Overdue and due-soon counts as of the worker's last scan
+    from task_alerts import get_task_counts
+    task_counts = get_task_counts(current_user.family_id)
+    
     # Get recent chat messages
     chats_response = db.table('chats').select('*').eq('family_id', current_user.family_id).order('timestamp', desc=True).limit(5).execute()
     chats = chats_response.data
@@ -362,6 +686,7 @@ def dashboard():
                           family=family,
                           events=events, 
                           tasks=tasks, 
+                          task_counts=task_counts,
                           chats=chats,
                           users=users,
                           finances=finances,
@@ -393,118 +718,114 @@ def family():
         return redirect(url_for('dashboard'))
 
 # Calendar routes
+# Columns needed to render an event in the calendar feed
+CALENDAR_FEED_COLUMNS = ('id, title, date, time, end_date, end_time, all_day, category, description, location, '
+                         'created_by, family_id, shared_with, is_recurring, recurrence_pattern, '
+                         'recurrence_end_date, reminder_enabled, rsvp_enabled')
+
+# Longest range the calendar feed will expand in one request
+CALENDAR_FEED_MAX_DAYS = 400
+
+# Size of the upcoming events table on the calendar page
+UPCOMING_EVENTS_DAYS = 30
+UPCOMING_EVENTS_LIMIT = 10
+
+def get_upcoming_events(family_id, limit=UPCOMING_EVENTS_LIMIT, today=None):
+    """Get a family's next `limit` events in the next UPCOMING_EVENTS_DAYS days, recurring ones expanded.
+
+    Only one-off events are limited in the query, so series rows can't crowd
+    them out; series are expanded into occurrences before the first `limit`
+    of both are taken.
+    """
+    from database import db
+    
+    today = today or date.today()
+    horizon_end = today + timedelta(days=UPCOMING_EVENTS_DAYS)
+    one_off_response = db.table('events').select(CALENDAR_FEED_COLUMNS) \
+        .eq('family_id', family_id) \
+        .or_('is_recurring.is.null,is_recurring.eq.false') \
+        .gte('date', today.isoformat()) \
+        .lt('date', horizon_end.isoformat()) \
+        .order('date') \
+        .limit(limit) \
+        .execute()
+    upcoming_events = [event for event in one_off_response.data if not is_recurring_event(event)]
+    # Occurrences that started before today but are still running aren't upcoming
+    upcoming_events.extend(occurrence for occurrence in get_family_occurrences(family_id, today, horizon_end)
+                           if occurrence['date'] >= today.isoformat())
+    upcoming_events.sort(key=lambda event: (event['date'], event.get('time') or ''))
+    return upcoming_events[:limit]
+
 @app.route('/calendar')
 @login_required
 def calendar():
-    """Display the family calendar with events."""
+    """Display the family calendar.
+
+    Events are not embedded in the page; calendar.js loads them from
+    calendar_events_feed for the range being viewed.
+    """
     from database import db
-    import datetime
-    
-    # Get all events for the user's family
-    events_response = db.table('events').select('*').eq('family_id', current_user.family_id).execute()
-    events = events_response.data
-    
-    # Get shared events
-    shared_events = []
-    shared_response = db.table('events').select('*').neq('family_id', current_user.family_id).execute()
-    for event in shared_response.data:
-        shared_with = event.get('shared_with', '')
-        if shared_with and current_user.family_id in shared_with.split(','):
-            shared_events.append(event)
     
     # Get family members for filter dropdown
     family_members_response = db.table('users').select('id, username').eq('family_id', current_user.family_id).execute()
     family_members = family_members_response.data
     
-    # Format events for FullCalendar
-    formatted_events = []
+    # Only the next few events are listed in the upcoming events table
+    upcoming_events = get_upcoming_events(current_user.family_id)
+    formatted_events = format_events(upcoming_events)
     
-    for event in events:
-        formatted_event = format_event_for_calendar(event, is_family_event=True)
-        formatted_events.append(formatted_event)
-    
-    for event in shared_events:
-        formatted_event = format_event_for_calendar(event, is_family_event=False)
-        formatted_events.append(formatted_event)
+    # "Going" counts for the upcoming list come from the RSVP tallies in one query
+    rsvp_tallies = get_rsvp_tallies_for_events([event['id'] for event in upcoming_events if event.get('rsvp_enabled')])
+    for event, formatted_event in zip(upcoming_events, formatted_events):
+        if event['id'] in rsvp_tallies:
+            formatted_event['rsvp_enabled'] = True
+            formatted_event['rsvp_count'] = rsvp_tallies[event['id']]['yes']
     
     return render_template('calendar.html', 
                            events=formatted_events, 
                            family_members=family_members,
                            page_title="Family Calendar")
 
-# Helper function to format events for FullCalendar
-def format_event_for_calendar(event, is_family_event=True):
-    """Format an event for FullCalendar."""
-    formatted_event = {
-        'id': event['id'],
-        'title': event['title'],
-        'start': event['date']
-    }
+@app.route('/api/calendar/events')
+@login_required
+def calendar_events_feed():
+    """JSON event feed for FullCalendar, limited to the requested [start, end) range."""
+    from database import db
+    import hashlib
     
-    # Add time if available
-    if event.get('time'):
-        try:
-            # Try parsing with seconds
-            event_time = datetime.datetime.strptime(event['time'], '%H:%M:%S').time()
-        except ValueError:
-            # If that fails, try without seconds
-            event_time = datetime.datetime.strptime(event['time'], '%H:%M').time()
-        
-        formatted_event['start'] += 'T' + event_time.strftime('%H:%M:%S')
+    try:
+        # FullCalendar sends ISO timestamps; only the date part is needed
+        window_start = parse_date(request.args.get('start'))
+        window_end = parse_date(request.args.get('end'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid date range'}), 400
     
-    # Add end time if available, otherwise default to 1 hour
-    if event.get('end_time'):
-        try:
-            # Try parsing with seconds
-            end_time = datetime.datetime.strptime(event['end_time'], '%H:%M:%S').time()
-        except ValueError:
-            # If that fails, try without seconds
-            end_time = datetime.datetime.strptime(event['end_time'], '%H:%M').time()
-        
-        formatted_event['end'] = event['date'] + 'T' + end_time.strftime('%H:%M:%S')
-    else:
-        # Fallback for events with date but no time
-        formatted_event['end'] = event['date'] + 'T' + datetime.time(23, 59, 59).strftime('%H:%M:%S')
-    
-    # Add all-day flag
-    if event.get('all_day'):
-        formatted_event['allDay'] = True
-    
-    # Add color based on category
-    category_colors = {
-        'Family': '#4285F4',  # Blue
-        'Work': '#EA4335',    # Red
-        'School': '#FBBC05',  # Yellow
-        'Sports': '#34A853',  # Green
-        'Health': '#8E24AA',  # Purple
-        'Social': '#FB8C00',  # Orange
-        'Other': '#9E9E9E'    # Gray
-    }
+    if not window_start or not window_end or window_end <= window_start:
+        return jsonify({'success': False, 'message': 'Start and end dates are required'}), 400
     
-    if event.get('category') and event['category'] in category_colors:
-        formatted_event['backgroundColor'] = category_colors[event['category']]
-    else:
-        # Default color
-        formatted_event['backgroundColor'] = '#4285F4'
+    if (window_end - window_start).days > CALENDAR_FEED_MAX_DAYS:
+        return jsonify({'success': False, 'message': f'Date range cannot exceed {CALENDAR_FEED_MAX_DAYS} days'}), 400
     
-    # Add border color for shared events
-    if not is_family_event:
-        formatted_event['borderColor'] = '#FF5722'  # Deep Orange
-        formatted_event['textColor'] = '#FFFFFF'
+    # Single family events running in the range; series come from the recurrence cache
+    query = db.table('events').select(CALENDAR_FEED_COLUMNS).eq('family_id', current_user.family_id)
+    events_response = filter_overlapping(query, window_start, window_end).execute()
+    events = [event for event in events_response.data if not is_recurring_event(event)]
+    events.extend(get_family_occurrences(current_user.family_id, window_start, window_end))
     
-    # Add extended properties
-    formatted_event['extendedProps'] = {
-        'description': event.get('description', ''),
-        'location': event.get('location', ''),
-        'category': event.get('category', ''),
-        'created_by': event.get('created_by', ''),
-        'family_id': event.get('family_id', ''),
-        'shared_with': event.get('shared_with', ''),
-        'is_recurring': event.get('is_recurring', False),
-        'recurrence_pattern': event.get('recurrence_pattern', '')
-    }
+    shared_events = get_shared_occurrences(current_user.family_id, window_start, window_end,
+                                           columns=CALENDAR_FEED_COLUMNS)
     
-    return formatted_event
+    formatted_events = format_events(events)
+    formatted_events.extend(format_events(shared_events, is_family_event=False))
+    
+    body = json.dumps(formatted_events, sort_keys=True, separators=(',', ':'), default=str)
+    
+    response = make_response(body)
+    response.mimetype = 'application/json'
+    response.set_etag(hashlib.sha1(body.encode('utf-8')).hexdigest())
+    # Let the browser keep the feed but revalidate it with If-None-Match
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
 
 @app.route('/add_event', methods=['GET', 'POST'])
 @login_required
@@ -568,11 +889,23 @@ def add_event():
                 'reminder_enabled': reminder_enabled,
                 'reminder_time': reminder_time if reminder_enabled else None,
                 'notification_method': notification_method if reminder_enabled else None,
-                'shared_with': shared_with if shared_with else None
+                'shared_with': parse_shared_with(shared_with)
             }
             
+            # New events have no exceptions yet, so the next reminder comes straight from the row
+            event_data['next_reminder_at'] = next_reminder_at(event_data, local_now())
+            
+            # Look for overlapping events before this one is added to the calendar
+            conflicts = find_event_conflicts(current_user.family_id, event_data)
+            
             event_insert = db.table('events').insert(event_data).execute()
             
+            # Index the families this event is shared with
+            if shared_with:
+                sync_event_shares(event_id, shared_with, current_user.id)
+            
+            invalidate_family_calendar(current_user.family_id)
+            
             # If this was created from a template and user wants to save updates back to template
             template_id = request.form.get('template_id')
             update_template = 'update_template' in request.form
@@ -591,9 +924,14 @@ def add_event():
                 
                 # Update the template with the new values
                 template_update = db.table('calendar_templates').update(template_data).eq('id', template_id).eq('family_id', current_user.family_id).execute()
+                template_cache.invalidate(current_user.family_id)
                 flash('Event added and template updated successfully', 'success')
             else:
                 flash('Event added successfully', 'success')
+            
+            if conflicts:
+                titles = ', '.join(conflict['title'] for conflict in conflicts[:3])
+                flash(f'This event overlaps with {len(conflicts)} other event(s): {titles}', 'warning')
                 
             return redirect(url_for('calendar'))
         except Exception as e:
@@ -612,9 +950,7 @@ def add_event():
     
     if template_id:
         # Get the template data
-        template_result = db.table('calendar_templates').select('*').eq('id', template_id).eq('family_id', current_user.family_id).execute()
-        if template_result.data:
-            template = template_result.data[0]
+        template = get_family_template(current_user.family_id, template_id)
     
     # Pre-populate form fields from query parameters (used by template system)
     form_data = {
@@ -650,6 +986,11 @@ def get_event(event_id):
             
         event = event_response.data[0]
         
+        # Apply a per-instance move if this occurrence was rescheduled
+        exception_response = db.table('event_exceptions').select('new_date').eq('event_id', base_id).eq('original_date', instance_date).execute()
+        if exception_response.data and exception_response.data[0].get('new_date'):
+            instance_date = exception_response.data[0]['new_date']
+        
         # Override the date with the instance date
         event['date'] = instance_date
         event['is_instance'] = True
@@ -665,19 +1006,10 @@ def get_event(event_id):
     
     # Get RSVP responses if enabled
     rsvp_responses = []
+    rsvp_counts = {response: 0 for response in RSVP_RESPONSES}
     if event.get('rsvp_enabled'):
-        rsvp_response = db.table('event_rsvps').select('*').eq('event_id', event_id).execute()
-        if rsvp_response.data:
-            # Get usernames for each RSVP
-            for rsvp in rsvp_response.data:
-                user_response = db.table('users').select('username').eq('id', rsvp['user_id']).execute()
-                username = user_response.data[0]['username'] if user_response.data else 'Unknown'
-                
-                rsvp_responses.append({
-                    'user_id': rsvp['user_id'],
-                    'username': username,
-                    'response': rsvp['response']
-                })
+        rsvp_responses = get_rsvp_responses(event_id)
+        rsvp_counts = get_rsvp_tallies(event_id)
     
     # Check if user can edit this event
     can_edit = event['created_by'] == current_user.id or current_user.role == 'Admin'
@@ -695,6 +1027,7 @@ def get_event(event_id):
         'recurrence_pattern': event.get('recurrence_pattern', ''),
         'rsvp_enabled': event.get('rsvp_enabled', False),
         'rsvp_responses': rsvp_responses,
+        'rsvp_counts': rsvp_counts,
         'reminder_enabled': event.get('reminder_enabled', False),
         'reminder_time': event.get('reminder_time', '60'),
         'notification_method': event.get('notification_method', 'app'),
@@ -716,20 +1049,24 @@ def event_rsvp():
         
         if not event_id or not response_type:
             return jsonify({'success': False, 'message': 'Missing required fields'}), 400
+        
+        if response_type not in RSVP_RESPONSES:
+            return jsonify({'success': False, 'message': 'Invalid response'}), 400
             
         # Check if event exists
         if '_' in event_id:
             # This is a recurring event instance
             base_id = event_id.split('_', 1)[0]
-            event_response = db.table('events').select('*').eq('id', base_id).execute()
+            event_response = db.table('events').select('id').eq('id', base_id).execute()
         else:
-            event_response = db.table('events').select('*').eq('id', event_id).execute()
+            event_response = db.table('events').select('id').eq('id', event_id).execute()
             
         if not event_response.data:
             return jsonify({'success': False, 'message': 'Event not found'}), 404
             
         # Check if user already responded
-        rsvp_response = db.table('event_rsvps').select('*').eq('event_id', event_id).eq('user_id', current_user.id).execute()
+        # (tallies are adjusted by a trigger on event_rsvps for both the update and the insert)
+        rsvp_response = db.table('event_rsvps').select('id').eq('event_id', event_id).eq('user_id', current_user.id).execute()
         
         if rsvp_response.data:
             # Update existing RSVP
@@ -744,310 +1081,523 @@ def event_rsvp():
                 'event_id': event_id,
                 'user_id': current_user.id,
                 'response': response_type,
-                'timestamp': datetime.datetime.now().isoformat()
+                'timestamp': datetime.now().isoformat()
             }
             
             db.table('event_rsvps').insert(rsvp_data).execute()
         
         # Get updated RSVP responses
-        updated_rsvp_response = db.table('event_rsvps').select('*').eq('event_id', event_id).execute()
-        rsvp_responses = []
-        
-        for rsvp in updated_rsvp_response.data:
-            user_response = db.table('users').select('username').eq('id', rsvp['user_id']).execute()
-            username = user_response.data[0]['username'] if user_response.data else 'Unknown'
-            
-            rsvp_responses.append({
-                'user_id': rsvp['user_id'],
-                'username': username,
-                'response': rsvp['response']
-            })
-        
-        return jsonify({'success': True, 'responses': rsvp_responses})
+        return jsonify({
+            'success': True,
+            'responses': get_rsvp_responses(event_id),
+            'counts': get_rsvp_tallies(event_id)
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+# Most moves accepted by one bulk move request
+MAX_BULK_MOVES = 200
+
+def apply_event_moves(family_id, moves):
+    """Validate a list of event moves together and apply them.
+
+    Each move has event_id, start_date and an optional end_date. Occurrence
+    IDs (<series id>_<original date>) are moved with one multi-row upsert
+    into event_exceptions, other events by updating only their date
+    columns. Invalid moves (missing fields, bad
+    dates, repeated IDs, unknown events or events of another family) are
+    rejected individually and the rest are applied. Returns one result per
+    move, in order, with success, message and an HTTP-style status.
+    """
+    from database import db
+    
+    results = [None] * len(moves)
+    valid_moves = []
+    seen_ids = set()
+    
+    def reject(index, event_id, message, status=400):
+        results[index] = {'event_id': event_id, 'success': False, 'message': message, 'status': status}
+    
+    for index, move in enumerate(moves):
+        event_id = move.get('event_id') if isinstance(move, dict) else None
+        if not event_id or not move.get('start_date'):
+            reject(index, event_id, 'Missing required fields')
+            continue
+        if event_id in seen_ids:
+            reject(index, event_id, 'Event is moved more than once')
+            continue
+        seen_ids.add(event_id)
+        
+        base_id, original_date = event_id.split('_', 1) if '_' in event_id else (event_id, None)
+        try:
+            start_date = parse_date(move['start_date'])
+            end_date = parse_date(move.get('end_date'))
+            original_date = parse_date(original_date)
+        except ValueError:
+            reject(index, event_id, 'Invalid date')
+            continue
+        if end_date is not None and end_date < start_date:
+            reject(index, event_id, 'End date is before start date')
+            continue
+        
+        valid_moves.append((index, event_id, base_id, original_date, start_date, end_date))
+    
+    # Every event touched by the batch is loaded in one query
+    base_ids = sorted({move[2] for move in valid_moves})
+    events_by_id = {}
+    if base_ids:
+        events_response = db.table('events').select('*').in_('id', base_ids).execute()
+        events_by_id = {event['id']: event for event in events_response.data}
+    
+    exception_rows = []
+    # Only the moved columns are written back, so edits made since the read are kept
+    event_changes = {}
+    moved_indexes = {}
+    moved_series = set()
+    
+    for index, event_id, base_id, original_date, start_date, end_date in valid_moves:
+        event = events_by_id.get(base_id)
+        if event is None:
+            reject(index, event_id, 'Event not found', 404)
+            continue
+        if event['family_id'] != family_id:
+            reject(index, event_id, 'Not authorized to move this event', 403)
+            continue
+        
+        if original_date is not None:
+            # For recurring instances, we create an exception
+            if not is_recurring_event(event) or not is_occurrence_date(
+                    parse_date(event['date']), event['recurrence_pattern'], original_date,
+                    parse_date(event.get('recurrence_end_date'))):
+                reject(index, event_id, 'Not an occurrence of this event', 404)
+                continue
+            exception_rows.append({
+                'event_id': base_id,
+                'original_date': original_date.isoformat(),
+                'new_date': start_date.isoformat(),
+                'end_date': end_date.isoformat() if end_date else None
+            })
+            moved_series.add(base_id)
+        else:
+            changes = event_changes.setdefault(base_id, {})
+            changes['date'] = start_date.isoformat()
+            if end_date:
+                changes['end_date'] = end_date.isoformat()
+            moved_indexes[base_id] = index
+        
+        results[index] = {'event_id': event_id, 'success': True, 'status': 200}
+    
+    # Replaces any earlier move of the same instances
+    if exception_rows:
+        db.table('event_exceptions').upsert(exception_rows, on_conflict='event_id,original_date').execute()
+    
+    # Moved events and occurrences may change which reminder fires next
+    reminder_event_ids = [event_id for event_id in sorted(moved_series | set(event_changes))
+                          if events_by_id[event_id].get('reminder_enabled')]
+    if reminder_event_ids:
+        exceptions_by_event = fetch_event_exceptions([event_id for event_id in reminder_event_ids
+                                                      if is_recurring_event(events_by_id[event_id])])
+        now = local_now()
+        for event_id in reminder_event_ids:
+            changes = event_changes.setdefault(event_id, {})
+            moved_event = dict(events_by_id[event_id], **changes)
+            changes['next_reminder_at'] = next_reminder_at(moved_event, now, exceptions_by_event.get(event_id))
+    
+    # Targeted updates never resurrect an event deleted since the read
+    for event_id, changes in event_changes.items():
+        updated = db.table('events').update(changes).eq('id', event_id).eq('family_id', family_id).execute().data
+        if not updated and event_id in moved_indexes:
+            reject(moved_indexes[event_id], event_id, 'Event not found', 404)
+    
+    if moved_series or event_changes:
+        invalidate_events_audience(moved_series | set(event_changes), family_id)
+    
+    return results
+
 @app.route('/update_event_dates', methods=['POST'])
 @login_required
 def update_event_dates():
     """Update event dates after drag and drop or resize."""
-    from database import db
-    
     try:
         data = request.json
+        result = apply_event_moves(current_user.family_id, [data])[0]
+        
+        if not result['success']:
+            return jsonify({'success': False, 'message': result['message']}), result['status']
+        
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/calendar/moves', methods=['POST'])
+@login_required
+def move_events():
+    """Apply a batch of drag-and-drop moves in one request, with a result per move."""
+    try:
+        data = request.json or {}
+        moves = data.get('moves')
+        
+        if not isinstance(moves, list) or not moves:
+            return jsonify({'success': False, 'message': 'No moves provided'}), 400
+        
+        if len(moves) > MAX_BULK_MOVES:
+            return jsonify({'success': False, 'message': f'Cannot move more than {MAX_BULK_MOVES} events at once'}), 400
+        
+        results = apply_event_moves(current_user.family_id, moves)
+        
+        return jsonify({
+            'success': all(result['success'] for result in results),
+            'results': results
+        })
+    except Exception as e:
+        app.logger.error(f"Error moving events: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to move events'}), 500
+
+@app.route('/api/calendar/conflicts', methods=['POST'])
+@login_required
+def check_event_conflicts():
+    """List the events that would overlap an event at a new time, before it is saved."""
+    try:
+        data = request.json or {}
         event_id = data.get('event_id')
-        start_date = data.get('start_date')
-        end_date = data.get('end_date')
         
-        if not event_id or not start_date:
+        if not data.get('date'):
             return jsonify({'success': False, 'message': 'Missing required fields'}), 400
         
-        # Check if this is a recurring event instance
-        if '_' in event_id:
-            # For recurring instances, we create an exception
-            base_id, instance_date = event_id.split('_', 1)
-            
-            # Get the base event
-            event_response = db.table('events').select('*').eq('id', base_id).execute()
-            
-            if not event_response.data:
-                return jsonify({'success': False, 'message': 'Event not found'}), 404
-                
-            base_event = event_response.data[0]
-            
-            # Create an exception for this instance
-            import uuid
-            exception_id = str(uuid.uuid4())
-            
-            exception_data = {
-                'id': exception_id,
-                'event_id': base_id,
-                'original_date': instance_date,
-                'new_date': start_date,
-                'end_date': end_date
-            }
-            
-            db.table('event_exceptions').insert(exception_data).execute()
-        else:
-            # Regular event update
-            update_data = {'date': start_date}
-            if end_date:
-                update_data['end_date'] = end_date
-                
-            db.table('events').update(update_data).eq('id', event_id).execute()
+        proposed_event = {
+            'date': data['date'],
+            'time': data.get('time'),
+            'end_time': data.get('end_time'),
+            'end_date': data.get('end_date'),
+            'all_day': data.get('all_day', False)
+        }
         
-        return jsonify({'success': True})
+        conflicts = find_event_conflicts(current_user.family_id, proposed_event,
+                                         exclude_ids={event_id} if event_id else ())
+        
+        return jsonify({
+            'success': True,
+            'conflicts': [{
+                'id': conflict['id'],
+                'title': conflict['title'],
+                'date': conflict['date'],
+                'time': conflict.get('time'),
+                'end_time': conflict.get('end_time')
+            } for conflict in conflicts]
+        })
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid date or time'}), 400
     except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
+        app.logger.error(f"Error checking event conflicts: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to check conflicts'}), 500
+
+# Free slot search limits
+MAX_FREE_SLOTS = 50
+MAX_FREE_SLOT_SEARCH_DAYS = 92
+
+def parse_freebusy_request(args):
+    """Read the date range and member IDs of a free/busy request.
+
+    Returns (start, end, member_ids) where start and end are datetimes and
+    member_ids is None for every member. Defaults to the next week. "Now"
+    is local time, which event times are stored in.
+    """
+    now = local_now()
+    start_date = parse_date(args.get('start')) or now.date()
+    end_date = parse_date(args.get('end')) or start_date + timedelta(days=7)
+    if end_date < start_date:
+        raise ValueError('End date is before start date')
+    if (end_date - start_date).days > MAX_FREE_SLOT_SEARCH_DAYS:
+        raise ValueError(f'Search at most {MAX_FREE_SLOT_SEARCH_DAYS} days at a time')
+
+    start = datetime.combine(start_date, datetime.min.time())
+    # Searching from today never suggests a slot that has already started
+    if start_date == now.date():
+        start = now.replace(second=0, microsecond=0)
+
+    members = args.get('members')
+    member_ids = [member_id for member_id in members.split(',') if member_id] if members else None
+    return start, datetime.combine(end_date + timedelta(days=1), datetime.min.time()), member_ids
+
+def check_freebusy_members(busy_index, member_ids):
+    """Raise ValueError if any requested member ID is not a member of the family the index covers."""
+    if member_ids:
+        family_members = set(busy_index.members())
+        unknown = [member_id for member_id in member_ids if member_id not in family_members]
+        if unknown:
+            raise ValueError(f"Unknown family member: {', '.join(unknown)}")
+
+@app.route('/api/calendar/freebusy')
+@login_required
+def calendar_freebusy():
+    """List the merged busy intervals of each family member between two dates."""
+    try:
+        start, end, member_ids = parse_freebusy_request(request.args)
+        window_start, window_end = calendar_window_covering(start.date(), (end - timedelta(days=1)).date())
+        busy_index = get_busy_index(current_user.family_id, window_start, window_end)
+        check_freebusy_members(busy_index, member_ids)
+        
+        busy = {}
+        for member_id in member_ids or busy_index.members():
+            busy[member_id] = [{'start': busy_start.isoformat(), 'end': busy_end.isoformat()}
+                               for busy_start, busy_end in busy_index.busy([member_id], start, end)]
+        
+        return jsonify({'success': True, 'busy': busy})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error getting free/busy: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to get free/busy information'}), 500
+
+@app.route('/api/calendar/free_slots')
+@login_required
+def calendar_free_slots():
+    """Find the next free slots of a given length that every chosen member shares.
+
+    Query parameters: start and end dates, duration in minutes, count, an
+    optional comma-separated list of member IDs, and optional day_start and
+    day_end times bounding the hours searched each day.
+    """
+    try:
+        start, end, member_ids = parse_freebusy_request(request.args)
+        duration = timedelta(minutes=int(request.args.get('duration', 60)))
+        count = min(int(request.args.get('count', 5)), MAX_FREE_SLOTS)
+        day_start = parse_time(request.args.get('day_start')) or DEFAULT_DAY_START
+        day_end = parse_time(request.args.get('day_end')) or DEFAULT_DAY_END
+        
+        window_start, window_end = calendar_window_covering(start.date(), (end - timedelta(days=1)).date())
+        busy_index = get_busy_index(current_user.family_id, window_start, window_end)
+        check_freebusy_members(busy_index, member_ids)
+        busy = busy_index.busy(member_ids, start, end)
+        slots = find_free_slots(busy, start, end, duration, count, day_start, day_end)
+        
+        return jsonify({
+            'success': True,
+            'slots': [{'start': slot_start.isoformat(), 'end': slot_end.isoformat()} for slot_start, slot_end in slots]
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error finding free slots: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to find free slots'}), 500
+
+# Rows written per multi-row upsert when importing calendars
+IMPORT_BATCH_SIZE = 500
+
+# Import warnings returned in full; the rest are only counted
+MAX_IMPORT_WARNINGS = 50
+
+def get_imported_event_index(family_id):
+    """Map the external UIDs of a family's imported events to their id, import_hash and import_source."""
+    from database import db
+
+    def build_query():
+        return db.table('events').select('id, external_uid, import_hash, import_source') \
+            .eq('family_id', family_id).not_.is_('external_uid', 'null')
+
+    return {row['external_uid']: row for row in iter_rows_by_id(build_query)}
+
+def import_calendar_rows(family_id, user_id, source, rows, sync=False):
+    """Upsert imported event rows for a family in batches.
+
+    Events are matched to earlier imports by UID; unchanged ones (same
+    import_hash) are skipped and duplicate UIDs within the file are ignored.
+    With sync, events previously imported from the same source that are no
+    longer in the file are deleted. Returns counts of each outcome.
+    """
+    from database import db
+
+    existing = get_imported_event_index(family_id)
+    seen_uids = set()
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    # New events are inserted with defaults; changed ones only get their imported fields
+    # rewritten so local edits such as category and sharing are kept
+    new_events = []
+    changed_events = []
+
+    def flush(batch):
+        if batch:
+            db.table('events').upsert(batch).execute()
+            batch.clear()
+
+    for row in rows:
+        uid = row['external_uid']
+        if uid in seen_uids:
+            continue
+        seen_uids.add(uid)
+
+        previous = existing.get(uid)
+        if previous is None:
+            counts['created'] += 1
+            batch = new_events
+            batch.append(dict(row,
+                              id=str(uuid.uuid4()),
+                              family_id=family_id,
+                              created_by=user_id,
+                              category='family',
+                              import_source=source))
+        elif previous.get('import_hash') != row['import_hash']:
+            counts['updated'] += 1
+            batch = changed_events
+            batch.append(dict(row, id=previous['id'], family_id=family_id))
+        else:
+            counts['unchanged'] += 1
+            continue
+
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            flush(batch)
+    flush(new_events)
+    flush(changed_events)
+
+    if sync:
+        removed_ids = [event['id'] for uid, event in existing.items()
+                       if uid not in seen_uids and event.get('import_source') == source]
+        for i in range(0, len(removed_ids), IMPORT_BATCH_SIZE):
+            db.table('events').delete().in_('id', removed_ids[i:i + IMPORT_BATCH_SIZE]).eq('family_id', family_id).execute()
+        counts['deleted'] = len(removed_ids)
+
+    return counts
 
 @app.route('/import_calendar', methods=['POST'])
 @login_required
 def import_calendar():
-    """Import events from external calendar."""
-    from database import db
-    import uuid
-    
+    """Import events from an external calendar's .ics file."""
     try:
-        source = request.form.get('source')
+        source = request.form.get('source') or 'ical'
         sync = 'sync' in request.form
         
-        # In a real implementation, this would handle different calendar sources
-        # For now, we'll just handle iCal file uploads
+        # Google, Outlook and Apple calendars are all imported from their .ics exports
         if 'calendar_file' in request.files:
             file = request.files['calendar_file']
             
             if file.filename == '':
                 return jsonify({'success': False, 'message': 'No file selected'}), 400
-                
-            if file:
-                # Process the iCal file
-                # This is a simplified version - a real implementation would use a library like icalendar
-                # to properly parse the file
-                
-                # Mock implementation - just create a sample event
-                event_id = str(uuid.uuid4())
-                
-                event_data = {
-                    'id': event_id,
-                    'title': 'Imported Event',
-                    'date': '2025-03-15',
-                    'time': '14:00:00',
-                    'description': 'This event was imported from an external calendar',
-                    'location': 'External Location',
-                    'category': 'family',
-                    'family_id': current_user.family_id,
-                    'created_by': current_user.id,
-                    'is_recurring': False
-                }
-                
-                db.table('events').insert(event_data).execute()
-                
-                return jsonify({'success': True, 'message': 'Calendar imported successfully'})
+            
+            # The upload is parsed one VEVENT at a time while batches are written
+            warnings = []
+            counts = import_calendar_rows(current_user.family_id, current_user.id, source,
+                                          iter_import_rows(file.stream, warnings=warnings), sync)
+            
+            if counts['created'] or counts['updated'] or counts['deleted']:
+                invalidate_family_calendar(current_user.family_id)
+            
+            message = (f"Calendar imported: {counts['created']} added, {counts['updated']} updated, "
+                       f"{counts['unchanged']} unchanged, {counts['deleted']} removed")
+            if warnings:
+                message += f" ({len(warnings)} events could not be imported exactly as written)"
+            
+            return jsonify({
+                'success': True,
+                'message': message,
+                'counts': counts,
+                'warnings': warnings[:MAX_IMPORT_WARNINGS],
+                'warning_count': len(warnings)
+            })
         
         return jsonify({'success': False, 'message': 'No file uploaded or unsupported source'}), 400
     except Exception as e:
+        app.logger.error(f"Error importing calendar: {str(e)}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@app.route('/export_calendar')
-@login_required
-def export_calendar():
-    """Export calendar events to iCal format."""
-    try:
-        from database import db
-        import datetime
-        from icalendar import Calendar, ICalEvent, vText
-        from flask import Response
-        import pytz
-        
-        # Get filter parameters
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        category = request.args.get('category')
-        member_id = request.args.get('member_id')
-        include_shared = request.args.get('include_shared', 'true') == 'true'
-        
-        # Get all events for the user's family
-        query = db.table('events').select('*').eq('family_id', current_user.family_id)
-        
+# Rows read per page when streaming large result sets
+EXPORT_PAGE_SIZE = 500
+
+def iter_rows_by_id(build_query, page_size=EXPORT_PAGE_SIZE):
+    """Yield the rows of a query one page at a time.
+
+    build_query() must return a fresh query; pages are read in ID order using
+    the last seen ID as the cursor, so memory stays bounded by page_size.
+    """
+    last_id = None
+    while True:
+        query = build_query()
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        rows = query.order('id').limit(page_size).execute().data
+
+        yield from rows
+
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]['id']
+
+def get_organizer_emails(family_id, extra_user_ids=()):
+    """Map user IDs to email addresses for a family and any extra users, in one query."""
+    from database import db
+
+    query = db.table('users').select('id, email')
+    extra_user_ids = sorted(set(extra_user_ids))
+    if extra_user_ids:
+        query = query.or_(f"family_id.eq.{family_id},id.in.({','.join(extra_user_ids)})")
+    else:
+        query = query.eq('family_id', family_id)
+
+    return {user['id']: user['email'] for user in query.execute().data if user.get('email')}
+
+def export_family_calendar(family_id, calendar_name, start_date=None, end_date=None, category=None,
+                           member_id=None, include_shared=True):
+    """Build a family's iCalendar export as a generator of byte chunks.
+
+    Shared events and organizer emails are loaded before the first chunk;
+    the family's own events are then read page by page while streaming.
+    """
+    from database import db
+
+    def build_query():
+        query = db.table('events').select('*').eq('family_id', family_id)
+
         # Apply date filters if provided
         if start_date:
             query = query.gte('date', start_date)
         if end_date:
             query = query.lte('date', end_date)
-            
+
         # Apply category filter if provided
         if category and category != 'all':
             query = query.eq('category', category)
-            
+
         # Apply member filter if provided
         if member_id and member_id != 'all':
             query = query.eq('created_by', member_id)
-            
-        events_response = query.execute()
-        events = events_response.data
+
+        return query
+
+    # Also get shared events that this family can see
+    shared_events = []
+    if include_shared:
+        shared_events = get_events_shared_with_family(family_id, start_date, end_date, category)
+
+    # Resolve every organizer and series exception up front instead of once per event
+    shared_creators = {event['created_by'] for event in shared_events if event.get('created_by')}
+    organizer_emails = get_organizer_emails(family_id, shared_creators)
+
+    exceptions_by_event = fetch_family_exceptions(family_id)
+    exceptions_by_event.update(fetch_event_exceptions([event['id'] for event in shared_events if is_recurring_event(event)]))
+
+    events = itertools.chain(iter_rows_by_id(build_query), shared_events)
+    return iter_ics(events, organizer_emails, calendar_name, exceptions_by_event)
+
+@app.route('/export_calendar')
+@login_required
+def export_calendar():
+    """Export calendar events to iCal format as a streamed download."""
+    try:
+        from flask import Response, stream_with_context
         
-        # Also get shared events that this family can see
-        shared_events = []
-        if include_shared:
-            shared_query = db.table('events').select('*').neq('family_id', current_user.family_id)
-            
-            # Apply date filters if provided
-            if start_date:
-                shared_query = shared_query.gte('date', start_date)
-            if end_date:
-                shared_query = shared_query.lte('date', end_date)
-                
-            # Apply category filter if provided
-            if category and category != 'all':
-                shared_query = shared_query.eq('category', category)
-                
-            shared_response = shared_query.execute()
-            
-            # Filter shared events to only include those shared with this family
-            for event_data in shared_response.data:
-                shared_with = event_data.get('shared_with', '')
-                if shared_with and current_user.family_id in shared_with.split(','):
-                    events.append(event_data)
-        
-        # Create a new calendar
-        cal = Calendar()
-        cal.add('prodid', '-//FamilySphere//familysphere.app//')
-        cal.add('version', '2.0')
-        cal.add('calscale', 'GREGORIAN')
-        cal.add('method', 'PUBLISH')
-        cal.add('x-wr-calname', f'FamilySphere - {current_user.username}\'s Family Calendar')
-        
-        # Add events to the calendar
-        for event in events:
-            event = ICalEvent()
-            
-            # Required fields
-            event.add('summary', event['title'])
-            
-            # Convert date string to datetime
-            event_date = datetime.datetime.strptime(event['date'], '%Y-%m-%d').date()
-            
-            # Handle all-day events vs. timed events
-            if event.get('all_day'):
-                # All-day events need a DATE value
-                event.add('dtstart', event_date, parameters={'VALUE': 'DATE'})
-                
-                # For all-day events, the end date should be the day after (per iCalendar spec)
-                end_date = event_date + datetime.timedelta(days=1)
-                event.add('dtend', end_date, parameters={'VALUE': 'DATE'})
-            else:
-                # Add time if available
-                if event.get('time'):
-                    try:
-                        # Try parsing with seconds
-                        event_time = datetime.datetime.strptime(event['time'], '%H:%M:%S').time()
-                    except ValueError:
-                        # If that fails, try without seconds
-                        event_time = datetime.datetime.strptime(event['time'], '%H:%M').time()
-                    
-                    event_start = datetime.datetime.combine(event_date, event_time)
-                    
-                    # Add timezone information (assuming Eastern Time - can be customized later)
-                    local_tz = pytz.timezone('America/New_York')
-                    event_start = local_tz.localize(event_start)
-                    
-                    event.add('dtstart', event_start)
-                    
-                    # Add end time if available, otherwise default to 1 hour
-                    if event.get('end_time'):
-                        try:
-                            # Try parsing with seconds
-                            end_time = datetime.datetime.strptime(event['end_time'], '%H:%M:%S').time()
-                        except ValueError:
-                            # If that fails, try without seconds
-                            end_time = datetime.datetime.strptime(event['end_time'], '%H:%M').time()
-                            
-                        end_datetime = datetime.datetime.combine(event_date, end_time)
-                        end_datetime = local_tz.localize(end_datetime)
-                    else:
-                        end_datetime = event_start + datetime.timedelta(hours=1)
-                    
-                    event.add('dtend', end_datetime)
-                else:
-                    # Fallback for events with date but no time
-                    event.add('dtstart', event_date, parameters={'VALUE': 'DATE'})
-                    event.add('dtend', event_date + datetime.timedelta(days=1), parameters={'VALUE': 'DATE'})
-            
-            # Optional fields
-            if event.get('description'):
-                event.add('description', event['description'])
-            
-            if event.get('location'):
-                event.add('location', vText(event['location']))
-            
-            # Add category
-            if event.get('category'):
-                event.add('categories', event['category'])
-            
-            # Add unique ID
-            event.add('uid', f"{event['id']}@familysphere.app")
-            
-            # Add creation timestamp
-            event.add('dtstamp', datetime.datetime.now(pytz.utc))
-            
-            # Handle recurring events
-            if event.get('is_recurring') or event.get('recurrence_pattern'):
-                recurrence_pattern = event.get('recurrence_pattern')
-                
-                if recurrence_pattern == 'daily':
-                    event.add('rrule', {'FREQ': 'DAILY'})
-                elif recurrence_pattern == 'weekly':
-                    event.add('rrule', {'FREQ': 'WEEKLY'})
-                elif recurrence_pattern == 'biweekly':
-                    event.add('rrule', {'FREQ': 'WEEKLY', 'INTERVAL': 2})
-                elif recurrence_pattern == 'monthly':
-                    event.add('rrule', {'FREQ': 'MONTHLY'})
-                elif recurrence_pattern == 'yearly':
-                    event.add('rrule', {'FREQ': 'YEARLY'})
-                
-                # Add end date if specified
-                if event.get('recurrence_end_date'):
-                    end_date = datetime.datetime.strptime(event['recurrence_end_date'], '%Y-%m-%d').date()
-                    event.add('rrule', {'UNTIL': end_date})
-            
-            # Add organizer if available
-            if event.get('created_by'):
-                # Get user info
-                user_response = db.table('users').select('username, email').eq('id', event['created_by']).execute()
-                if user_response.data:
-                    user = user_response.data[0]
-                    if user.get('email'):
-                        event.add('organizer', f"mailto:{user['email']}")
-            
-            # Add the event to the calendar
-            cal.add_component(event)
+        # Get filter parameters
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        category = request.args.get('category')
+        member_id = request.args.get('member_id')
+        include_shared = request.args.get('include_shared', 'true') == 'true'
         
-        # Generate iCal file
-        ical_data = cal.to_ical()
+        ical_chunks = export_family_calendar(current_user.family_id,
+                                             f'FamilySphere - {current_user.username}\'s Family Calendar',
+                                             start_date, end_date, category, member_id, include_shared)
         
-        # Create response with iCal data
-        response = Response(ical_data, mimetype='text/calendar')
-        filename = f"familysphere_calendar_{datetime.datetime.now().strftime('%Y%m%d')}.ics"
+        # Stream the iCal data as a chunked response
+        response = Response(stream_with_context(ical_chunks), mimetype='text/calendar')
+        filename = f"familysphere_calendar_{datetime.now().strftime('%Y%m%d')}.ics"
         response.headers['Content-Disposition'] = f'attachment; filename={filename}'
         
         # Add success flash message
@@ -1060,79 +1610,167 @@ def export_calendar():
         flash(f"Error exporting calendar: {str(e)}", "danger")
         return redirect(url_for('calendar'))
 
-@app.route('/event_reminders')
+# Snapshots older than this are rebuilt even without a recorded change
+SNAPSHOT_MAX_AGE = timedelta(days=1)
+
+def subscription_filter_key(subscription):
+    """Canonical key for the filter combination of a calendar subscription."""
+    return '|'.join([
+        subscription.get('category') or 'all',
+        subscription.get('member_id') or 'all',
+        'shared' if subscription.get('include_shared', True) else 'own'
+    ])
+
+def get_calendar_snapshot(subscription):
+    """Get the stored iCal snapshot for a subscription's family and filters, building it if needed.
+
+    Returns a dict with ical, etag and generated_at. Snapshots are deleted by
+    invalidate_family_calendar() whenever the family's calendar changes.
+    """
+    from database import db
+    import hashlib
+    
+    family_id = subscription['family_id']
+    filter_key = subscription_filter_key(subscription)
+    
+    snapshot_response = db.table('calendar_snapshots').select('ical, etag, generated_at') \
+        .eq('family_id', family_id).eq('filter_key', filter_key).execute()
+    if snapshot_response.data:
+        snapshot = snapshot_response.data[0]
+        snapshot['generated_at'] = datetime.fromisoformat(snapshot['generated_at'])
+        if datetime.now(pytz.utc) - snapshot['generated_at'] < SNAPSHOT_MAX_AGE:
+            return snapshot
+    
+    family_response = db.table('families').select('name').eq('id', family_id).execute()
+    family_name = family_response.data[0]['name'] if family_response.data else 'Family'
+    
+    ical_chunks = export_family_calendar(family_id, f'FamilySphere - {family_name}',
+                                         category=subscription.get('category'),
+                                         member_id=subscription.get('member_id'),
+                                         include_shared=subscription.get('include_shared', True))
+    ical = b''.join(ical_chunks).decode('utf-8')
+    
+    snapshot = {
+        'family_id': family_id,
+        'filter_key': filter_key,
+        'ical': ical,
+        'etag': hashlib.sha256(ical.encode('utf-8')).hexdigest(),
+        'generated_at': datetime.now(pytz.utc).replace(microsecond=0)
+    }
+    db.table('calendar_snapshots').upsert(dict(snapshot, generated_at=snapshot['generated_at'].isoformat()),
+                                          on_conflict='family_id,filter_key').execute()
+    return snapshot
+
+@app.route('/calendar/subscriptions', methods=['POST'])
 @login_required
-def event_reminders():
-    """Display and manage event reminders for the user."""
+def create_calendar_subscription():
+    """Create a subscription URL that calendar apps can poll for the family calendar."""
     from database import db
-    import datetime
+    import secrets
     
-    # Get all events with reminders for the user
-    events_response = db.table('events').select('*').eq('family_id', current_user.family_id).eq('reminder_enabled', True).execute()
-    events_with_reminders = events_response.data
+    try:
+        data = request.get_json(silent=True) or request.form
+        category = data.get('category')
+        member_id = data.get('member_id')
+        include_shared = str(data.get('include_shared', 'true')).lower() == 'true'
+        
+        subscription_data = {
+            'id': str(uuid.uuid4()),
+            'token': secrets.token_urlsafe(32),
+            'family_id': current_user.family_id,
+            'created_by': current_user.id,
+            'category': category if category and category != 'all' else None,
+            'member_id': member_id if member_id and member_id != 'all' else None,
+            'include_shared': include_shared,
+            'created_at': datetime.now().isoformat()
+        }
+        
+        db.table('calendar_subscriptions').insert(subscription_data).execute()
+        
+        return jsonify({
+            'success': True,
+            'subscription_id': subscription_data['id'],
+            'url': url_for('calendar_subscription_feed', token=subscription_data['token'], _external=True)
+        })
+    except Exception as e:
+        app.logger.error(f"Error creating calendar subscription: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to create calendar subscription'}), 500
+
+@app.route('/calendar/subscriptions/<subscription_id>/revoke', methods=['POST'])
+@login_required
+def revoke_calendar_subscription(subscription_id):
+    """Revoke a calendar subscription URL."""
+    from database import db
     
-    # Current date and time for calculating upcoming reminders
-    now = datetime.datetime.now()
+    try:
+        db.table('calendar_subscriptions').delete().eq('id', subscription_id).eq('family_id', current_user.family_id).execute()
+        return jsonify({'success': True, 'message': 'Subscription revoked'})
+    except Exception as e:
+        app.logger.error(f"Error revoking calendar subscription: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to revoke calendar subscription'}), 500
+
+@app.route('/calendar/feed/<token>.ics')
+def calendar_subscription_feed(token):
+    """Serve the iCal snapshot for a subscription token, answering 304 when unchanged."""
+    from database import db
+    from flask import Response
     
-    # Process events to determine upcoming reminders
-    upcoming_reminders = []
-    for event in events_with_reminders:
-        event_date = datetime.datetime.strptime(f"{event['date']}T{event['time'] if event['time'] else '00:00:00'}", "%Y-%m-%dT%H:%M:%S")
-        
-        # Calculate reminder time based on minutes before event
-        reminder_minutes = int(event.get('reminder_time', 60))  # Default to 1 hour if not specified
-        reminder_time = event_date - datetime.timedelta(minutes=reminder_minutes)
-        
-        # Only include future reminders
-        if reminder_time > now:
-            upcoming_reminders.append({
-                'event_id': event['id'],
-                'title': event['title'],
-                'event_date': event_date,
-                'reminder_time': reminder_time,
-                'minutes_before': reminder_minutes,
-                'notification_method': event.get('notification_method', 'app')
-            })
+    subscription_response = db.table('calendar_subscriptions').select('family_id, category, member_id, include_shared') \
+        .eq('token', token).execute()
+    if not subscription_response.data:
+        return Response('Subscription not found', status=404, mimetype='text/plain')
     
-    # Sort reminders by reminder time
-    upcoming_reminders.sort(key=lambda x: x['reminder_time'])
+    snapshot = get_calendar_snapshot(subscription_response.data[0])
     
-    return render_template('event_reminders.html', reminders=upcoming_reminders)
+    response = Response(snapshot['ical'], mimetype='text/calendar')
+    response.set_etag(snapshot['etag'])
+    response.last_modified = snapshot['generated_at']
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
 
-@app.route('/check_reminders')
+# Reminders shown per page on the reminders page
+REMINDERS_PAGE_SIZE = 25
+
+@app.route('/event_reminders')
 @login_required
-def check_reminders():
-    """API endpoint to check for due reminders."""
+def event_reminders():
+    """Display and manage event reminders for the user."""
     from database import db
-    import datetime
-    
-    # Get all events with reminders for the user
-    events_response = db.table('events').select('*').eq('family_id', current_user.family_id).eq('reminder_enabled', True).execute()
-    events_with_reminders = events_response.data
-    
-    # Current date and time
-    now = datetime.datetime.now()
-    
-    # Process events to determine due reminders
-    due_reminders = []
-    for event in events_with_reminders:
-        event_date = datetime.datetime.strptime(f"{event['date']}T{event['time'] if event['time'] else '00:00:00'}", "%Y-%m-%dT%H:%M:%S")
-        
-        # Calculate reminder time based on minutes before event
-        reminder_minutes = int(event.get('reminder_time', 60))  # Default to 1 hour if not specified
-        reminder_time = event_date - datetime.timedelta(minutes=reminder_minutes)
-        
-        # Check if reminder is due (within the last 5 minutes)
-        time_diff = (now - reminder_time).total_seconds() / 60
-        if 0 <= time_diff <= 5:  # Reminder is due within the last 5 minutes
-            due_reminders.append({
-                'event_id': event['id'],
-                'title': event['title'],
-                'event_date': event_date.strftime("%Y-%m-%d %H:%M"),
-                'notification_method': event.get('notification_method', 'app')
-            })
     
-    return jsonify({'reminders': due_reminders})
+    page = max(request.args.get('page', 1, type=int), 1)
+    offset = (page - 1) * REMINDERS_PAGE_SIZE
+    
+    # next_reminder_at holds each event's next fire time (the next occurrence for a series),
+    # so upcoming reminders are one indexed range query in fire-time order
+    reminders_response = db.table('events') \
+        .select('id, title, date, time, reminder_time, notification_method, next_reminder_at') \
+        .eq('family_id', current_user.family_id) \
+        .eq('reminder_enabled', True) \
+        .gt('next_reminder_at', local_now().isoformat()) \
+        .order('next_reminder_at') \
+        .range(offset, offset + REMINDERS_PAGE_SIZE) \
+        .execute()
+    
+    # One extra row is requested to tell whether there is a next page
+    rows = reminders_response.data
+    has_next = len(rows) > REMINDERS_PAGE_SIZE
+    
+    upcoming_reminders = []
+    for event in rows[:REMINDERS_PAGE_SIZE]:
+        # Same lead time as the worker uses, including its default for missing or bad values
+        minutes_before = reminder_minutes(event)
+        reminder_time = datetime.fromisoformat(event['next_reminder_at'])
+        upcoming_reminders.append({
+            'event_id': event['id'],
+            'title': event['title'],
+            'event_date': reminder_time + timedelta(minutes=minutes_before),
+            'reminder_time': reminder_time,
+            'minutes_before': minutes_before,
+            'notification_method': event.get('notification_method', 'app')
+        })
+    
+    return render_template('event_reminders.html', reminders=upcoming_reminders,
+                           page=page, has_next=has_next)
 
 @app.route('/update_reminder_preferences', methods=['POST'])
 @login_required
@@ -1151,7 +1789,7 @@ def update_reminder_preferences():
             return jsonify({'success': False, 'message': 'Missing event ID'}), 400
             
         # Check if user can edit this event
-        event_response = db.table('events').select('created_by').eq('id', event_id).execute()
+        event_response = db.table('events').select('*').eq('id', event_id).execute()
         if not event_response.data:
             return jsonify({'success': False, 'message': 'Event not found'}), 404
             
@@ -1168,39 +1806,207 @@ def update_reminder_preferences():
             update_data['reminder_time'] = reminder_time
             update_data['notification_method'] = notification_method
         
+        update_data['next_reminder_at'] = compute_next_reminder_at(dict(event, **update_data))
+        
         db.table('events').update(update_data).eq('id', event_id).execute()
         
+        invalidate_family_calendar(current_user.family_id)
+        
         return jsonify({'success': True, 'message': 'Reminder preferences updated'})
     except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+# Tasks routes
+# Leaderboards can cover all time, this week (from Monday) or this month, in UTC
+LEADERBOARD_PERIODS = ('all', 'week', 'month')
+
+def record_points(family_id, user_id, points, reason, task_id=None):
+    """Append an entry to a member's points ledger.
+
+    points_ledger is append-only; a trigger adds each entry to the member's
+    running total and weekly and monthly buckets. Corrections are recorded as
+    new entries with the opposite sign.
+    """
+    record_points_entries([{
+        'family_id': family_id,
+        'user_id': user_id,
+        'task_id': task_id,
+        'points': points,
+        'reason': reason
+    }])
+
+def record_points_entries(entries):
+    """Append several points ledger entries in one insert."""
+    from database import db
+    
+    if entries:
+        db.table('points_ledger').insert(entries).execute()
+
+def leaderboard_period_start(period, today=None):
+    """First day of the current week or month bucket."""
+    today = today or datetime.now(pytz.utc).date()
+    if period == 'week':
+        return today - timedelta(days=today.weekday())
+    return today.replace(day=1)
+
+def get_leaderboard(family_id, period='all'):
+    """Rank a family's members by points for a period, from the per-member aggregates.
+
+    Reads one aggregate row per member, however many tasks the family has.
+    Returns dicts with user_id, username and points, highest first.
+    """
+    from database import db
+    
+    users_response = db.table('users').select('id, username').eq('family_id', family_id).execute()
+    
+    if period == 'all':
+        points_response = db.table('member_points').select('user_id, total_points') \
+            .eq('family_id', family_id).execute()
+        points = {row['user_id']: row['total_points'] for row in points_response.data}
+    else:
+        points_response = db.table('member_points_buckets').select('user_id, points') \
+            .eq('family_id', family_id) \
+            .eq('period', period) \
+            .eq('period_start', leaderboard_period_start(period).isoformat()) \
+            .execute()
+        points = {row['user_id']: row['points'] for row in points_response.data}
+    
+    leaderboard = [{'user_id': user['id'], 'username': user['username'], 'points': points.get(user['id'], 0)}
+                   for user in users_response.data]
+    leaderboard.sort(key=lambda entry: (-entry['points'], entry['username']))
+    return leaderboard
+
+@app.route('/api/points/leaderboard')
+@login_required
+def points_leaderboard():
+    """Return the family points leaderboard for all time, this week or this month."""
+    period = request.args.get('period', 'all')
+    if period not in LEADERBOARD_PERIODS:
+        return jsonify({'success': False, 'message': 'Invalid period'}), 400
+    
+    try:
+        return jsonify({'success': True, 'period': period,
+                        'leaderboard': get_leaderboard(current_user.family_id, period)})
+    except Exception as e:
+        app.logger.error(f"Error getting leaderboard: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to get leaderboard'}), 500
+
+@app.route('/api/points/audit', methods=['POST'])
+@login_required
+def audit_points():
+    """Rebuild the family's points totals and buckets from the ledger, reporting any that had drifted."""
+    from database import db
+    
+    if current_user.role != 'Admin':
+        return jsonify({'success': False, 'message': 'Only family administrators can audit points'}), 403
+    
+    try:
+        mismatches = db.rpc('recompute_member_points', {'p_family_id': current_user.family_id}).execute().data
+        return jsonify({'success': True, 'mismatches': mismatches or []})
+    except Exception as e:
+        app.logger.error(f"Error auditing points: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to audit points'}), 500
+
+# Completed tasks shown per "load more" page
+TASKS_PAGE_SIZE = 20
+MAX_TASKS_PAGE_SIZE = 100
+
+def tasks_page_size(value):
+    """Read a requested page size, falling back to TASKS_PAGE_SIZE and capping at MAX_TASKS_PAGE_SIZE."""
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return TASKS_PAGE_SIZE
+    return max(1, min(page_size, MAX_TASKS_PAGE_SIZE))
+
+def get_completed_tasks_page(family_id, page_size=TASKS_PAGE_SIZE, after_completed_at=None, after_id=None):
+    """Get a page of a family's completed tasks, most recently completed first.
+
+    Pages are keyset-paginated on (completed_at, id): pass the cursor of the
+    previous page to get the tasks after it. Returns (tasks, next_cursor),
+    where next_cursor is None on the last page.
+    """
+    from database import db
+    
+    query = db.table('tasks').select('*') \
+        .eq('family_id', family_id) \
+        .eq('status', 'Completed')
+    if after_completed_at and after_id:
+        query = query.or_(f'completed_at.lt."{after_completed_at}",'
+                          f'and(completed_at.eq."{after_completed_at}",id.lt.{after_id})')
+    
+    # One extra row tells whether another page follows
+    rows = query.order('completed_at', desc=True).order('id', desc=True).limit(page_size + 1).execute().data
+    tasks = rows[:page_size]
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        next_cursor = {'completed_at': tasks[-1]['completed_at'], 'id': tasks[-1]['id']}
+    return tasks, next_cursor
 
-# Tasks routes
 @app.route('/tasks')
 @login_required
 def tasks():
-    """Display the family tasks and chores."""
+    """Display the family tasks and chores.
+
+    Pending tasks are listed in full; completed tasks show their first page
+    and the rest are fetched with "load more" from completed_tasks_page.
+    """
     from database import db
     
-    # Get all tasks for the user's family
-    tasks_response = db.table('tasks').select('*').eq('family_id', current_user.family_id).execute()
-    tasks = tasks_response.data
+    # Pending tasks come from the (family_id, status, due_date) index
+    pending_response = db.table('tasks').select('*') \
+        .eq('family_id', current_user.family_id) \
+        .eq('status', 'Pending') \
+        .order('due_date') \
+        .execute()
+    pending_tasks = pending_response.data
+    
+    completed_tasks, completed_cursor = get_completed_tasks_page(current_user.family_id,
+                                                                 tasks_page_size(request.args.get('page_size')))
+    
+    # Current best bids on unassigned tasks
+    auctions = get_auctions(task['id'] for task in pending_tasks if not task.get('assigned_to'))
     
     # Get all users in the family for assignment dropdown
     users_response = db.table('users').select('id, username').eq('family_id', current_user.family_id).execute()
     users = {user['id']: user['username'] for user in users_response.data}
     
-    # Separate tasks by status
-    pending_tasks = [task for task in tasks if task['status'] == 'Pending']
-    completed_tasks = [task for task in tasks if task['status'] == 'Completed']
-    
     # User map is now the same as users
     user_map = {user['id']: user['username'] for user in users_response.data}
     
     return render_template('tasks.html', 
                           pending_tasks=pending_tasks, 
+                          auctions=auctions, 
                           completed_tasks=completed_tasks,
+                          completed_cursor=completed_cursor,
                           users=users,
-                          user_map=user_map)
+                          user_map=user_map,
+                          leaderboard=get_leaderboard(current_user.family_id))
+
+@app.route('/api/tasks/completed')
+@login_required
+def completed_tasks_page():
+    """Return the next page of completed tasks as table rows, for "load more" on the tasks page."""
+    from database import db
+    
+    try:
+        completed_tasks, next_cursor = get_completed_tasks_page(current_user.family_id,
+                                                                tasks_page_size(request.args.get('page_size')),
+                                                                request.args.get('after_completed_at'),
+                                                                request.args.get('after_id'))
+        
+        users_response = db.table('users').select('id, username').eq('family_id', current_user.family_id).execute()
+        user_map = {user['id']: user['username'] for user in users_response.data}
+        
+        return jsonify({
+            'success': True,
+            'html': render_template('task_rows.html', task_list=completed_tasks, user_map=user_map),
+            'next_cursor': next_cursor
+        })
+    except Exception as e:
+        app.logger.error(f"Error loading completed tasks: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to load completed tasks'}), 500
 
 @app.route('/add_task', methods=['GET', 'POST'])
 @login_required
@@ -1219,12 +2025,27 @@ def add_task():
             due_date = request.form.get('due_date')
             assigned_to = request.form.get('assigned_to')
             points = request.form.get('points', 0)
+            repeat = request.form.get('repeat')
+            repeat_until = request.form.get('repeat_until')
             
             # Validate input
             if not title or not due_date:
                 flash('Title and due date are required', 'danger')
                 return render_template('add_task.html', users=users)
             
+            if repeat:
+                # The first occurrence is created now; the worker creates the rest ahead of time
+                from task_series import create_series
+                series = create_series(current_user.family_id, current_user.id, title, description,
+                                       int(points) if points else 0, assigned_to if assigned_to else None,
+                                       repeat, due_date, repeat_until or None)
+                if series is None:
+                    flash('The task does not repeat before its end date', 'danger')
+                    return render_template('add_task.html', users=users)
+                refresh_task_counts(current_user.family_id)
+                flash('Recurring task added successfully', 'success')
+                return redirect(url_for('tasks'))
+            
             # Create new task
             import uuid
             task_id = str(uuid.uuid4())
@@ -1242,6 +2063,7 @@ def add_task():
             }
             
             task_insert = db.table('tasks').insert(task_data).execute()
+            refresh_task_counts(current_user.family_id)
             
             flash('Task added successfully', 'success')
             return redirect(url_for('tasks'))
@@ -1252,34 +2074,214 @@ def add_task():
     # GET request - show the form
     return render_template('add_task.html', users=users)
 
-@app.route('/complete_task/<task_id>', methods=['POST'])
-@login_required
-def complete_task(task_id):
-    """Mark a task as completed."""
+# Operations accepted by the bulk task endpoint, and the most tasks one request may change
+TASK_OPERATIONS = ('complete', 'reopen', 'reassign', 'delete')
+MAX_BULK_TASKS = 200
+
+def refresh_task_counts(family_id):
+    """Recount a family's overdue and due-soon tasks after a change, so the dashboard badge is current."""
+    try:
+        save_task_counts([family_id], local_now())
+    except Exception as e:
+        app.logger.error(f"Error refreshing task counts: {str(e)}")
+
+def apply_task_operation(family_id, user_id, task_ids, operation, assigned_to=None):
+    """Complete, reopen, reassign or delete a family's tasks with one guarded write.
+
+    The write is filtered on family_id and, for complete and reopen, on the
+    status it moves the task out of, so tasks of other families and tasks
+    already in the target state are left alone without reading them first.
+    Points are credited for completed tasks and taken back for reopened ones.
+    Returns a result per ID, in order, with success, message and an
+    HTTP-style status.
+    """
     from database import db
     
-    # Get task data
-    task_response = db.table('tasks').select('*').eq('id', task_id).execute()
+    task_ids = list(dict.fromkeys(str(task_id) for task_id in task_ids))
+    now = datetime.now(pytz.utc).isoformat()
     
-    if not task_response.data:
-        flash('Task not found', 'danger')
-        return redirect(url_for('tasks'))
+    if operation == 'complete':
+        query = db.table('tasks').update({'status': 'Completed', 'completed_at': now}).eq('status', 'Pending')
+    elif operation == 'reopen':
+        query = db.table('tasks').update({'status': 'Pending', 'completed_at': None}).eq('status', 'Completed')
+    elif operation == 'reassign':
+        query = db.table('tasks').update({'assigned_to': assigned_to})
+    else:
+        query = db.table('tasks').delete()
+    
+    changed = query.in_('id', task_ids).eq('family_id', family_id).execute().data
+    changed_ids = {task['id'] for task in changed}
+    if changed_ids and operation != 'reassign':
+        refresh_task_counts(family_id)
+    
+    if operation == 'complete':
+        record_points_entries([{
+            'family_id': family_id,
+            'user_id': task.get('assigned_to') or user_id,
+            'task_id': task['id'],
+            'points': task['points'],
+            'reason': 'task_completed'
+        } for task in changed if task.get('points')])
+    elif operation == 'reopen' and changed_ids:
+        # Take back the latest credit of each reopened task
+        credits_response = db.table('points_ledger').select('task_id, user_id, points') \
+            .in_('task_id', list(changed_ids)).eq('reason', 'task_completed') \
+            .order('id', desc=True).execute()
+        latest_credits = {}
+        for credit in credits_response.data:
+            latest_credits.setdefault(credit['task_id'], credit)
+        record_points_entries([{
+            'family_id': family_id,
+            'user_id': credit['user_id'],
+            'task_id': task_id,
+            'points': -credit['points'],
+            'reason': 'task_reopened'
+        } for task_id, credit in latest_credits.items()])
+    
+    # Only IDs the write skipped need a read, to tell missing tasks from ones already in that state
+    unchanged = {}
+    skipped_ids = [task_id for task_id in task_ids if task_id not in changed_ids]
+    if skipped_ids:
+        skipped_response = db.table('tasks').select('id, status') \
+            .in_('id', skipped_ids).eq('family_id', family_id).execute()
+        unchanged = {task['id']: task['status'] for task in skipped_response.data}
+    
+    results = []
+    for task_id in task_ids:
+        if task_id in changed_ids:
+            results.append({'task_id': task_id, 'success': True, 'status': 200})
+        elif task_id in unchanged:
+            results.append({'task_id': task_id, 'success': False, 'status': 409,
+                            'message': f'Task is already {unchanged[task_id].lower()}'})
+        else:
+            results.append({'task_id': task_id, 'success': False, 'status': 404, 'message': 'Task not found'})
+    return results
+
+@app.route('/api/tasks/bulk', methods=['POST'])
+@login_required
+def bulk_task_operation():
+    """Apply one operation to a list of tasks, with a result per task."""
+    from database import db
     
-    task = task_response.data[0]
+    try:
+        data = request.json or {}
+        task_ids = data.get('task_ids')
+        operation = data.get('operation')
+        assigned_to = data.get('assigned_to')
+        
+        if not isinstance(task_ids, list) or not task_ids:
+            return jsonify({'success': False, 'message': 'No tasks provided'}), 400
+        
+        if len(task_ids) > MAX_BULK_TASKS:
+            return jsonify({'success': False, 'message': f'Cannot change more than {MAX_BULK_TASKS} tasks at once'}), 400
+        
+        if operation not in TASK_OPERATIONS:
+            return jsonify({'success': False, 'message': 'Invalid operation'}), 400
+        
+        if operation == 'reassign' and assigned_to:
+            member_response = db.table('users').select('id').eq('id', assigned_to).eq('family_id', current_user.family_id).execute()
+            if not member_response.data:
+                return jsonify({'success': False, 'message': 'Tasks can only be assigned to family members'}), 400
+        
+        results = apply_task_operation(current_user.family_id, current_user.id, task_ids, operation,
+                                       assigned_to or None)
+        
+        return jsonify({
+            'success': all(result['success'] for result in results),
+            'results': results
+        })
+    except Exception as e:
+        app.logger.error(f"Error applying bulk task operation: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to update tasks'}), 500
+
+@app.route('/api/tasks/auto_assign', methods=['POST'])
+@login_required
+def auto_assign_tasks():
+    """Spread the family's unassigned pending tasks fairly across its members.
     
-    # Check if user has permission to complete this task
-    if task['family_id'] != current_user.family_id:
-        flash('You do not have permission to complete this task', 'danger')
-        return redirect(url_for('tasks'))
+    Tasks in an open chore auction are left to the auction. With dry_run the
+    assignments are returned without being saved.
+    """
+    from database import db
+    from auctions import get_auctions
+    from chore_balance import balance_chores, task_load
     
-    # Update task status in database
-    db.table('tasks').update({'status': 'Completed'}).eq('id', task_id).execute()
+    try:
+        data = request.json or {}
+        family_id = current_user.family_id
+        
+        members = db.table('users').select('id, username, role').eq('family_id', family_id).execute().data
+        pending = db.table('tasks').select('id, title, points, due_date, assigned_to') \
+            .eq('family_id', family_id).eq('status', 'Pending').execute().data
+        
+        loads = {}
+        unassigned = []
+        for task in pending:
+            if task['assigned_to']:
+                loads[task['assigned_to']] = loads.get(task['assigned_to'], 0) + task_load(task)
+            else:
+                unassigned.append(task)
+        
+        auctions = get_auctions(task['id'] for task in unassigned)
+        unassigned = [task for task in unassigned
+                      if auctions.get(task['id'], {}).get('status') != 'open']
+        
+        assignments = balance_chores(unassigned, members, loads)
+        
+        if not data.get('dry_run'):
+            by_member = {}
+            for task_id, member_id in assignments.items():
+                by_member.setdefault(member_id, []).append(task_id)
+            
+            # Tasks claimed or assigned by hand in the meantime keep their assignee
+            saved = {}
+            for member_id, task_ids in by_member.items():
+                updated = db.table('tasks').update({'assigned_to': member_id}) \
+                    .in_('id', task_ids) \
+                    .eq('family_id', family_id) \
+                    .eq('status', 'Pending') \
+                    .is_('assigned_to', 'null') \
+                    .execute().data
+                saved.update((task['id'], member_id) for task in updated)
+            assignments = saved
+        
+        usernames = {member['id']: member['username'] for member in members}
+        return jsonify({
+            'success': True,
+            'assignments': [{
+                'task_id': task['id'],
+                'title': task['title'],
+                'assigned_to': assignments[task['id']],
+                'username': usernames.get(assignments[task['id']])
+            } for task in unassigned if task['id'] in assignments]
+        })
+    except Exception as e:
+        app.logger.error(f"Error auto-assigning tasks: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to assign tasks'}), 500
+
+@app.route('/task_series/<series_id>/stop', methods=['POST'])
+@login_required
+def stop_task_series(series_id):
+    """Stop a recurring task and remove its upcoming occurrences."""
+    from task_series import stop_series
     
-    # If the task has points and was assigned to the current user, we would update their points
-    # But since the points column doesn't exist in the users table, we'll skip this for now
-    # In a future update, we could add this column to the users table
+    if stop_series(current_user.family_id, series_id, local_now().date()):
+        refresh_task_counts(current_user.family_id)
+        flash('Recurring task stopped', 'success')
+    else:
+        flash('Recurring task not found', 'danger')
+    return redirect(url_for('tasks'))
+
+@app.route('/complete_task/<task_id>', methods=['POST'])
+@login_required
+def complete_task(task_id):
+    """Mark a task as completed."""
+    result = apply_task_operation(current_user.family_id, current_user.id, [task_id], 'complete')[0]
     
-    flash('Task marked as completed', 'success')
+    if result['success']:
+        flash('Task marked as completed', 'success')
+    else:
+        flash(result['message'], 'danger')
     return redirect(url_for('tasks'))
 
 @app.route('/edit_task/<task_id>', methods=['GET', 'POST'])
@@ -1329,7 +2331,15 @@ def edit_task(task_id):
         }
         
         # Update task in database
-        db.table('tasks').update(task_data).eq('id', task_id).execute()
+        try:
+            db.table('tasks').update(task_data).eq('id', task_id).execute()
+        except Exception as e:
+            # A series has at most one task per due date
+            if 'idx_tasks_series_due' not in str(e):
+                raise
+            flash('This recurring task already has an occurrence on that date', 'danger')
+            return redirect(url_for('edit_task', task_id=task_id))
+        refresh_task_counts(current_user.family_id)
         
         flash('Task updated successfully', 'success')
         return redirect(url_for('tasks'))
@@ -1340,52 +2350,24 @@ def edit_task(task_id):
 @login_required
 def delete_task(task_id):
     """Delete a task."""
-    from database import db
-    
-    # Get task data
-    task_response = db.table('tasks').select('*').eq('id', task_id).execute()
-    
-    if not task_response.data:
-        flash('Task not found', 'danger')
-        return redirect(url_for('tasks'))
-    
-    task = task_response.data[0]
-    
-    # Check if user has permission to delete this task
-    if task['family_id'] != current_user.family_id:
-        flash('You do not have permission to delete this task', 'danger')
-        return redirect(url_for('tasks'))
+    result = apply_task_operation(current_user.family_id, current_user.id, [task_id], 'delete')[0]
     
-    # Delete task from database
-    db.table('tasks').delete().eq('id', task_id).execute()
-    
-    flash('Task deleted successfully', 'success')
+    if result['success']:
+        flash('Task deleted successfully', 'success')
+    else:
+        flash(result['message'], 'danger')
     return redirect(url_for('tasks'))
 
 @app.route('/reopen_task/<task_id>', methods=['POST'])
 @login_required
 def reopen_task(task_id):
     """Reopen a completed task."""
-    from database import db
-    
-    # Get task data
-    task_response = db.table('tasks').select('*').eq('id', task_id).execute()
+    result = apply_task_operation(current_user.family_id, current_user.id, [task_id], 'reopen')[0]
     
-    if not task_response.data:
-        flash('Task not found', 'danger')
-        return redirect(url_for('tasks'))
-    
-    task = task_response.data[0]
-    
-    # Check if user has permission to reopen this task
-    if task['family_id'] != current_user.family_id:
-        flash('You do not have permission to reopen this task', 'danger')
-        return redirect(url_for('tasks'))
-    
-    # Update task status in database
-    db.table('tasks').update({'status': 'Pending'}).eq('id', task_id).execute()
-    
-    flash('Task reopened', 'success')
+    if result['success']:
+        flash('Task reopened', 'success')
+    else:
+        flash(result['message'], 'danger')
     return redirect(url_for('tasks'))
 
 @app.route('/task/<task_id>')
@@ -1432,6 +2414,11 @@ def bid_task(task_id):
         flash('You do not have permission to bid on this task', 'danger')
         return redirect(url_for('tasks'))
     
+    # Only unassigned tasks are auctioned
+    if task['status'] != 'Pending' or task.get('assigned_to'):
+        flash('This task is not up for auction', 'danger')
+        return redirect(url_for('tasks'))
+    
     # Get bid points from form
     bid_points = request.form.get('bid_points', type=int)
     
@@ -1439,16 +2426,14 @@ def bid_task(task_id):
         flash('Invalid bid amount', 'danger')
         return redirect(url_for('tasks'))
     
-    # In a future update, we would check if the user has enough points
-    # and update the task and user points accordingly
-    
-    # For now, just assign the task to the user
-    db.table('tasks').update({
-        'assigned_to': current_user.id,
-        'points': bid_points
-    }).eq('id', task_id).execute()
+    outcome, auction = place_bid(task, current_user.id, bid_points)
     
-    flash(f'You have successfully bid {bid_points} points on this task', 'success')
+    if outcome == BID_ACCEPTED:
+        flash(f'Your bid of {bid_points} points is the lowest so far', 'success')
+    elif outcome == BID_OUTBID:
+        flash(f"Someone has already bid {auction['best_bid']} points; bid lower to win this task", 'warning')
+    else:
+        flash('Bidding on this task has closed', 'danger')
     return redirect(url_for('tasks'))
 
 # Finance routes
@@ -1470,24 +2455,87 @@ def finances():
         members_response = db.table('users').select('*').eq('family_id', current_user.family_id).execute()
         family['members'] = members_response.data
         
-        # Get finances data
-        finances_response = db.table('finances').select('*').eq('family_id', current_user.family_id).execute()
-        finances = finances_response.data
+        # Get finances data; expenses are summarised by the rollup instead of listed,
+        # and imported statements can add thousands of them
+        def build_query():
+            return db.table('finances').select('*') \
+                .eq('family_id', current_user.family_id).neq('type', 'Expense')
+        
+        finances = list(iter_rows_by_id(build_query))
         
         # Categorize finances
         budgets = [f for f in finances if f.get('type') == 'Budget']
         goals = [f for f in finances if f.get('type') == 'Goal']
         allowances = [f for f in finances if f.get('type') == 'Allowance']
         
+        rollup = get_finance_rollup(current_user.family_id)
+        
         return render_template('finances.html',
                               family=family,
                               budgets=budgets,
                               goals=goals,
-                              allowances=allowances)
+                              allowances=allowances,
+                              rollup=rollup,
+                              total_budget='%.2f' % rollup['totals']['budget'],
+                              remaining_budget='%.2f' % rollup['totals']['remaining'],
+                              total_goals='%.2f' % sum(goal['target_amount'] for goal in rollup['goals']),
+                              total_allowances='%.2f' % sum(float(a.get('amount') or 0) for a in allowances))
     except Exception as e:
         flash(f'Error loading finances: {str(e)}', 'danger')
         return redirect(url_for('dashboard'))
 
+# Finance rollups, keyed by month; invalidated whenever the family's finances change
+finance_cache = FamilyCache()
+
+def get_finance_rollup(family_id, month=None):
+    """Get a family's budgets vs. actuals rollup for a 'YYYY-MM' month, the current one by default.
+    
+    Only expenses dated inside the rollup's months are read, and every query
+    is paged, so long imported histories neither hit the row cap nor get
+    loaded whole.
+    """
+    from database import db
+    
+    month = month or month_key(date.today())
+    rollup = finance_cache.get(family_id, ('rollup', month))
+    if rollup is None:
+        months = month_range(month)
+        year, month_number = (int(part) for part in month.split('-'))
+        window_start = f'{months[0]}-01'
+        window_end = date(year + month_number // 12, month_number % 12 + 1, 1).isoformat()
+        
+        def build_expense_query():
+            return db.table('finances').select('id, type, category, amount, date, created_at') \
+                .eq('family_id', family_id).eq('type', 'Expense') \
+                .gte('date', window_start).lt('date', window_end)
+        
+        def build_plan_query():
+            return db.table('finances').select('*') \
+                .eq('family_id', family_id).in_('type', ['Budget', 'Goal'])
+        
+        rows = list(iter_rows_by_id(build_plan_query))
+        rows.extend(iter_rows_by_id(build_expense_query))
+        rollup = rollup_finances(rows, month)
+        finance_cache.set(family_id, ('rollup', month), rollup)
+    return rollup
+
+@app.route('/api/finances/rollup')
+@login_required
+def finance_rollup():
+    """Per-category spend vs. budget for a month, with spending history and goal progress."""
+    month = request.args.get('month') or month_key(date.today())
+    
+    try:
+        datetime.strptime(month, '%Y-%m')
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Month must be in YYYY-MM format'}), 400
+    
+    try:
+        return jsonify({'success': True, 'rollup': get_finance_rollup(current_user.family_id, month)})
+    except Exception as e:
+        app.logger.error(f"Error building finance rollup: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to load finance summary'}), 500
+
 @app.route('/add_finance', methods=['GET', 'POST'])
 @login_required
 def add_finance():
@@ -1556,6 +2604,7 @@ def add_finance():
             
             # Insert finance record into database
             finance_insert = db.table('finances').insert(finance_data).execute()
+            finance_cache.invalidate(current_user.family_id)
             
             flash(f'{finance_type} added successfully', 'success')
             return redirect(url_for('finances'))
@@ -1576,6 +2625,111 @@ def add_finance():
     
     return render_template('add_finance.html', family_members=family_members)
 
+# Expense rows written per multi-row upsert when importing bank statements
+EXPENSE_IMPORT_BATCH_SIZE = 1000
+
+def get_expense_hashes(family_id):
+    """Get the (date, amount, description) hashes of a family's existing expenses.
+    
+    Imported expenses carry their hash; ones entered by hand are hashed the
+    same way, numbering identical expenses as a statement would.
+    """
+    from database import db
+    
+    def build_query():
+        return db.table('finances').select('id, date, amount, title, description, import_hash') \
+            .eq('family_id', family_id).eq('type', 'Expense')
+    
+    hashes = set()
+    occurrences = {}
+    for row in iter_rows_by_id(build_query):
+        if row.get('import_hash'):
+            hashes.add(row['import_hash'])
+            continue
+        if not row.get('date') or row.get('amount') is None:
+            continue
+        description = row.get('description') or row.get('title')
+        key = (str(row['date'])[:10], float(row['amount']), normalize_description(description))
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        hashes.add(expense_hash(key[0], key[1], description, occurrence))
+    return hashes
+
+def import_expense_rows(family_id, user_id, expenses):
+    """Insert imported expense rows for a family in large batches, skipping ones it already has.
+    
+    expenses may contain None for statement lines that are not expenses.
+    Rows whose hash matches an existing expense are skipped; the unique
+    (family_id, import_hash) index also drops any a concurrent import wrote
+    first. Returns counts of each outcome.
+    """
+    from database import db
+    
+    existing = get_expense_hashes(family_id)
+    counts = {'imported': 0, 'duplicates': 0, 'skipped': 0}
+    batch = []
+    
+    def flush():
+        if batch:
+            inserted = db.table('finances') \
+                .upsert(batch, on_conflict='family_id,import_hash', ignore_duplicates=True) \
+                .execute().data
+            counts['imported'] += len(inserted)
+            counts['duplicates'] += len(batch) - len(inserted)
+            batch.clear()
+    
+    for expense in expenses:
+        if expense is None:
+            counts['skipped'] += 1
+            continue
+        if expense['import_hash'] in existing:
+            counts['duplicates'] += 1
+            continue
+        
+        batch.append(dict(expense,
+                          id=str(uuid.uuid4()),
+                          family_id=family_id,
+                          created_by=user_id,
+                          paid_by=user_id))
+        if len(batch) >= EXPENSE_IMPORT_BATCH_SIZE:
+            flush()
+    flush()
+    
+    return counts
+
+@app.route('/import_expenses', methods=['POST'])
+@login_required
+def import_expenses():
+    """Import the outgoing payments of a CSV or OFX bank statement as expenses."""
+    if current_user.role not in ['Admin', 'Member']:
+        return jsonify({'success': False, 'message': 'You do not have permission to import expenses'}), 403
+    
+    file = request.files.get('statement_file')
+    if file is None or file.filename == '':
+        return jsonify({'success': False, 'message': 'No file selected'}), 400
+    
+    try:
+        # The upload is parsed a line at a time while batches are written
+        category = request.form.get('category') or 'General'
+        try:
+            counts = import_expense_rows(current_user.family_id, current_user.id,
+                                         iter_statement_expenses(file.stream, file.filename, category))
+        finally:
+            # Earlier batches may be written even if a later one fails
+            finance_cache.invalidate(current_user.family_id)
+        
+        return jsonify({
+            'success': True,
+            'message': (f"Statement imported: {counts['imported']} expenses added, "
+                        f"{counts['duplicates']} already imported, {counts['skipped']} other lines skipped"),
+            'counts': counts
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error importing expenses: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to import statement'}), 500
+
 @app.route('/edit_finance/<finance_id>', methods=['GET', 'POST'])
 @login_required
 def edit_finance(finance_id):
@@ -1631,6 +2785,7 @@ def edit_finance(finance_id):
         
         # Update finance in database
         db.table('finances').update(finance_data).eq('id', finance_id).execute()
+        finance_cache.invalidate(current_user.family_id)
         
         flash('Finance item updated successfully', 'success')
         return redirect(url_for('finances'))
@@ -1664,6 +2819,7 @@ def delete_finance(finance_id):
     
     # Delete finance from database
     db.table('finances').delete().eq('id', finance_id).execute()
+    finance_cache.invalidate(current_user.family_id)
     
     flash('Finance item deleted successfully', 'success')
     return redirect(url_for('finances'))
@@ -2878,9 +4034,29 @@ def spherebot_query():
                 })
         elif context == "finance":
             if any(term in query_lower for term in ["view", "show", "summary", "overview", "budget", "current"]):
-                return jsonify({
-                    "response": "Here's your financial summary (sample data):\n\nBudget: $2,500.00\nSpent this month: $1,200.00\nRemaining: $1,300.00\n\nRecent expenses:\n1. Groceries - $120.00 (Yesterday)\n2. Utilities - $180.00 (Feb 28)\n3. Dining out - $65.00 (Feb 27)\n\nNote: This is example financial data for demonstration purposes only."
-                })
+                rollup = get_finance_rollup(current_user.family_id)
+                totals = rollup['totals']
+                response_text = (f"Here's your financial summary for this month:\n\n"
+                                 f"Budget: ${totals['budget']:,.2f}\n"
+                                 f"Spent this month: ${totals['spent']:,.2f}\n"
+                                 f"Remaining: ${totals['remaining']:,.2f}\n")
+                
+                if rollup['categories']:
+                    response_text += "\nBy category:\n"
+                    for i, row in enumerate(rollup['categories'][:5], 1):
+                        response_text += f"{i}. {row['category']} - ${row['spent']:,.2f}"
+                        if row['budget']:
+                            response_text += f" of ${row['budget']:,.2f}"
+                            if row['over_budget']:
+                                response_text += " (over budget)"
+                        response_text += "\n"
+                
+                if rollup['goals']:
+                    response_text += "\nSavings goals:\n"
+                    for goal in rollup['goals']:
+                        response_text += f"- {goal['title']}: {goal['progress'] * 100:.0f}% of ${goal['target_amount']:,.2f}\n"
+                
+                return jsonify({"response": response_text})
             elif any(term in query_lower for term in ["add", "new", "record", "expense", "spending"]):
                 return jsonify({
                     "response": "To add a new expense, please provide:\n- Amount\n- Category (e.g., Groceries, Utilities, Entertainment)\n- Date (defaults to today)\n- Description (optional)\n\nYou can add expenses in the Finance section of the app."
@@ -3113,6 +4289,7 @@ def event_detail(event_id):
         return redirect(url_for('calendar'))
     
     event = event_response.data[0]
+    event['shared_with'] = parse_shared_with(event.get('shared_with'))
     
     # Get all users in the family
     users_response = db.table('users').select('id, username').eq('family_id', current_user.family_id).execute()
@@ -3132,23 +4309,101 @@ def page_not_found(e):
 def internal_server_error(e):
     return render_template('500.html'), 500
 
-@app.route('/print_calendar')
+def get_daily_event_counts(family_id, start_date, end_date):
+    """Count a family's events on each day from start_date to end_date inclusive.
+
+    Single events are read from event_daily_counts, which a trigger on events
+    keeps up to date; recurring series are expanded over the range (cached
+    per family) and added on top. Returns one count per day.
+    """
+    from database import db
+
+    counts = [0] * ((end_date - start_date).days + 1)
+
+    counts_response = db.table('event_daily_counts').select('day, event_count') \
+        .eq('family_id', family_id) \
+        .gte('day', start_date.isoformat()) \
+        .lte('day', end_date.isoformat()) \
+        .execute()
+    for row in counts_response.data:
+        counts[(parse_date(row['day']) - start_date).days] += row['event_count']
+
+    for occurrence in get_family_occurrences(family_id, start_date, end_date + timedelta(days=1)):
+        offset = (parse_date(occurrence['date']) - start_date).days
+        if 0 <= offset < len(counts):
+            counts[offset] += 1
+
+    return counts
+
+def year_bounds(year):
+    """First and last day of a year."""
+    return date(year, 1, 1), date(year, 12, 31)
+
+@app.route('/api/calendar/heatmap')
 @login_required
-def print_calendar():
-    """Generate a printable version of the calendar."""
+def calendar_heatmap():
+    """Return the number of events on each day of a year, for a year overview."""
+    try:
+        year = int(request.args.get('year') or date.today().year)
+        start_date, end_date = year_bounds(year)
+        counts = get_daily_event_counts(current_user.family_id, start_date, end_date)
+        
+        return jsonify({
+            'success': True,
+            'year': year,
+            'start_date': start_date.isoformat(),
+            'counts': counts,
+            'max_count': max(counts)
+        })
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid year'}), 400
+    except Exception as e:
+        app.logger.error(f"Error building calendar heatmap: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to build calendar heatmap'}), 500
+
+def build_year_months(year, counts):
+    """Lay out daily counts of a year as months of Monday-first weeks, padding with None."""
+    months = []
+    for month in range(1, 13):
+        first_day = date(year, month, 1)
+        next_month = date(year + month // 12, month % 12 + 1, 1)
+        offset = (first_day - date(year, 1, 1)).days
+        cells = [None] * first_day.weekday()
+        cells.extend((first_day + timedelta(days=i), counts[offset + i]) for i in range((next_month - first_day).days))
+        cells.extend([None] * (-len(cells) % 7))
+        months.append({
+            'name': first_day.strftime('%B'),
+            'weeks': [cells[i:i + 7] for i in range(0, len(cells), 7)]
+        })
+    return months
+
+def render_print_calendar(family_id, start_date, end_date, category, member_id, view_type, include_shared):
+    """Render the printable body of a family calendar for a date range and filters.
+
+    Returns (title, html). Nothing in the output depends on the signed-in
+    user, so it can be rendered in the background and shared by the family.
+    """
     from database import db
-    import datetime
-    
-    # Get filter parameters
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    category = request.args.get('category')
-    member_id = request.args.get('member_id')
-    view_type = request.args.get('view', 'month')
-    include_shared = request.args.get('include_shared', 'true') == 'true'
     
-    # Get all events for the user's family
-    query = db.table('events').select('*').eq('family_id', current_user.family_id)
+    # Get family members for display
+    family_members_response = db.table('users').select('id, username').eq('family_id', family_id).execute()
+    member_lookup = {member['id']: member['username'] for member in family_members_response.data}
+    
+    # The year overview is drawn from daily counts without reading any events
+    if view_type == 'year':
+        year = (parse_date(start_date) or date.today()).year
+        counts = get_daily_event_counts(family_id, *year_bounds(year))
+        title = f"Family Calendar {year}"
+        return title, render_template('print_calendar_body.html',
+                                      view_type=view_type,
+                                      title=title,
+                                      family_id=family_id,
+                                      year_months=build_year_months(year, counts),
+                                      max_count=max(counts),
+                                      total_count=sum(counts))
+    
+    # Get all events for the family
+    query = db.table('events').select('*').eq('family_id', family_id)
     
     # Apply date filters if provided
     if start_date:
@@ -3157,56 +4412,36 @@ def print_calendar():
         query = query.lte('date', end_date)
         
     # Apply category filter if provided
-    if category and category != 'all':
+    if category:
         query = query.eq('category', category)
         
     # Apply member filter if provided
-    if member_id and member_id != 'all':
+    if member_id:
         query = query.eq('created_by', member_id)
         
     events_response = query.execute()
-    events = events_response.data
+    events = [event for event in events_response.data if not is_recurring_event(event)]
+    
+    # Recurring series are expanded over the printed range only
+    default_start, default_end = default_calendar_window()
+    window_start = parse_date(start_date) or default_start
+    window_end = parse_date(end_date) + timedelta(days=1) if end_date else default_end
+    
+    for occurrence in get_family_occurrences(family_id, window_start, window_end):
+        if category and occurrence.get('category') != category:
+            continue
+        if member_id and occurrence.get('created_by') != member_id:
+            continue
+        events.append(occurrence)
     
     # Also get shared events that this family can see
     shared_events = []
     if include_shared:
-        shared_query = db.table('events').select('*').neq('family_id', current_user.family_id)
-        
-        # Apply date filters if provided
-        if start_date:
-            shared_query = shared_query.gte('date', start_date)
-        if end_date:
-            shared_query = shared_query.lte('date', end_date)
-            
-        # Apply category filter if provided
-        if category and category != 'all':
-            shared_query = shared_query.eq('category', category)
-            
-        shared_response = shared_query.execute()
-        
-        # Filter shared events to only include those shared with this family
-        for event_data in shared_response.data:
-            shared_with = event_data.get('shared_with', '')
-            if shared_with and current_user.family_id in shared_with.split(','):
-                events.append(event_data)
-    
+        shared_events = get_shared_occurrences(family_id, window_start, window_end, category)
+
     # Format events for the template
-    formatted_events = []
-    
-    for event in events:
-        formatted_event = format_event_for_calendar(event, is_family_event=True)
-        formatted_events.append(formatted_event)
-    
-    for event in shared_events:
-        formatted_event = format_event_for_calendar(event, is_family_event=False)
-        formatted_events.append(formatted_event)
-    
-    # Get family members for display
-    family_members_response = db.table('users').select('id, username').eq('family_id', current_user.family_id).execute()
-    family_members = family_members_response.data
-    
-    # Create a member lookup dictionary
-    member_lookup = {member['id']: member['username'] for member in family_members}
+    formatted_events = format_events(events)
+    formatted_events.extend(format_events(shared_events, is_family_event=False))
     
     # Sort events by date and time
     formatted_events.sort(key=lambda x: (x['start'], x.get('end', '')))
@@ -3230,43 +4465,188 @@ def print_calendar():
         title = "Family Calendar"
     
     # Add category filter to title if applicable
-    if category and category != 'all':
+    if category:
         title += f" - {category} Events"
     
     # Add member filter to title if applicable
-    if member_id and member_id != 'all' and member_id in member_lookup:
+    if member_id and member_id in member_lookup:
         title += f" - {member_lookup[member_id]}'s Events"
     
+    return title, render_template('print_calendar_body.html',
+                                  events=formatted_events,
+                                  events_by_date=events_by_date,
+                                  view_type=view_type,
+                                  title=title,
+                                  family_id=family_id,
+                                  member_lookup=member_lookup)
+
+# Rendered print views older than this are rebuilt even without a calendar change
+PRINT_SNAPSHOT_MAX_AGE = timedelta(days=1)
+
+# Seconds without a calendar change before pre-rendering, so a burst of edits renders once
+PRINT_PRERENDER_DELAY = 5
+
+# Only families that printed within this long get their print views pre-rendered
+PRINT_PRERENDER_ACTIVE = timedelta(days=30)
+
+# Bumped by invalidate_family_calendar() so a render that raced an edit is not stored.
+# These are per process: with several app workers, only the worker that served a
+# family's last print pre-renders for it, and a generation bump in one worker does
+# not stop a racing render in another from storing a stale snapshot. Snapshots
+# still expire after PRINT_SNAPSHOT_MAX_AGE, and a missing one is rendered on print.
+print_generations = {}
+print_prerender_timers = {}
+print_last_printed = {}
+print_prerender_lock = threading.Lock()
+
+def print_filter_key(start_date, end_date, category, member_id, view_type, include_shared):
+    """Build the print_snapshots key for a date range and filter combination."""
+    return '|'.join([
+        start_date or '',
+        end_date or '',
+        category or 'all',
+        member_id or 'all',
+        view_type,
+        'shared' if include_shared else 'own'
+    ])
+
+def get_print_snapshot(family_id, start_date=None, end_date=None, category=None, member_id=None,
+                       view_type='month', include_shared=True):
+    """Get the rendered print view for a family and filters, rendering and storing it if needed.
+
+    Returns a dict with title and html. Snapshots are deleted by
+    invalidate_family_calendar() whenever the family's calendar changes.
+    """
+    from database import db
+    
+    filter_key = print_filter_key(start_date, end_date, category, member_id, view_type, include_shared)
+    
+    snapshot_response = db.table('print_snapshots').select('title, html, generated_at') \
+        .eq('family_id', family_id).eq('filter_key', filter_key).execute()
+    if snapshot_response.data:
+        snapshot = snapshot_response.data[0]
+        if datetime.now(pytz.utc) - datetime.fromisoformat(snapshot['generated_at']) < PRINT_SNAPSHOT_MAX_AGE:
+            return snapshot
+    
+    generation = print_generations.get(family_id, 0)
+    title, html = render_print_calendar(family_id, start_date, end_date, category, member_id,
+                                        view_type, include_shared)
+    snapshot = {'title': title, 'html': html}
+    
+    # A calendar change while rendering means this copy may already be stale
+    if print_generations.get(family_id, 0) == generation:
+        db.table('print_snapshots').upsert({
+            'family_id': family_id,
+            'filter_key': filter_key,
+            'title': title,
+            'html': html,
+            'generated_at': datetime.now(pytz.utc).replace(microsecond=0).isoformat()
+        }, on_conflict='family_id,filter_key').execute()
+    return snapshot
+
+def month_print_ranges(today=None):
+    """Get the (start_date, end_date) ranges of the current and next month, as the calendar prints them."""
+    today = today or date.today()
+    ranges = []
+    month_start = today.replace(day=1)
+    for _ in range(2):
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        ranges.append((month_start.isoformat(), (next_month - timedelta(days=1)).isoformat()))
+        month_start = next_month
+    return ranges
+
+def prerender_print_months(family_id):
+    """Render and store the unfiltered print views of the current and next month for a family."""
+    with print_prerender_lock:
+        print_prerender_timers.pop(family_id, None)
+    
+    try:
+        with app.test_request_context():
+            for start_date, end_date in month_print_ranges():
+                get_print_snapshot(family_id, start_date, end_date)
+    except Exception as e:
+        app.logger.error(f"Error pre-rendering print calendar: {str(e)}")
+
+def schedule_print_prerender(family_id):
+    """Pre-render a family's print views in a background thread once its calendar stops changing.
+
+    Each call restarts the family's pending timer, so the render runs
+    PRINT_PRERENDER_DELAY seconds after the last change. Families that have
+    not printed within PRINT_PRERENDER_ACTIVE are skipped.
+    """
+    with print_prerender_lock:
+        last_printed = print_last_printed.get(family_id)
+        if last_printed is None or datetime.now(pytz.utc) - last_printed > PRINT_PRERENDER_ACTIVE:
+            return
+        pending = print_prerender_timers.pop(family_id, None)
+        if pending is not None:
+            pending.cancel()
+        timer = threading.Timer(PRINT_PRERENDER_DELAY, prerender_print_months, args=(family_id,))
+        timer.daemon = True
+        print_prerender_timers[family_id] = timer
+    timer.start()
+
+@app.route('/print_calendar')
+@login_required
+def print_calendar():
+    """Generate a printable version of the calendar.
+
+    The calendar body is served from print_snapshots when the same range and
+    filters were printed (or pre-rendered) since the last calendar change.
+    """
+    category = request.args.get('category')
+    member_id = request.args.get('member_id')
+    try:
+        start_date = parse_date(request.args.get('start_date'))
+        end_date = parse_date(request.args.get('end_date'))
+    except ValueError:
+        return 'Invalid start or end date', 400
+    
+    # A family that prints gets this month's and next month's views ready for next time
+    with print_prerender_lock:
+        print_last_printed[current_user.family_id] = datetime.now(pytz.utc)
+    schedule_print_prerender(current_user.family_id)
+    
+    snapshot = get_print_snapshot(current_user.family_id,
+                                  start_date=start_date.isoformat() if start_date else None,
+                                  end_date=end_date.isoformat() if end_date else None,
+                                  category=category if category and category != 'all' else None,
+                                  member_id=member_id if member_id and member_id != 'all' else None,
+                                  view_type=request.args.get('view', 'month'),
+                                  include_shared=request.args.get('include_shared', 'true') == 'true')
+    
     return render_template('print_calendar.html',
-                          events=formatted_events,
-                          events_by_date=events_by_date,
-                          view_type=view_type,
-                          title=title,
-                          member_lookup=member_lookup,
+                          title=snapshot['title'],
+                          calendar_html=snapshot['html'],
                           page_title="Print Calendar")
 
+# Calendar template rows, cached per family and dropped whenever a template is saved or deleted
+template_cache = FamilyCache()
+
+def get_family_templates(family_id):
+    """Get all calendar templates for a family."""
+    templates = template_cache.get(family_id, 'templates')
+    if templates is None:
+        templates = db.table('calendar_templates').select('*').eq('family_id', family_id).execute().data
+        template_cache.set(family_id, 'templates', templates)
+    return templates
+
+def get_family_template(family_id, template_id):
+    """Get one of a family's calendar templates by ID, or None."""
+    return next((template for template in get_family_templates(family_id) if str(template['id']) == str(template_id)), None)
+
 # Calendar template routes
 @app.route('/calendar/templates')
 @login_required
 def calendar_templates():
     """Display the calendar templates management page."""
-    family_id = current_user.family_id
-    
-    # Get all templates for this family
-    templates = db.table('calendar_templates').select('*').eq('family_id', family_id).execute()
-    
-    return render_template('calendar_templates.html', templates=templates.data)
+    return render_template('calendar_templates.html', templates=get_family_templates(current_user.family_id))
 
 @app.route('/api/calendar_templates')
 @login_required
 def get_calendar_templates():
     """API endpoint to get calendar templates for the current family."""
-    family_id = current_user.family_id
-    
-    # Get all templates for this family
-    templates = db.table('calendar_templates').select('*').eq('family_id', family_id).execute()
-    
-    return jsonify({'templates': templates.data})
+    return jsonify({'templates': get_family_templates(current_user.family_id)})
 
 @app.route('/save_calendar_template', methods=['POST'])
 @login_required
@@ -3315,6 +4695,8 @@ def save_calendar_template():
             template_data['created_at'] = datetime.now().isoformat()
             result = db.table('calendar_templates').insert(template_data).execute()
             flash('Template created successfully', 'success')
+        
+        template_cache.invalidate(family_id)
             
         return redirect(url_for('calendar_templates'))
     except Exception as e:
@@ -3336,6 +4718,7 @@ def delete_calendar_template():
     try:
         # Delete the template
         result = db.table('calendar_templates').delete().eq('id', template_id).eq('family_id', family_id).execute()
+        template_cache.invalidate(family_id)
         flash('Template deleted successfully', 'success')
     except Exception as e:
         app.logger.error(f"Error deleting template: {str(e)}")
@@ -3350,14 +4733,12 @@ def use_calendar_template(template_id):
     family_id = current_user.family_id
     
     # Get the template
-    template_result = db.table('calendar_templates').select('*').eq('id', template_id).eq('family_id', family_id).execute()
+    template = get_family_template(family_id, template_id)
     
-    if not template_result.data:
+    if not template:
         flash('Template not found.', 'danger')
         return redirect(url_for('calendar'))
     
-    template = template_result.data[0]
-    
     # Redirect to add event page with template data
     return redirect(url_for('add_event', 
                            template_id=template_id,
@@ -3370,6 +4751,102 @@ def use_calendar_template(template_id):
                            end_time=template['event_end_time'],
                            recurrence=template['recurrence_pattern']))
 
+# Most events one template instantiation may create
+MAX_TEMPLATE_DATES = 366
+
+# Longest span, in days (about three years), a date rule may cover, so a rule matching few days stays cheap
+MAX_TEMPLATE_RULE_DAYS = 1096
+
+def template_dates_from_rule(rule):
+    """Expand a date rule into a sorted list of dates.
+
+    A rule has start_date, end_date (inclusive) and a pattern (daily, weekly,
+    biweekly, monthly or yearly), and may limit dates to certain weekdays
+    (0 = Monday) or leave out specific exclude_dates.
+    """
+    start_date = parse_date(rule.get('start_date'))
+    end_date = parse_date(rule.get('end_date'))
+    if not start_date or not end_date or end_date < start_date:
+        raise ValueError('A date rule needs a start date on or before its end date')
+    if (end_date - start_date).days > MAX_TEMPLATE_RULE_DAYS:
+        raise ValueError(f'A date rule can cover at most {MAX_TEMPLATE_RULE_DAYS} days')
+    
+    pattern = rule.get('pattern') or 'daily'
+    if pattern not in RECURRENCE_PATTERNS:
+        raise ValueError(f'Unknown repeat pattern: {pattern}')
+    
+    weekdays = {int(weekday) for weekday in rule.get('weekdays') or []}
+    if not weekdays <= set(range(7)):
+        raise ValueError('Weekdays must be between 0 (Monday) and 6 (Sunday)')
+    excluded = {parse_date(value) for value in rule.get('exclude_dates') or []}
+    
+    dates = []
+    for candidate in iter_occurrence_dates(start_date, pattern, start_date, end_date + timedelta(days=1)):
+        if weekdays and candidate.weekday() not in weekdays:
+            continue
+        if candidate not in excluded:
+            dates.append(candidate)
+        # Stop early rather than expanding an unbounded rule
+        if len(dates) > MAX_TEMPLATE_DATES:
+            break
+    return dates
+
+@app.route('/api/calendar_templates/<template_id>/instantiate', methods=['POST'])
+@login_required
+def instantiate_calendar_template(template_id):
+    """Create one event from a template on each of a list of dates, or the dates of a rule."""
+    try:
+        template = get_family_template(current_user.family_id, template_id)
+        if not template:
+            return jsonify({'success': False, 'message': 'Template not found'}), 404
+        
+        data = request.json or {}
+        try:
+            if data.get('dates'):
+                dates = sorted({parse_date(value) for value in data['dates']} - {None})
+            elif data.get('rule'):
+                dates = template_dates_from_rule(data['rule'])
+            else:
+                return jsonify({'success': False, 'message': 'Provide a list of dates or a date rule'}), 400
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
+        if not dates:
+            return jsonify({'success': False, 'message': 'No dates to create events on'}), 400
+        
+        if len(dates) > MAX_TEMPLATE_DATES:
+            return jsonify({'success': False, 'message': f'Cannot create more than {MAX_TEMPLATE_DATES} events at once'}), 400
+        
+        all_day = bool(template.get('all_day'))
+        events = [{
+            'id': str(uuid.uuid4()),
+            'title': template['event_title'],
+            'date': event_date.isoformat(),
+            'time': None if all_day else template.get('event_time') or None,
+            'end_time': None if all_day else template.get('event_end_time') or None,
+            'all_day': all_day,
+            'description': template.get('event_description'),
+            'location': template.get('event_location'),
+            'category': template.get('event_category') or 'family',
+            'family_id': current_user.family_id,
+            'created_by': current_user.id,
+            'is_recurring': False
+        } for event_date in dates]
+        
+        # One multi-row insert for every date
+        db.table('events').insert(events).execute()
+        
+        invalidate_family_calendar(current_user.family_id)
+        
+        return jsonify({
+            'success': True,
+            'message': f"Created {len(events)} events from template '{template['template_name']}'",
+            'event_ids': [event['id'] for event in events]
+        })
+    except Exception as e:
+        app.logger.error(f"Error instantiating template: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to create events from template'}), 500
+
 @app.route('/family/connections')
 @login_required
 def family_connections():
@@ -3880,13 +5357,16 @@ def share_item(item_type, item_id):
             return jsonify({'success': False, 'message': 'Item not found or not authorized'}), 404
 
         # Update shared_with field
-        current_shared = item.data.get('shared_with', [])
-        new_shared = list(set(current_shared + family_ids))  # Remove duplicates
+        current_shared = parse_shared_with(item.data.get('shared_with'))
+        new_shared = list(dict.fromkeys(current_shared + parse_shared_with(family_ids)))  # Remove duplicates
         
         supabase.table(table_name).update({
             'shared_with': new_shared
         }).eq('id', item_id).execute()
 
+        if item_type == 'event':
+            sync_event_shares(item_id, new_shared, current_user.id)
+
         return jsonify({'success': True, 'message': f'{item_type.title()} shared successfully'})
     except Exception as e:
         app.logger.error(f"Error sharing {item_type}: {str(e)}")
@@ -3922,13 +5402,17 @@ def unshare_item(item_type, item_id):
             return jsonify({'success': False, 'message': 'Item not found or not authorized'}), 404
 
         # Update shared_with field
-        current_shared = item.data.get('shared_with', [])
+        family_ids = parse_shared_with(family_ids)
+        current_shared = parse_shared_with(item.data.get('shared_with'))
         new_shared = [fid for fid in current_shared if fid not in family_ids]
         
         supabase.table(table_name).update({
             'shared_with': new_shared
         }).eq('id', item_id).execute()
 
+        if item_type == 'event':
+            sync_event_shares(item_id, new_shared, current_user.id)
+
         return jsonify({'success': True, 'message': f'{item_type.title()} unshared successfully'})
     except Exception as e:
         app.logger.error(f"Error unsharing {item_type}: {str(e)}")
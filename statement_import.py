@@ -0,0 +1,198 @@
+"""
+Bank statement import for FamilySphere.
+This module reads uploaded CSV and OFX statements one transaction at a time
+and maps each outgoing payment to an Expense row, so long statement
+histories can be imported without loading the whole file into memory.
+"""
+
+import csv
+import hashlib
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+# Header names recognised for each column, compared lowercased and trimmed
+COLUMN_ALIASES = {
+    'date': ('date', 'transaction date', 'posted date', 'posting date', 'booking date', 'value date'),
+    'amount': ('amount', 'transaction amount', 'value'),
+    'debit': ('debit', 'withdrawal', 'withdrawals', 'money out', 'paid out'),
+    'credit': ('credit', 'deposit', 'deposits', 'money in', 'paid in'),
+    'description': ('description', 'payee', 'name', 'merchant', 'details', 'transaction description', 'memo'),
+    'category': ('category',)
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%Y/%m/%d', '%d.%m.%Y', '%d-%b-%Y', '%b %d, %Y')
+
+# Titles are cut to this length; the full text stays in the description
+MAX_TITLE_LENGTH = 80
+
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+def iter_text_lines(lines):
+    """Decode an iterable of bytes or str lines, dropping a leading byte order mark."""
+    first = True
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        yield line
+
+
+def parse_amount(value):
+    """Parse a statement amount such as '-1,234.50', '$12.00' or '(12.00)' into a Decimal, or None."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    negative = value.startswith('(') and value.endswith(')')
+    value = re.sub(r'[^0-9.\-+]', '', value)
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        return None
+    return -amount if negative else amount
+
+
+def parse_statement_date(value):
+    """Parse a statement date in any of DATE_FORMATS, or an OFX YYYYMMDD timestamp, into a date."""
+    value = (value or '').strip()
+    if re.match(r'^\d{8}', value):
+        value = f'{value[:4]}-{value[4:6]}-{value[6:8]}'
+    # Most statements use ISO dates, which parse far faster than through strptime
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_description(description):
+    """Collapse whitespace and case so the same payee hashes the same way."""
+    return ' '.join((description or '').split()).lower()
+
+
+def expense_hash(expense_date, amount, description, occurrence=0):
+    """Hash an expense's (date, amount, description), used to skip rows imported before.
+
+    occurrence numbers identical transactions within one statement, so two
+    equal payments on the same day are both kept.
+    """
+    content = f'{expense_date}|{Decimal(str(amount)):.2f}|{normalize_description(description)}|{occurrence}'
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def transaction_to_expense(expense_date, amount, description, category):
+    """Map a statement transaction to Expense row fields, or None if it isn't an outgoing payment.
+
+    Statements record money spent as negative amounts; it is stored as a
+    positive expense.
+    """
+    if expense_date is None or amount is None or amount >= 0:
+        return None
+    description = ' '.join((description or '').split()) or 'Imported expense'
+    return {
+        'type': 'Expense',
+        'title': description[:MAX_TITLE_LENGTH],
+        'description': description,
+        'amount': float(-amount),
+        'date': expense_date.isoformat(),
+        'category': category
+    }
+
+
+def map_columns(header):
+    """Map each known column to its index in a CSV header row."""
+    names = [name.strip().lower() for name in header]
+    columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                columns[column] = names.index(alias)
+                break
+    return columns
+
+
+def iter_csv_transactions(lines, default_category):
+    """Yield (date, amount, description, category) for each row of a CSV statement.
+
+    The first row must be a header with a date column, a description column
+    and either an amount column or debit and credit columns.
+    """
+    reader = csv.reader(iter_text_lines(lines))
+    header = next(reader, None)
+    columns = map_columns(header or [])
+    if 'date' not in columns or 'description' not in columns or not (
+            'amount' in columns or 'debit' in columns):
+        raise ValueError('The CSV file needs date, description and amount (or debit) columns')
+
+    def cell(row, column):
+        index = columns.get(column)
+        return row[index] if index is not None and index < len(row) else ''
+
+    for row in reader:
+        if not row:
+            continue
+        if 'amount' in columns:
+            amount = parse_amount(cell(row, 'amount'))
+        else:
+            # Debits are money out whatever sign the bank writes them with
+            debit = parse_amount(cell(row, 'debit'))
+            amount = -abs(debit) if debit else parse_amount(cell(row, 'credit'))
+        yield (parse_statement_date(cell(row, 'date')), amount, cell(row, 'description'),
+               cell(row, 'category').strip() or default_category)
+
+
+def iter_ofx_transactions(lines, default_category):
+    """Yield (date, amount, description, category) for each STMTTRN of an OFX statement.
+
+    Works line by line for both SGML (unclosed tags) and XML OFX files.
+    """
+    transaction = None
+    for line in iter_text_lines(lines):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if not closing:
+                    transaction = {}
+                elif transaction is not None:
+                    description = transaction.get('NAME') or transaction.get('PAYEE') or ''
+                    if transaction.get('MEMO') and transaction['MEMO'] not in description:
+                        description = f"{description} {transaction['MEMO']}".strip()
+                    yield (parse_statement_date(transaction.get('DTPOSTED')),
+                           parse_amount(transaction.get('TRNAMT')), description, default_category)
+                    transaction = None
+            elif transaction is not None and not closing:
+                transaction[tag] = value.strip()
+
+
+def is_ofx(filename):
+    """Check whether an uploaded statement is OFX (or its Quicken QFX variant) by file name."""
+    return (filename or '').lower().endswith(('.ofx', '.qfx'))
+
+
+def iter_statement_expenses(lines, filename, default_category='General'):
+    """Yield Expense rows, each with an import_hash, for the outgoing payments in a statement.
+
+    Returns the rows lazily; skipped transactions (income, or rows that
+    could not be parsed) are yielded as None so callers can count them.
+    """
+    transactions = (iter_ofx_transactions if is_ofx(filename) else iter_csv_transactions)(lines, default_category)
+    occurrences = {}
+    for expense_date, amount, description, category in transactions:
+        expense = transaction_to_expense(expense_date, amount, description, category)
+        if expense is None:
+            yield None
+            continue
+
+        key = (expense['date'], expense['amount'], normalize_description(expense['description']))
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        expense['import_hash'] = expense_hash(expense['date'], expense['amount'], expense['description'], occurrence)
+        yield expense
@@ -40,49 +40,8 @@ function initFullCalendar() {
     const calendarEl = document.getElementById('family-calendar');
     if (!calendarEl) return;
 
-    // Get events from data attribute
-    const eventsData = JSON.parse(calendarEl.getAttribute('data-events') || '[]');
-    
-    // Process events to add color based on category
-    const coloredEvents = eventsData.map(event => {
-        // Assign colors based on event category
-        let color;
-        switch(event.category?.toLowerCase()) {
-            case 'family':
-                color = '#4285F4'; // Blue
-                break;
-            case 'work':
-                color = '#EA4335'; // Red
-                break;
-            case 'school':
-                color = '#FBBC05'; // Yellow
-                break;
-            case 'sports':
-                color = '#34A853'; // Green
-                break;
-            case 'health':
-                color = '#8E24AA'; // Purple
-                break;
-            case 'social':
-                color = '#FB8C00'; // Orange
-                break;
-            default:
-                color = '#9E9E9E'; // Gray
-        }
-        
-        // Add border for shared events
-        let borderColor = color;
-        if (event.shared) {
-            borderColor = '#FF5722'; // Deep Orange
-        }
-        
-        return {
-            ...event,
-            backgroundColor: color,
-            borderColor: borderColor,
-            textColor: getContrastColor(color)
-        };
-    });
+    // Events are fetched lazily from the JSON feed for the visible date range
+    const eventsUrl = calendarEl.getAttribute('data-events-url');
     
     // Initialize FullCalendar
     window.familyCalendar = new FullCalendar.Calendar(calendarEl, {
@@ -92,7 +51,19 @@ function initFullCalendar() {
             center: 'title',
             right: ''
         },
-        events: coloredEvents,
+        events: {
+            url: eventsUrl,
+            failure: function() {
+                showToast('Error loading events', 'danger');
+            }
+        },
+        eventDataTransform: colorizeEvent,
+        loading: function(isLoading) {
+            const loadingEl = document.getElementById('calendar-loading');
+            if (loadingEl) {
+                loadingEl.style.display = isLoading ? 'block' : 'none';
+            }
+        },
         editable: true,
         selectable: true,
         selectMirror: true,
@@ -144,6 +115,49 @@ function initFullCalendar() {
     window.familyCalendar.render();
 }
 
+/**
+ * Apply category colors to an event from the calendar feed
+ * @param {Object} event - Event data from the server
+ * @returns {Object} - Event data with colors set
+ */
+function colorizeEvent(event) {
+    // Assign colors based on event category
+    const category = event.category || event.extendedProps?.category;
+    let color;
+    switch(category?.toLowerCase()) {
+        case 'family':
+            color = '#4285F4'; // Blue
+            break;
+        case 'work':
+            color = '#EA4335'; // Red
+            break;
+        case 'school':
+            color = '#FBBC05'; // Yellow
+            break;
+        case 'sports':
+            color = '#34A853'; // Green
+            break;
+        case 'health':
+            color = '#8E24AA'; // Purple
+            break;
+        case 'social':
+            color = '#FB8C00'; // Orange
+            break;
+        default:
+            color = '#9E9E9E'; // Gray
+    }
+    
+    // Keep the server's border for shared events
+    const borderColor = event.borderColor || color;
+    
+    return {
+        ...event,
+        backgroundColor: color,
+        borderColor: borderColor,
+        textColor: getContrastColor(color)
+    };
+}
+
 /**
  * Handle event click - show event details
  */
@@ -188,49 +202,130 @@ function handleDateClick(info) {
  * Handle event drag and drop
  */
 function handleEventDrop(info) {
-    updateEventDates(info.event);
+    confirmEventMove(info);
 }
 
 /**
  * Handle event resize
  */
 function handleEventResize(info) {
+    confirmEventMove(info);
+}
+
+/**
+ * Check a dragged or resized event for conflicts, then save or revert it
+ * @param {Object} info - FullCalendar drop or resize info
+ */
+function confirmEventMove(info) {
+    checkEventConflicts(info.event)
+    .then(conflicts => {
+        if (conflicts.length > 0) {
+            const titles = conflicts.map(conflict => conflict.title).join(', ');
+            if (!confirm(`This overlaps with: ${titles}. Move it anyway?`)) {
+                info.revert();
+                return;
+            }
+        }
+        saveEventMove(info);
+    })
+    .catch(error => {
+        // Don't block the move if the conflict check itself fails
+        console.error('Error checking conflicts:', error);
+        saveEventMove(info);
+    });
+}
+
+/**
+ * Queue a dragged or resized event, and any events moved with it, for saving
+ * @param {Object} info - FullCalendar drop or resize info
+ */
+function saveEventMove(info) {
     updateEventDates(info.event);
+    (info.relatedEvents || []).forEach(updateEventDates);
 }
 
 /**
- * Update event dates after drag or resize
+ * Ask the server which events overlap an event's new time slot
+ * @param {Object} event - FullCalendar event
+ * @returns {Promise<Array>} - Conflicting events
  */
-function updateEventDates(event) {
-    const eventId = event.id;
-    const newStart = event.start.toISOString().split('T')[0];
-    const newEnd = event.end ? event.end.toISOString().split('T')[0] : null;
+function checkEventConflicts(event) {
+    if (event.allDay || !event.start) {
+        return Promise.resolve([]);
+    }
     
-    // Send update to server
-    fetch('/update_event_dates', {
+    const pad = value => String(value).padStart(2, '0');
+    const toDate = d => `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}`;
+    const toTime = d => `${pad(d.getHours())}:${pad(d.getMinutes())}:00`;
+    
+    return fetch('/api/calendar/conflicts', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
             'X-CSRFToken': getCsrfToken()
         },
         body: JSON.stringify({
-            event_id: eventId,
-            start_date: newStart,
-            end_date: newEnd
+            event_id: event.id,
+            date: toDate(event.start),
+            time: toTime(event.start),
+            end_date: event.end ? toDate(event.end) : null,
+            end_time: event.end ? toTime(event.end) : null
         })
     })
     .then(response => response.json())
+    .then(data => data.success ? data.conflicts : []);
+}
+
+// Moves made within this many milliseconds of each other are saved in one request
+const EVENT_MOVE_BATCH_DELAY = 300;
+const pendingEventMoves = new Map();
+let eventMoveTimer = null;
+
+/**
+ * Update event dates after drag or resize
+ */
+function updateEventDates(event) {
+    // Queue the move; a later move of the same event replaces the earlier one
+    pendingEventMoves.set(event.id, {
+        event_id: event.id,
+        start_date: event.start.toISOString().split('T')[0],
+        end_date: event.end ? event.end.toISOString().split('T')[0] : null
+    });
+    
+    clearTimeout(eventMoveTimer);
+    eventMoveTimer = setTimeout(flushEventMoves, EVENT_MOVE_BATCH_DELAY);
+}
+
+/**
+ * Send all queued moves to the server in one request
+ */
+function flushEventMoves() {
+    const moves = Array.from(pendingEventMoves.values());
+    pendingEventMoves.clear();
+    if (moves.length === 0) return;
+    
+    fetch('/api/calendar/moves', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCsrfToken()
+        },
+        body: JSON.stringify({ moves: moves })
+    })
+    .then(response => response.json())
     .then(data => {
+        const failed = (data.results || []).filter(result => !result.success);
         if (data.success) {
-            showToast('Event updated successfully', 'success');
+            showToast(moves.length === 1 ? 'Event updated successfully' : `${moves.length} events updated`, 'success');
         } else {
-            showToast('Failed to update event', 'danger');
-            // Revert the change
+            const message = failed.length > 0 ? failed[0].message : data.message;
+            showToast(`Failed to update ${failed.length || moves.length} event(s): ${message}`, 'danger');
+            // Revert the failed changes
             window.familyCalendar.refetchEvents();
         }
     })
     .catch(error => {
-        console.error('Error updating event:', error);
+        console.error('Error updating events:', error);
         showToast('Error updating event', 'danger');
         // Revert the change
         window.familyCalendar.refetchEvents();
@@ -463,6 +558,32 @@ function updateReminderPreferences(eventId, enabled, reminderTime = null, notifi
     });
 }
 
+/**
+ * Function to create an iCal subscription URL for the family calendar
+ */
+function createCalendarSubscription() {
+    fetch('/calendar/subscriptions', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCsrfToken()
+        },
+        body: JSON.stringify({ include_shared: true })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            window.prompt('Add this URL to your calendar app to subscribe:', data.url);
+        } else {
+            showToast(`Error: ${data.message}`, 'danger');
+        }
+    })
+    .catch(error => {
+        console.error('Error creating calendar subscription:', error);
+        showToast('Error creating calendar subscription', 'danger');
+    });
+}
+
 /**
  * Format date for display
  */
@@ -626,6 +747,12 @@ function setupEventListeners() {
         });
     }
 
+    // Event listener for import calendar submit
+    const importSubmitBtn = document.getElementById('import-calendar-submit');
+    if (importSubmitBtn) {
+        importSubmitBtn.addEventListener('click', submitCalendarImport);
+    }
+
     // Event listener for export calendar button
     const exportBtn = document.querySelector('.export-calendar-btn');
     if (exportBtn) {
@@ -635,6 +762,15 @@ function setupEventListeners() {
         });
     }
 
+    // Event listener for calendar subscription link
+    const subscribeBtn = document.getElementById('calendar-subscribe');
+    if (subscribeBtn) {
+        subscribeBtn.addEventListener('click', function(e) {
+            e.preventDefault();
+            createCalendarSubscription();
+        });
+    }
+
     // Event listener for template dropdown
     const templateDropdown = document.getElementById('templateDropdown');
     if (templateDropdown) {
@@ -726,28 +862,36 @@ function setupRSVPSystem() {
  * Setup reminder system
  */
 function setupReminderSystem() {
-    // Check for reminders periodically
-    checkForReminders();
+    // Reminders are pushed by the server's reminder worker through the notifications table
+    const calendarEl = document.getElementById('family-calendar');
+    const familyId = calendarEl ? calendarEl.dataset.familyId : null;
+    if (!familyId || typeof supabase === 'undefined') return;
     
-    // Check for reminders every minute
-    setInterval(checkForReminders, 60000);
-}
-
-/**
- * Check for due reminders
- */
-function checkForReminders() {
-    fetch('/check_reminders')
+    fetch('/api/supabase/client')
         .then(response => response.json())
         .then(data => {
-            if (data.reminders && data.reminders.length > 0) {
-                data.reminders.forEach(reminder => {
-                    showReminderNotification(reminder);
-                });
+            if (!data.success) {
+                console.error('Failed to get Supabase client:', data.error);
+                return;
             }
+            
+            const supabaseClient = supabase.createClient(data.supabaseUrl, data.supabaseKey);
+            supabaseClient
+                .channel(`reminders-${familyId}`)
+                .on('postgres_changes', {
+                    event: 'INSERT',
+                    schema: 'public',
+                    table: 'notifications',
+                    filter: `family_id=eq.${familyId}`
+                }, payload => {
+                    if (payload.new.type === 'event_reminder') {
+                        showReminderNotification(payload.new);
+                    }
+                })
+                .subscribe();
         })
         .catch(error => {
-            console.error('Error checking reminders:', error);
+            console.error('Error subscribing to reminders:', error);
         });
 }
 
@@ -940,6 +1084,45 @@ function importExternalCalendar() {
     bsModal.show();
 }
 
+/**
+ * Upload an .ics file from the import modal
+ */
+function submitCalendarImport() {
+    const form = document.getElementById('import-calendar-form');
+    const submitBtn = document.getElementById('import-calendar-submit');
+    if (!form) return;
+    
+    submitBtn.disabled = true;
+    
+    fetch('/import_calendar', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCsrfToken()
+        },
+        body: new FormData(form)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast(data.message, 'success');
+            
+            const bsModal = bootstrap.Modal.getInstance(document.getElementById('import-calendar-modal'));
+            if (bsModal) bsModal.hide();
+            
+            if (window.familyCalendar) window.familyCalendar.refetchEvents();
+        } else {
+            showToast(`Error: ${data.message}`, 'danger');
+        }
+    })
+    .catch(error => {
+        console.error('Error importing calendar:', error);
+        showToast('Error importing calendar', 'danger');
+    })
+    .finally(() => {
+        submitBtn.disabled = false;
+    });
+}
+
 /**
  * Setup print functionality
  */
@@ -953,8 +1136,12 @@ function setupPrintFunctionality() {
         const viewType = view.type.includes('Month') ? 'month' : 
                          view.type.includes('Week') ? 'week' : 
                          view.type.includes('Day') ? 'day' : 'list';
-        const startDate = view.activeStart.toISOString().split('T')[0];
-        const endDate = view.activeEnd.toISOString().split('T')[0];
+        // Print the dates the view is about (not the padding weeks of a month) as local,
+        // inclusive dates, so a month print matches the pre-rendered copy on the server
+        const lastDay = new Date(view.currentEnd);
+        lastDay.setDate(lastDay.getDate() - 1);
+        const startDate = formatDateForUrl(view.currentStart);
+        const endDate = formatDateForUrl(lastDay);
         
         // Get current category filter
         const category = document.getElementById('event-category-filter')?.value || 'all';
@@ -0,0 +1,107 @@
+import random
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+
+from auctions import BID_ACCEPTED, BID_CLOSED, close_auction, get_auction, place_bid
+from database import db
+
+# Concurrency stress test for the chore auction engine.
+# Many threads bid on one throwaway task at once; afterwards the auction must
+# hold the lowest bid placed, and no bid lower than it may have been lost.
+# Usage: python stress_task_auction.py <family_id> [threads] [bids_per_thread]
+THREADS = 16
+BIDS_PER_THREAD = 25
+MAX_BID = 500
+
+
+def run_stress_test(family_id, threads=THREADS, bids_per_thread=BIDS_PER_THREAD):
+    print("Stress testing chore auction bidding...")
+
+    members = db.table('users').select('id').eq('family_id', family_id).execute().data
+    if not members:
+        print(f"Family {family_id} has no members to bid with")
+        return False
+    member_ids = [member['id'] for member in members]
+
+    task = {
+        'id': str(uuid.uuid4()),
+        'title': 'Auction stress test',
+        'description': 'Created by stress_task_auction.py',
+        'due_date': (date.today() + timedelta(days=7)).isoformat(),
+        'points': MAX_BID,
+        'status': 'Pending',
+        'family_id': family_id
+    }
+    results = []
+    results_lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def bidder(seed):
+        rng = random.Random(seed)
+        placed = []
+        start.wait()
+        for _ in range(bids_per_thread):
+            points = rng.randint(1, MAX_BID)
+            outcome, _ = place_bid(task, rng.choice(member_ids), points)
+            placed.append((points, outcome))
+        with results_lock:
+            results.extend(placed)
+
+    try:
+        db.table('tasks').insert(task).execute()
+        workers = [threading.Thread(target=bidder, args=(seed,)) for seed in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        auction = get_auction(task['id'])
+        bids = db.table('task_bids').select('id, points').eq('task_id', task['id']).execute().data
+        outcomes = Counter(outcome for _, outcome in results)
+        lowest = min(points for points, _ in results)
+
+        print(f"{len(results)} bids from {threads} threads: " +
+              ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items())))
+        print(f"Lowest bid placed: {lowest}; auction best bid: {auction['best_bid']}")
+
+        failures = []
+        if auction['best_bid'] != lowest:
+            failures.append("auction does not hold the lowest bid (an update was lost)")
+        if len(bids) != len(results):
+            failures.append(f"{len(results)} bids placed but {len(bids)} recorded")
+        if auction['best_bid_id'] not in {bid['id'] for bid in bids if bid['points'] == lowest}:
+            failures.append("best bid does not point at a recorded lowest bid")
+        if outcomes[BID_CLOSED]:
+            failures.append("bids were rejected as closed while the auction was open")
+        if not outcomes[BID_ACCEPTED]:
+            failures.append("no bid was accepted")
+
+        closed = close_auction(auction)
+        if closed is None or close_auction(auction) is not None:
+            failures.append("auction did not close exactly once")
+        assigned = db.table('tasks').select('assigned_to, points').eq('id', task['id']).execute().data[0]
+        if assigned['assigned_to'] != auction['best_bidder'] or assigned['points'] != lowest:
+            failures.append("task was not given to the best bidder at their bid")
+
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if not failures:
+            print("All checks passed")
+        return not failures
+    finally:
+        # Clean up even if the run failed part way; the zero-point auction_won
+        # ledger entry stays, as the ledger is append-only
+        db.table('task_bids').delete().eq('task_id', task['id']).execute()
+        db.table('task_auctions').delete().eq('task_id', task['id']).execute()
+        db.table('tasks').delete().eq('id', task['id']).execute()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python stress_task_auction.py <family_id> [threads] [bids_per_thread]")
+        sys.exit(2)
+    passed = run_stress_test(sys.argv[1], *(int(arg) for arg in sys.argv[2:4]))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,176 @@
+"""
+Overdue and due-soon task alerts for FamilySphere.
+The worker scans pending tasks family by family with range queries on the
+(family_id, status, due_date) index, pushes a notification the first time a
+task is due soon or overdue, and stores each family's counts for the
+dashboard badge.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from database import db
+
+# Tasks due before now + this are due soon
+DUE_SOON_WINDOW = timedelta(hours=24)
+
+# Families scanned per query, and tasks read per page when looking for new alerts
+SCAN_BATCH_SIZE = 100
+SCAN_PAGE_SIZE = 500
+
+# Overdue tasks are alerted when they first fall due; older ones are not looked at again
+ALERT_LOOKBACK = timedelta(days=7)
+
+# Kinds of alert, each sent once per task and due date
+OVERDUE = 'overdue'
+DUE_SOON = 'due_soon'
+
+ALERT_TITLES = {
+    OVERDUE: "{title} is overdue",
+    DUE_SOON: "{title} is due {when}"
+}
+
+
+def iter_family_batches(batch_size=SCAN_BATCH_SIZE):
+    """Yield the IDs of every family, a batch at a time, in ID order."""
+    last_id = None
+    while True:
+        query = db.table('families').select('id')
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        family_ids = [family['id'] for family in query.order('id').limit(batch_size).execute().data]
+        if family_ids:
+            yield family_ids
+        if len(family_ids) < batch_size:
+            return
+        last_id = family_ids[-1]
+
+
+def alert_kind(task, today):
+    """Classify a pending task due by the end of the due-soon window."""
+    return OVERDUE if str(task['due_date'])[:10] < today.isoformat() else DUE_SOON
+
+
+def alert_notification(task, kind, today):
+    """Build the notification row for a task alert."""
+    when = 'today' if str(task['due_date'])[:10] == today.isoformat() else 'tomorrow'
+    return {
+        'id': str(uuid.uuid4()),
+        'family_id': task['family_id'],
+        'type': f'task_{kind}',
+        'title': ALERT_TITLES[kind].format(title=task['title'], when=when)
+    }
+
+
+def iter_alert_candidates(family_ids, earliest, latest, page_size=SCAN_PAGE_SIZE):
+    """Yield pending tasks of a batch of families due in [earliest, latest].
+
+    Pages through the (family_id, status, due_date) index with a keyset on
+    (family_id, due_date, id), so no page can hit the row cap.
+    """
+    last = None
+    while True:
+        query = db.table('tasks').select('id, title, due_date, family_id') \
+            .in_('family_id', family_ids) \
+            .eq('status', 'Pending') \
+            .gte('due_date', earliest.isoformat()) \
+            .lte('due_date', latest.isoformat())
+        if last is not None:
+            family_id, due_date, task_id = last['family_id'], str(last['due_date'])[:10], last['id']
+            query = query.or_(f'family_id.gt.{family_id},'
+                              f'and(family_id.eq.{family_id},due_date.gt.{due_date}),'
+                              f'and(family_id.eq.{family_id},due_date.eq.{due_date},id.gt.{task_id})')
+        tasks = query.order('family_id').order('due_date').order('id').limit(page_size).execute().data
+
+        yield tasks
+
+        if len(tasks) < page_size:
+            return
+        last = tasks[-1]
+
+
+def alert_tasks(tasks, today):
+    """Push an alert for each task not yet alerted for its kind and due date.
+
+    Returns the number of notifications sent.
+    """
+    kinds = {task['id']: alert_kind(task, today) for task in tasks}
+    alerted = db.table('task_alerts').select('task_id, kind, due_date') \
+        .in_('task_id', list(kinds)).execute().data
+    alerted_keys = {(row['task_id'], row['kind'], str(row['due_date'])[:10]) for row in alerted}
+    new_tasks = [task for task in tasks
+                 if (task['id'], kinds[task['id']], str(task['due_date'])[:10]) not in alerted_keys]
+    if not new_tasks:
+        return 0
+
+    # Claim each alert first so restarts or a second worker never send one twice
+    claims = [{'task_id': task['id'], 'kind': kinds[task['id']], 'due_date': str(task['due_date'])[:10]}
+              for task in new_tasks]
+    claimed = db.table('task_alerts') \
+        .upsert(claims, on_conflict='task_id,kind,due_date', ignore_duplicates=True) \
+        .execute().data
+    claimed_keys = {(row['task_id'], row['kind']) for row in claimed}
+
+    notifications = [alert_notification(task, kinds[task['id']], today)
+                     for task in new_tasks if (task['id'], kinds[task['id']]) in claimed_keys]
+    if notifications:
+        db.table('notifications').insert(notifications).execute()
+    return len(notifications)
+
+
+def count_task_alerts(family_ids, today, soon_end):
+    """Count each family's overdue and due-soon tasks with one grouped query."""
+    rows = db.rpc('count_family_task_alerts', {
+        'p_family_ids': family_ids,
+        'p_today': today.isoformat(),
+        'p_soon_end': soon_end.isoformat()
+    }).execute().data or []
+    counts = {family_id: {'overdue_count': 0, 'due_soon_count': 0} for family_id in family_ids}
+    for row in rows:
+        counts[row['family_id']] = {'overdue_count': row['overdue_count'], 'due_soon_count': row['due_soon_count']}
+    return counts
+
+
+def save_task_counts(family_ids, now):
+    """Recount the overdue and due-soon tasks of some families and store them for the dashboard."""
+    today = now.date()
+    soon_end = (now + DUE_SOON_WINDOW).date()
+    scanned_at = datetime.now(timezone.utc).isoformat()
+    db.table('family_task_counts').upsert([dict(family_counts, family_id=family_id, scanned_at=scanned_at)
+                                          for family_id, family_counts in
+                                          count_task_alerts(family_ids, today, soon_end).items()],
+                                         on_conflict='family_id').execute()
+
+
+def scan_families(family_ids, now):
+    """Alert on and count the overdue and due-soon tasks of a batch of families.
+
+    Counts cover every pending task due by the end of the due-soon window.
+    Alerts are only looked for among tasks due since ALERT_LOOKBACK ago,
+    since older overdue tasks were alerted when they first fell due.
+    Returns the number of notifications sent.
+    """
+    today = now.date()
+    soon_end = (now + DUE_SOON_WINDOW).date()
+    save_task_counts(family_ids, now)
+
+    return sum(alert_tasks(tasks, today)
+               for tasks in iter_alert_candidates(family_ids, today - ALERT_LOOKBACK, soon_end) if tasks)
+
+
+def scan_due_tasks(now):
+    """Scan every family's pending tasks for alerts and refresh their counts.
+
+    now is a naive datetime in the timezone due dates are kept in. Returns
+    the number of notifications sent.
+    """
+    return sum(scan_families(family_ids, now) for family_ids in iter_family_batches())
+
+
+def get_task_counts(family_id):
+    """Get a family's overdue and due-soon counts as of the last scan."""
+    counts_response = db.table('family_task_counts').select('overdue_count, due_soon_count') \
+        .eq('family_id', family_id).execute()
+    if not counts_response.data:
+        return {'overdue_count': 0, 'due_soon_count': 0}
+    return counts_response.data[0]
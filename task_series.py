@@ -0,0 +1,146 @@
+"""
+Recurring chores for FamilySphere.
+A task series describes a chore that repeats ("take out the trash every
+Tuesday"); the worker materializes its occurrences as ordinary task rows a
+rolling horizon ahead. Each series stores the due date of its next
+occurrence that has no task yet, so a run only touches series with an
+occurrence inside the horizon instead of rescanning every series or task.
+"""
+
+import uuid
+from datetime import date, timedelta
+
+from database import db
+from recurrence import RECURRENCE_PATTERNS, iter_occurrence_dates, parse_date
+
+# How far ahead occurrences are created as tasks
+SERIES_HORIZON = timedelta(days=14)
+
+# Series read per query, and so tasks written per insert batch, by generate_series_tasks
+GENERATE_BATCH_SIZE = 200
+
+
+def next_series_date(series, on_or_after):
+    """Get the first occurrence date of a series on or after a date, or None if the series has ended."""
+    start = parse_date(series['start_date'])
+    until = parse_date(series.get('end_date'))
+    return next(iter_occurrence_dates(start, series['recurrence_pattern'], on_or_after, date.max, until), None)
+
+
+def series_task(series, due_date):
+    """Build the task row for one occurrence of a series."""
+    return {
+        'id': str(uuid.uuid4()),
+        'title': series['title'],
+        'description': series.get('description'),
+        'due_date': due_date.isoformat(),
+        'assigned_to': series.get('assigned_to'),
+        'points': series.get('points') or 0,
+        'status': 'Pending',
+        'family_id': series['family_id'],
+        'series_id': series['id']
+    }
+
+
+def create_series(family_id, user_id, title, description, points, assigned_to, pattern, start_date, end_date=None):
+    """Create a task series and the task for its first occurrence.
+
+    Later occurrences are left to generate_series_tasks. Returns the series
+    row, or None if the series has no occurrences at all.
+    """
+    if pattern not in RECURRENCE_PATTERNS:
+        raise ValueError(f"Unknown recurrence pattern: {pattern}")
+
+    series = {
+        'id': str(uuid.uuid4()),
+        'family_id': family_id,
+        'title': title,
+        'description': description,
+        'points': points,
+        'assigned_to': assigned_to,
+        'recurrence_pattern': pattern,
+        'start_date': parse_date(start_date).isoformat(),
+        'end_date': parse_date(end_date).isoformat() if end_date else None,
+        'created_by': user_id
+    }
+    first = next_series_date(series, parse_date(start_date))
+    if first is None:
+        return None
+
+    following = next_series_date(series, first + timedelta(days=1))
+    series['next_due_date'] = following.isoformat() if following else None
+    series['active'] = following is not None
+
+    db.table('task_series').insert(series).execute()
+    db.table('tasks').insert(series_task(series, first)).execute()
+    return series
+
+
+def stop_series(family_id, series_id, today):
+    """Stop a series and remove its pending occurrences due after today.
+
+    Returns True if the series existed in the family.
+    """
+    stopped = db.table('task_series').update({'active': False, 'next_due_date': None}) \
+        .eq('id', series_id) \
+        .eq('family_id', family_id) \
+        .execute().data
+    if not stopped:
+        return False
+
+    db.table('tasks').delete() \
+        .eq('series_id', series_id) \
+        .eq('family_id', family_id) \
+        .eq('status', 'Pending') \
+        .gt('due_date', today.isoformat()) \
+        .execute()
+    return True
+
+
+def generate_series_tasks(today, horizon=SERIES_HORIZON):
+    """Create the tasks of every series occurrence due by today + horizon.
+
+    Series are read through the partial index on next_due_date, so only
+    series that have an occurrence to create are loaded. Their tasks are
+    written with one multi-row insert per batch; the unique (series_id,
+    due_date) index makes the insert a no-op for occurrences another run
+    already created. Each series then moves its next_due_date past the
+    horizon, guarded on the value it was read with so a concurrent edit or
+    stop wins. Returns the number of tasks created.
+    """
+    horizon_end = today + horizon
+    created = 0
+
+    while True:
+        due = db.table('task_series').select('*') \
+            .eq('active', True) \
+            .lte('next_due_date', horizon_end.isoformat()) \
+            .order('next_due_date') \
+            .limit(GENERATE_BATCH_SIZE) \
+            .execute().data
+
+        tasks = []
+        advances = []
+        for series in due:
+            first = parse_date(series['next_due_date'])
+            dates = list(iter_occurrence_dates(parse_date(series['start_date']), series['recurrence_pattern'],
+                                               first, horizon_end + timedelta(days=1),
+                                               parse_date(series.get('end_date'))))
+            tasks.extend(series_task(series, due_date) for due_date in dates)
+            following = next_series_date(series, horizon_end + timedelta(days=1))
+            advances.append((series, following))
+
+        if tasks:
+            inserted = db.table('tasks') \
+                .upsert(tasks, on_conflict='series_id,due_date', ignore_duplicates=True) \
+                .execute().data
+            created += len(inserted)
+
+        for series, following in advances:
+            db.table('task_series').update({
+                'next_due_date': following.isoformat() if following else None,
+                'active': following is not None
+            }).eq('id', series['id']).eq('next_due_date', series['next_due_date']).execute()
+
+        if len(due) < GENERATE_BATCH_SIZE:
+            return created
@@ -0,0 +1,66 @@
+from datetime import date
+
+from recurrence import expand_event
+
+# Tests for recurrence expansion; run with python -m pytest test_recurrence.py
+
+
+def multi_day_weekly_event():
+    """A weekly series whose occurrences run Friday to Sunday."""
+    return {
+        'id': 'weekend',
+        'title': 'Weekend away',
+        'date': '2026-01-02',
+        'end_date': '2026-01-04',
+        'time': '18:00:00',
+        'end_time': '12:00:00',
+        'is_recurring': True,
+        'recurrence_pattern': 'weekly',
+        'recurrence_end_date': None
+    }
+
+
+def test_multi_day_weekly_occurrences_keep_their_length():
+    occurrences = list(expand_event(multi_day_weekly_event(), date(2026, 1, 1), date(2026, 1, 24)))
+
+    assert [(o['date'], o['end_date']) for o in occurrences] == [
+        ('2026-01-02', '2026-01-04'),
+        ('2026-01-09', '2026-01-11'),
+        ('2026-01-16', '2026-01-18'),
+        ('2026-01-23', '2026-01-25')
+    ]
+
+
+def test_moved_occurrence_keeps_its_length():
+    exceptions = {date(2026, 1, 9): {'original_date': '2026-01-09', 'new_date': '2026-01-10', 'end_date': None}}
+    occurrences = list(expand_event(multi_day_weekly_event(), date(2026, 1, 5), date(2026, 1, 12), exceptions))
+
+    assert [(o['date'], o['end_date']) for o in occurrences] == [('2026-01-10', '2026-01-12')]
+
+
+def test_exception_end_date_overrides_shifted_end_date():
+    exceptions = {date(2026, 1, 9): {'original_date': '2026-01-09', 'new_date': '2026-01-09',
+                                     'end_date': '2026-01-10'}}
+    occurrences = list(expand_event(multi_day_weekly_event(), date(2026, 1, 5), date(2026, 1, 12), exceptions))
+
+    assert [(o['date'], o['end_date']) for o in occurrences] == [('2026-01-09', '2026-01-10')]
+
+
+def test_single_day_series_has_no_end_date():
+    event = dict(multi_day_weekly_event(), end_date=None)
+    occurrences = list(expand_event(event, date(2026, 1, 5), date(2026, 1, 12)))
+
+    assert [o['end_date'] for o in occurrences] == [None]
+
+
+def test_multi_day_occurrence_started_before_window_is_included():
+    occurrences = list(expand_event(multi_day_weekly_event(), date(2026, 1, 10), date(2026, 1, 12)))
+
+    assert [(o['date'], o['end_date']) for o in occurrences] == [('2026-01-09', '2026-01-11')]
+
+
+def test_multi_day_event_started_before_window_is_included():
+    event = dict(multi_day_weekly_event(), is_recurring=False, recurrence_pattern=None)
+
+    assert list(expand_event(event, date(2026, 1, 3), date(2026, 1, 10))) == [event]
+    assert list(expand_event(event, date(2026, 1, 5), date(2026, 1, 10))) == []
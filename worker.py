@@ -0,0 +1,262 @@
+"""
+Background worker for FamilySphere.
+Runs scheduled jobs outside the web processes: the event reminder scheduler,
+which pushes due reminders to families through the notifications table,
+closing chore auctions whose bidding time is up, creating the upcoming
+tasks of recurring chores, and alerting families to overdue and due-soon
+tasks. Start it with
+`python worker.py` (the worker entry in the Procfile).
+"""
+
+import logging
+import time as time_module
+import uuid
+from datetime import timedelta
+
+from auctions import close_due_auctions
+from database import db
+from recurrence import group_exceptions, is_recurring_event
+from reminders import ReminderQueue, local_now, next_reminder, next_reminder_at, reminder_key
+from task_alerts import scan_due_tasks
+from task_series import generate_series_tasks
+
+logger = logging.getLogger('familysphere.worker')
+
+# How often the queue is reloaded to pick up new and changed reminders
+RELOAD_INTERVAL = timedelta(seconds=60)
+
+# How often recurring chores are checked for occurrences entering their horizon
+SERIES_INTERVAL = timedelta(hours=1)
+
+# How often pending tasks are scanned for overdue and due-soon alerts
+TASK_SCAN_INTERVAL = timedelta(minutes=15)
+
+# Reminders that came due while the worker was down are still sent if this recent
+MISSED_REMINDER_GRACE = timedelta(minutes=15)
+
+# Rows read per page and IDs per IN filter
+PAGE_SIZE = 500
+
+REMINDER_COLUMNS = ('id, title, date, time, family_id, is_recurring, recurrence_pattern, '
+                    'recurrence_end_date, reminder_enabled, reminder_time, notification_method, next_reminder_at')
+
+
+def iter_rows(build_query, page_size=PAGE_SIZE):
+    """Yield the rows of a query page by page, using the last seen ID as the cursor."""
+    last_id = None
+    while True:
+        query = build_query()
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        rows = query.order('id').limit(page_size).execute().data
+
+        yield from rows
+
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]['id']
+
+
+def fetch_exceptions(event_ids):
+    """Get event_exceptions rows for a set of series, grouped by event and original date."""
+    event_ids = list(event_ids)
+    rows = []
+    for i in range(0, len(event_ids), PAGE_SIZE):
+        rows.extend(db.table('event_exceptions').select('*').in_('event_id', event_ids[i:i + PAGE_SIZE]).execute().data)
+    return group_exceptions(rows)
+
+
+def load_upcoming_reminders(now, lookahead):
+    """Load the reminders that fire between now - MISSED_REMINDER_GRACE and now + lookahead.
+
+    Uses the indexed events.next_reminder_at column, which holds the next fire
+    time of each event (the next occurrence for a recurring series). Returns
+    (fire_at, key, event) entries for a ReminderQueue.
+    """
+    earliest = now - MISSED_REMINDER_GRACE
+    latest = now + lookahead
+
+    def build_query():
+        return db.table('events').select(REMINDER_COLUMNS) \
+            .eq('reminder_enabled', True) \
+            .gte('next_reminder_at', earliest.isoformat()) \
+            .lte('next_reminder_at', latest.isoformat())
+
+    events = list(iter_rows(build_query))
+    exceptions_by_event = fetch_exceptions(event['id'] for event in events if is_recurring_event(event))
+
+    entries = []
+    for event in events:
+        # Resolves a series to the occurrence its stored fire time belongs to
+        reminder = next_reminder(event, earliest, exceptions_by_event.get(event['id']))
+        if reminder is not None and reminder[0] <= latest:
+            fire_at, occurrence = reminder
+            entries.append((fire_at, reminder_key(occurrence), occurrence))
+    return entries
+
+
+def update_next_reminders(events, after):
+    """Recompute and store next_reminder_at for event rows, from reminders at or after a time."""
+    exceptions_by_event = fetch_exceptions(event['id'] for event in events if is_recurring_event(event))
+    for event in events:
+        db.table('events').update({
+            'next_reminder_at': next_reminder_at(event, after, exceptions_by_event.get(event['id']))
+        }).eq('id', event['id']).execute()
+
+
+def advance_series_reminders(delivered):
+    """Move next_reminder_at of recurring series past the occurrences just reminded about."""
+    sent_at = {}
+    for fire_at, key, event in delivered:
+        if event.get('is_instance'):
+            sent_at[key[0]] = max(fire_at, sent_at.get(key[0], fire_at))
+    if not sent_at:
+        return
+
+    series = db.table('events').select(REMINDER_COLUMNS).in_('id', list(sent_at)).execute().data
+    for event in series:
+        # Occurrences of a series are at least a day apart
+        update_next_reminders([event], sent_at[event['id']] + timedelta(minutes=1))
+
+
+def refresh_stale_reminders(now):
+    """Fill in next_reminder_at where it is missing and move series past reminders that were missed.
+
+    Covers events created before the column existed and series whose next
+    reminder fired while the worker was down. Returns the number of events
+    updated.
+    """
+    earliest = now - MISSED_REMINDER_GRACE
+    stale_filter = (f'and(next_reminder_at.is.null,or(recurrence_end_date.is.null,'
+                    f'recurrence_end_date.gte.{now.date().isoformat()})),'
+                    f'and(is_recurring.is.true,next_reminder_at.lt."{earliest.isoformat()}")')
+
+    def build_query():
+        return db.table('events').select(REMINDER_COLUMNS) \
+            .eq('reminder_enabled', True) \
+            .or_(stale_filter)
+
+    updated = 0
+    page = []
+    for event in iter_rows(build_query):
+        page.append(event)
+        if len(page) >= PAGE_SIZE:
+            update_next_reminders(page, now)
+            updated += len(page)
+            page = []
+    if page:
+        update_next_reminders(page, now)
+        updated += len(page)
+    return updated
+
+
+def deliver_reminders(due):
+    """Push due reminders to their families, each exactly once.
+
+    Every reminder is first claimed in reminder_deliveries, whose primary key
+    is (event_id, occurrence_date); only rows the claim actually inserted are
+    pushed, so restarts or a second worker never send a reminder twice.
+    Returns the number of reminders pushed.
+    """
+    claims = [{'event_id': key[0], 'occurrence_date': key[1]} for _, key, _ in due]
+    claimed = db.table('reminder_deliveries') \
+        .upsert(claims, on_conflict='event_id,occurrence_date', ignore_duplicates=True) \
+        .execute().data
+    claimed_keys = {(row['event_id'], str(row['occurrence_date'])[:10]) for row in claimed}
+
+    notifications = []
+    for fire_at, key, event in due:
+        if key not in claimed_keys:
+            continue
+
+        event_time = event.get('time') or '00:00:00'
+        notifications.append({
+            'id': str(uuid.uuid4()),
+            'family_id': event['family_id'],
+            'type': 'event_reminder',
+            'title': event['title'],
+            'event_id': event['id'],
+            'event_date': f"{event['date']} {event_time[:5]}",
+            'notification_method': event.get('notification_method') or 'app'
+        })
+
+    if notifications:
+        db.table('notifications').insert(notifications).execute()
+
+    advance_series_reminders([entry for entry in due if entry[1] in claimed_keys])
+    return len(notifications)
+
+
+def run_reminder_scheduler():
+    """Deliver event reminders as they come due.
+
+    Upcoming reminders are reloaded into a priority queue every
+    RELOAD_INTERVAL; between reloads the worker sleeps until the earliest
+    queued reminder or the next reload, whichever comes first. Due chore
+    auctions are closed on each reload, recurring chore tasks are created
+    every SERIES_INTERVAL and tasks are scanned for alerts every
+    TASK_SCAN_INTERVAL.
+    """
+    queue = ReminderQueue()
+    next_reload = None
+    next_series_run = None
+    next_task_scan = None
+
+    while True:
+        now = local_now()
+        reload_due = next_reload is None or now >= next_reload
+
+        try:
+            if reload_due:
+                refreshed = refresh_stale_reminders(now)
+                if refreshed:
+                    logger.info(f"Refreshed next reminder time of {refreshed} events")
+
+                # Look a little past the next reload so nothing falls between loads
+                queue.replace(load_upcoming_reminders(now, RELOAD_INTERVAL * 2))
+                next_reload = now + RELOAD_INTERVAL
+
+            due = queue.pop_due(now)
+            if due:
+                sent = deliver_reminders(due)
+                logger.info(f"Sent {sent} of {len(due)} due reminders")
+        except Exception as e:
+            logger.error(f"Error running reminder scheduler: {str(e)}")
+            next_reload = now + RELOAD_INTERVAL
+
+        if reload_due:
+            try:
+                closed = close_due_auctions()
+                if closed:
+                    logger.info(f"Closed {closed} task auctions")
+            except Exception as e:
+                logger.error(f"Error closing task auctions: {str(e)}")
+
+        if next_series_run is None or now >= next_series_run:
+            next_series_run = now + SERIES_INTERVAL
+            try:
+                created = generate_series_tasks(now.date())
+                if created:
+                    logger.info(f"Created {created} recurring tasks")
+            except Exception as e:
+                logger.error(f"Error creating recurring tasks: {str(e)}")
+
+        if next_task_scan is None or now >= next_task_scan:
+            next_task_scan = now + TASK_SCAN_INTERVAL
+            try:
+                alerted = scan_due_tasks(now)
+                if alerted:
+                    logger.info(f"Sent {alerted} task alerts")
+            except Exception as e:
+                logger.error(f"Error scanning tasks for alerts: {str(e)}")
+
+        wake_at = next_reload
+        next_fire_time = queue.next_fire_time()
+        if next_fire_time is not None and next_fire_time < wake_at:
+            wake_at = next_fire_time
+        time_module.sleep(max((wake_at - local_now()).total_seconds(), 1))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    run_reminder_scheduler()